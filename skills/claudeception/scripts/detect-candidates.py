@@ -9,147 +9,371 @@ Skill Extraction Candidate Detector
 """
 
 import json
-import os
 import sys
+from abc import ABC, abstractmethod
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 
+# continuous-learning-v3 与本技能并列安装在同一 skills 目录下
+V3_DIR = Path(__file__).resolve().parent.parent.parent / 'continuous-learning-v3'
+sys.path.insert(0, str(V3_DIR / 'scripts'))
 
-def load_config() -> Dict:
-    """加载 v3 配置"""
-    config_file = Path(__file__).parent.parent / 'config.json'
-    with open(config_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+from config_loader import load_config
+from error_classifier import ErrorClassifier, load_error_classifier
+from observation_schema import observation_paths, observation_time
+from observation_store import ObservationStore
 
+CHECKPOINT_NAME = 'detect-candidates'
+DETECTION_WINDOW = 200  # 滑动窗口检测器考察的最近观测条数（也是首次运行读取的条数）
+SESSION_IDLE_SECONDS = 6 * 3600  # 会话超过该时间没有新观测即视为已结束，其状态被清理
+MAX_TRACKED_SESSIONS = 64  # 同时保留状态的会话数上限，超出时清理最久未活动的会话
 
-def load_observations(store_path: str, limit: int = 200) -> List[Dict]:
+
+# 配置类文件：文件名或扩展名命中即视为配置
+CONFIG_FILE_NAMES = {
+    'package.json', 'tsconfig.json', 'pyproject.toml', 'setup.cfg', 'requirements.txt',
+    'Dockerfile', 'docker-compose.yml', 'docker-compose.yaml', 'Makefile', '.env',
+    '.babelrc', '.eslintrc', '.prettierrc', 'settings.json', 'Cargo.toml', 'go.mod'
+}
+CONFIG_FILE_SUFFIXES = ('.toml', '.ini', '.cfg', '.conf', '.yaml', '.yml', '.env',
+                        '.config.js', '.config.ts', '.config.mjs', '.config.cjs', 'rc.json')
+
+
+def is_config_file(file_path: str) -> bool:
+    """判断文件路径是否指向配置文件"""
+    name = file_path.rstrip('/').rsplit('/', 1)[-1]
+    return name in CONFIG_FILE_NAMES or name.startswith('.env') or name.endswith(CONFIG_FILE_SUFFIXES)
+
+
+class ObservationFeatures:
     """
-    加载最近的观测数据
+    一条观测的预提取字段
 
-    Args:
-        store_path: observations.jsonl 路径
-        limit: 最多读取的行数
+    所有检测器共享同一份，input/output 只解析一次；
+    schema 2 记录直接读取写入时提取的 paths / error 字段。
+    """
 
-    Returns:
-        观测数据列表
+    __slots__ = ('session', 'time', 'event', 'tool', 'error_category', 'is_error', 'is_success',
+                 'file_paths', 'edit_target')
+
+    def __init__(self, obs: Dict, classifier: ErrorClassifier):
+        self.session = obs.get('session', '')
+        self.time = observation_time(obs)
+        self.event = obs.get('event')
+        self.tool = obs.get('tool', 'unknown')
+
+        output = obs.get('output', '')
+        completed = isinstance(output, str) and self.event == 'tool_complete'
+        if not completed:
+            self.error_category = None
+        elif obs.get('schema', 1) >= 2:
+            # schema 2 记录在写入时已分类错误
+            self.error_category = obs.get('error')
+        else:
+            self.error_category = classifier.classify(output)
+        self.is_error = self.error_category is not None
+        self.is_success = completed and not self.is_error
+
+        # 新记录在写入时已提取 paths 字段，旧记录回退为解析 input
+        self.file_paths = observation_paths(obs)
+        self.edit_target: Optional[str] = None
+        if self.tool == 'Edit' and self.event == 'tool_start' and self.file_paths:
+            self.edit_target = self.file_paths[0]
+
+
+class SignalDetector(ABC):
+    """
+    信号检测器基类
+
+    每个检测器是一个小状态机：共享的单遍扫描把每条观测的预提取字段喂给 feed()，
+    扫描结束后 finish() 给出本次运行的信号。状态通过 state()/restore() 存入检查点。
     """
-    path = Path(store_path).expanduser()
-    if not path.exists():
-        return []
 
-    observations = []
-    with open(path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                observations.append(json.loads(line))
-            except json.JSONDecodeError:
-                continue
+    signal_type = ''
+
+    def restore(self, state: Dict) -> None:
+        """从检查点恢复状态"""
+
+    def state(self) -> Dict:
+        """导出需要持久化的状态"""
+        return {}
 
-    return observations[-limit:]
+    @abstractmethod
+    def feed(self, features: ObservationFeatures) -> None:
+        """处理一条观测"""
 
+    def finish(self) -> Optional[Dict]:
+        """本次运行结束，返回检测到的信号或 None"""
+        return None
 
-def detect_error_fix_cycle(observations: List[Dict]) -> Optional[Dict]:
+
+class SessionSignalDetector(SignalDetector):
+    """
+    按会话分别维护状态的检测器
+
+    并行会话的观测交错写入同一日志，每个会话的计数互不影响。
+    会话状态按最近活动排序，超过 SESSION_IDLE_SECONDS 没有新观测的会话视为已结束，
+    连同超出 MAX_TRACKED_SESSIONS 的最久未活动会话一起清理。
+    """
+
+    def __init__(self):
+        self.sessions: Dict[str, Dict] = {}
+        self.result: Optional[Dict] = None
+
+    @abstractmethod
+    def new_session(self) -> Dict:
+        """一个新会话的初始状态"""
+
+    def restore(self, state: Dict) -> None:
+        self.sessions = dict(state.get('sessions', {}))
+
+    def state(self) -> Dict:
+        return {'sessions': self.sessions}
+
+    def session(self, features: ObservationFeatures) -> Dict:
+        """取出（必要时新建）该观测所属会话的状态，并清理已结束的会话"""
+        state = self.sessions.pop(features.session, None) or self.new_session()
+        if features.time is not None:
+            state['last_seen'] = features.time
+        self.sessions[features.session] = state
+
+        # 字典按最近活动排序，已结束的会话都在最前面
+        while len(self.sessions) > MAX_TRACKED_SESSIONS:
+            del self.sessions[next(iter(self.sessions))]
+        if features.time is not None:
+            while True:
+                oldest = next(iter(self.sessions))
+                last_seen = self.sessions[oldest].get('last_seen')
+                if last_seen is None or last_seen >= features.time - SESSION_IDLE_SECONDS:
+                    break
+                del self.sessions[oldest]
+        return state
+
+    def finish(self) -> Optional[Dict]:
+        return self.result
+
+
+class ErrorFixCycleDetector(SessionSignalDetector):
     """
     检测错误-修复循环模式
 
     信号：同一会话中出现多次错误后成功修复
     """
-    error_count = 0
-    error_tools = []
-    last_session = None
 
-    for obs in observations:
-        session = obs.get('session', '')
-        if last_session and session != last_session:
-            error_count = 0
-            error_tools = []
-        last_session = session
+    signal_type = 'error_fix_cycle'
+
+    def new_session(self) -> Dict:
+        return {'error_count': 0, 'error_tools': [], 'error_categories': []}
+
+    def restore(self, state: Dict) -> None:
+        if 'sessions' not in state and state.get('last_session') is not None:
+            # 旧版检查点只记录最近一个会话
+            state = {'sessions': {state['last_session']: {
+                'error_count': state.get('error_count', 0),
+                'error_tools': state.get('error_tools', []),
+                'error_categories': state.get('error_categories', [])
+            }}}
+        super().restore(state)
+
+    def feed(self, features: ObservationFeatures) -> None:
+        session = self.session(features)
+        if features.is_error:
+            session['error_count'] += 1
+            session['error_tools'].append(features.tool)
+            if features.error_category not in session['error_categories']:
+                session['error_categories'].append(features.error_category)
+        elif features.is_success and session['error_count'] >= 3:
+            strength = min(0.5 + session['error_count'] * 0.1, 0.95)
+            self.result = {
+                'signal_type': self.signal_type,
+                'signal_strength': round(strength, 2),
+                'error_count': session['error_count'],
+                'error_categories': session['error_categories'],
+                'tools_involved': list(set(session['error_tools'])),
+                'session': features.session
+            }
+            # 已上报的循环清零，避免下次运行重复上报
+            session.update(self.new_session())
 
-        output = obs.get('output', '')
-        if isinstance(output, str) and obs.get('event') == 'tool_complete':
-            error_keywords = ['error', 'Error', 'ERROR', 'failed', 'Failed',
-                              'FAILED', 'exception', 'Exception', 'traceback',
-                              'TypeError', 'SyntaxError', 'ReferenceError']
-            if any(kw in output for kw in error_keywords):
-                error_count += 1
-                error_tools.append(obs.get('tool', 'unknown'))
-            elif error_count >= 3:
-                strength = min(0.5 + error_count * 0.1, 0.95)
-                return {
-                    'signal_type': 'error_fix_cycle',
-                    'signal_strength': round(strength, 2),
-                    'error_count': error_count,
-                    'tools_involved': list(set(error_tools)),
-                    'session': session
-                }
-
-    return None
-
-
-def detect_long_investigation(observations: List[Dict]) -> Optional[Dict]:
+
+class LongInvestigationDetector(SignalDetector):
     """
     检测长时间调查模式
 
-    信号：围绕同一文件/模块的密集工具调用 > 10 次
+    信号：最近 DETECTION_WINDOW 条观测中围绕同一文件/模块的密集工具调用 > 10 次
     """
-    file_access_count: Dict[str, int] = {}
 
-    for obs in observations:
-        input_data = obs.get('input', '')
-        if isinstance(input_data, str):
-            for segment in input_data.split():
-                if '/' in segment and ('.' in segment.split('/')[-1]):
-                    file_path = segment.strip('"').strip("'")
-                    file_access_count[file_path] = file_access_count.get(file_path, 0) + 1
-
-    hot_files = {f: c for f, c in file_access_count.items() if c >= 10}
-    if hot_files:
+    signal_type = 'long_investigation'
+
+    def __init__(self, window: int = DETECTION_WINDOW):
+        self.recent: deque = deque(maxlen=window)
+        self.reported: List[str] = []
+
+    def restore(self, state: Dict) -> None:
+        self.recent.extend(state.get('recent', []))
+        self.reported = state.get('reported', [])
+
+    def state(self) -> Dict:
+        return {'recent': list(self.recent), 'reported': self.reported}
+
+    def feed(self, features: ObservationFeatures) -> None:
+        self.recent.append(features.file_paths)
+
+    def finish(self) -> Optional[Dict]:
+        file_access_count: Dict[str, int] = {}
+        for file_paths in self.recent:
+            for file_path in file_paths:
+                file_access_count[file_path] = file_access_count.get(file_path, 0) + 1
+
+        hot_files = {f: c for f, c in file_access_count.items() if c >= 10}
+        reported = set(self.reported)
+        self.reported = sorted(hot_files)
+
+        # 只上报新出现的热点文件
+        if not set(hot_files) - reported:
+            return None
+
         max_file = max(hot_files, key=hot_files.get)
         strength = min(0.5 + hot_files[max_file] * 0.03, 0.95)
         return {
-            'signal_type': 'long_investigation',
+            'signal_type': self.signal_type,
             'signal_strength': round(strength, 2),
             'hot_files': hot_files,
             'primary_file': max_file
         }
 
-    return None
-
 
-def detect_non_standard_solution(observations: List[Dict]) -> Optional[Dict]:
+class NonStandardSolutionDetector(SignalDetector):
     """
     检测非标准解决方案模式
 
     信号：编辑方向发生转变（先编辑 A 失败，转向编辑 B 成功）
     """
-    edit_targets = []
 
-    for obs in observations:
-        if obs.get('tool') == 'Edit' and obs.get('event') == 'tool_start':
-            input_data = obs.get('input', '')
-            if isinstance(input_data, str) and '/' in input_data:
-                edit_targets.append(input_data.split()[0] if input_data.split() else '')
+    signal_type = 'non_standard_solution'
+
+    def __init__(self, window: int = DETECTION_WINDOW):
+        self.window = window
+        self.seen = 0
+        self.edits: List[list] = []
+        self.reported: List[str] = []
+
+    def restore(self, state: Dict) -> None:
+        self.seen = state.get('seen', 0)
+        self.edits = state.get('edits', [])
+        self.reported = state.get('reported', [])
+
+    def state(self) -> Dict:
+        return {'seen': self.seen, 'edits': self.edits, 'reported': self.reported}
+
+    def feed(self, features: ObservationFeatures) -> None:
+        self.seen += 1
+        if features.edit_target is not None:
+            self.edits.append([self.seen, features.edit_target])
+
+    def finish(self) -> Optional[Dict]:
+        # 只保留滑动窗口内的编辑
+        self.edits = [edit for edit in self.edits if edit[0] > self.seen - self.window]
+        edit_targets = [target for _, target in self.edits]
 
-    if len(edit_targets) >= 5:
         unique_dirs = set()
         for target in edit_targets:
             parts = target.split('/')
             if len(parts) >= 2:
                 unique_dirs.add('/'.join(parts[:-1]))
 
-        if len(unique_dirs) >= 3:
-            return {
-                'signal_type': 'non_standard_solution',
-                'signal_strength': 0.7,
-                'edit_targets': edit_targets[-10:],
-                'unique_directories': list(unique_dirs)
+        # 只在出现新的编辑目录时上报
+        if len(edit_targets) < 5 or len(unique_dirs) < 3 or not unique_dirs - set(self.reported):
+            return None
+
+        self.reported = sorted(unique_dirs)
+        return {
+            'signal_type': self.signal_type,
+            'signal_strength': 0.7,
+            'edit_targets': edit_targets[-10:],
+            'unique_directories': list(unique_dirs)
+        }
+
+
+class ConfigDiscoveryDetector(SessionSignalDetector):
+    """
+    检测配置发现模式
+
+    信号：同一会话中出错后修改配置文件，随后工具调用成功
+    （问题的解法藏在配置里，通常是文档里不明显的知识）
+    """
+
+    signal_type = 'config_discovery'
+
+    def new_session(self) -> Dict:
+        return {'after_error': False, 'config_files': []}
+
+    def restore(self, state: Dict) -> None:
+        if 'sessions' not in state and state.get('last_session') is not None:
+            # 旧版检查点只记录最近一个会话
+            state = {'sessions': {state['last_session']: {
+                'after_error': state.get('after_error', False),
+                'config_files': state.get('config_files', [])
+            }}}
+        super().restore(state)
+
+    def feed(self, features: ObservationFeatures) -> None:
+        session = self.session(features)
+        if features.is_error:
+            session['after_error'] = True
+        elif (session['after_error'] and features.event == 'tool_start'
+              and features.tool in ('Edit', 'Write')):
+            for file_path in features.file_paths:
+                if is_config_file(file_path) and file_path not in session['config_files']:
+                    session['config_files'].append(file_path)
+        elif features.is_success and session['config_files']:
+            self.result = {
+                'signal_type': self.signal_type,
+                'signal_strength': round(min(0.6 + len(session['config_files']) * 0.1, 0.9), 2),
+                'config_files': session['config_files'],
+                'session': features.session
             }
+            session.update(self.new_session())
 
-    return None
+
+# 信号名 → 检测器；config.json 的 claudeception.signals 决定启用哪些
+DETECTORS = {
+    detector.signal_type: detector
+    for detector in (
+        ErrorFixCycleDetector,
+        LongInvestigationDetector,
+        NonStandardSolutionDetector,
+        ConfigDiscoveryDetector,
+    )
+}
+
+
+def run_detectors(observations: Iterable[Dict], detectors: List[SignalDetector],
+                  classifier: ErrorClassifier) -> List[Dict]:
+    """
+    单遍扫描观测，把预提取字段同时喂给所有检测器
+
+    Args:
+        observations: 观测序列（可以是惰性生成器）
+        detectors: 检测器实例
+        classifier: 工具输出的错误分类器
+
+    Returns:
+        各检测器给出的信号列表
+    """
+    for obs in observations:
+        features = ObservationFeatures(obs, classifier)
+        for detector in detectors:
+            detector.feed(features)
+
+    results = []
+    for detector in detectors:
+        result = detector.finish()
+        if result:
+            results.append(result)
+    return results
 
 
 def write_candidate(candidate: Dict, candidates_path: str) -> str:
@@ -167,8 +391,12 @@ def write_candidate(candidate: Dict, candidates_path: str) -> str:
     path.mkdir(parents=True, exist_ok=True)
 
     timestamp = datetime.utcnow().strftime('%Y%m%d-%H%M%S')
-    filename = f"candidate-{timestamp}.json"
-    filepath = path / filename
+    filepath = path / f"candidate-{timestamp}.json"
+    # 一次运行可能产出多个候选，避免同一秒内互相覆盖
+    suffix = 1
+    while filepath.exists():
+        filepath = path / f"candidate-{timestamp}-{suffix}.json"
+        suffix += 1
 
     candidate['timestamp'] = datetime.utcnow().isoformat() + 'Z'
     candidate['suggestion'] = '建议运行 /claudeception 提取为完整技能'
@@ -181,6 +409,13 @@ def write_candidate(candidate: Dict, candidates_path: str) -> str:
 
 def main():
     """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Detect skill extraction candidates')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore the checkpoint and rescan all observations')
+    args = parser.parse_args()
+
     config = load_config()
 
     claudeception_config = config.get('claudeception', {})
@@ -199,21 +434,50 @@ def main():
         '~/.claude/homunculus/observations.jsonl'
     )
 
-    observations = load_observations(store_path)
-    if not observations:
-        print('无观测数据')
-        return
+    # 从检查点恢复游标和检测器状态，只处理上次运行之后的新观测
+    store = ObservationStore(store_path)
+    checkpoint = {'cursor': None, 'state': {}} if args.full else store.load_checkpoint(CHECKPOINT_NAME)
+    cursor = checkpoint['cursor']
+    # 没有检查点的首次运行只检测最近 DETECTION_WINDOW 条，--full 才扫描全部历史
+    seed = not args.full and 'store' not in checkpoint
+
+    detectors = []
+    for signal in claudeception_config.get('signals', list(DETECTORS)):
+        if signal not in DETECTORS:
+            print(f"Warning: Unknown signal in config: {signal}", file=sys.stderr)
+            continue
+        detector = DETECTORS[signal]()
+        detector.restore(checkpoint['state'].get(signal, {}))
+        detectors.append(detector)
+
+    processed = 0
+
+    def new_observations():
+        nonlocal cursor, processed
+        for obs, cursor in store.iter_from(cursor):
+            processed += 1
+            yield obs
+
+    if seed:
+        observations = store.tail(DETECTION_WINDOW)
+        processed = len(observations)
+        cursor = store.end_cursor()
+    else:
+        observations = new_observations()
 
-    detectors = [
-        detect_error_fix_cycle,
-        detect_long_investigation,
-        detect_non_standard_solution,
-    ]
+    results = run_detectors(observations, detectors, load_error_classifier(config))
+
+    store.save_checkpoint(CHECKPOINT_NAME, cursor, {
+        detector.signal_type: detector.state() for detector in detectors
+    })
+
+    if processed == 0:
+        print('无新观测数据')
+        return
 
     candidates_found = 0
-    for detector in detectors:
-        result = detector(observations)
-        if result and result.get('signal_strength', 0) >= min_strength:
+    for result in results:
+        if result.get('signal_strength', 0) >= min_strength:
             filepath = write_candidate(result, candidates_path)
             candidates_found += 1
             print(f'检测到候选信号: {result["signal_type"]} '
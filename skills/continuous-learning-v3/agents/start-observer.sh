@@ -15,6 +15,7 @@ CONFIG_DIR="${HOME}/.claude/homunculus"
 PID_FILE="${CONFIG_DIR}/.observer.pid"
 LOG_FILE="${CONFIG_DIR}/observer.log"
 OBSERVATIONS_FILE="${CONFIG_DIR}/observations.jsonl"
+SCRIPTS_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../scripts" && pwd)"
 
 mkdir -p "$CONFIG_DIR"
 
@@ -90,13 +91,8 @@ case "${1:-start}" in
             >> "$LOG_FILE" 2>&1 || true
         fi
 
-        # Archive processed observations
-        if [ -f "$OBSERVATIONS_FILE" ]; then
-          archive_dir="${CONFIG_DIR}/observations.archive"
-          mkdir -p "$archive_dir"
-          mv "$OBSERVATIONS_FILE" "$archive_dir/processed-$(date +%Y%m%d-%H%M%S).jsonl"
-          touch "$OBSERVATIONS_FILE"
-        fi
+        # Archive processed observations（持锁轮转并压缩，不会丢失并发写入的行）
+        python3 "$SCRIPTS_DIR/observation_store.py" rotate --store "$OBSERVATIONS_FILE" >> "$LOG_FILE" 2>&1 || true
       }
 
       # Handle SIGUSR1 for on-demand analysis
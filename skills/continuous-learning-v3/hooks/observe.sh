@@ -39,6 +39,11 @@ set -e
 CONFIG_DIR="${HOME}/.claude/homunculus"
 OBSERVATIONS_FILE="${CONFIG_DIR}/observations.jsonl"
 MAX_FILE_SIZE_MB=10
+SCRIPTS_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../scripts" && pwd)"
+COLLECTOR_SOCKET="${CONFIG_DIR}/.collector.sock"
+COLLECTOR_PID_FILE="${CONFIG_DIR}/.collector.pid"
+# nc -U 检测结果（yes / no），只检测一次
+COLLECTOR_NC_FILE="${CONFIG_DIR}/.collector-nc"
 
 # Ensure directory exists
 mkdir -p "$CONFIG_DIR"
@@ -56,151 +61,41 @@ if [ -z "$INPUT_JSON" ]; then
   exit 0
 fi
 
-# Parse using python (more reliable than jq for complex JSON)
-# 注意：不能用 echo | python3 << 'EOF'，heredoc 会抢占 stdin
-PARSED=$(HOOK_INPUT_JSON="$INPUT_JSON" python3 << 'EOF'
-import json
-import sys
-import os
-import re
-
-try:
-    # 从环境变量读取 JSON，避免 heredoc 与 pipe 的 stdin 冲突
-    data = json.loads(os.environ['HOOK_INPUT_JSON'])
-
-    # Extract fields - Claude Code hook format
-    hook_type = data.get('hook_event_name', data.get('hook_type', 'unknown'))  # PreToolUse or PostToolUse
-    tool_name = data.get('tool_name', data.get('tool', 'unknown'))
-    tool_input = data.get('tool_input', data.get('input', {}))
-    tool_output = data.get('tool_response', data.get('tool_output', data.get('output', '')))
-    session_id = data.get('session_id', 'unknown')
-    user_message = data.get('user_message', '')
-
-    # Truncate large inputs/outputs
-    if isinstance(tool_input, dict):
-        tool_input_str = json.dumps(tool_input)[:5000]
-    else:
-        tool_input_str = str(tool_input)[:5000]
-
-    if isinstance(tool_output, dict):
-        tool_output_str = json.dumps(tool_output)[:5000]
-    else:
-        tool_output_str = str(tool_output)[:5000]
-
-    # Determine event type
-    event = 'tool_start' if 'Pre' in hook_type else 'tool_complete'
-
-    result = {
-        'parsed': True,
-        'event': event,
-        'tool': tool_name,
-        'input': tool_input_str if event == 'tool_start' else None,
-        'output': tool_output_str if event == 'tool_complete' else None,
-        'session': session_id
-    }
-
-    # Code navigation: detect user query intent
-    if user_message and 'Pre' in hook_type:
-        code_search_keywords = [
-            '我想修改', '找到', '查找', '在哪', '哪里', '定位', '搜索',
-            '看看', '检查', '查看', '打开', '编辑', '更改',
-            'find', 'locate', 'where', 'search', 'look for', 'show me',
-            'open', 'edit', 'modify', 'change', 'update'
-        ]
-
-        user_message_lower = user_message.lower()
-        if any(keyword in user_message_lower for keyword in code_search_keywords):
-            result['user_query_event'] = {
-                'event': 'user_query',
-                'query': user_message,
-                'intent': 'code_search',
-                'session': session_id
-            }
-
-    print(json.dumps(result))
-except Exception as e:
-    print(json.dumps({'parsed': False, 'error': str(e)}), file=sys.stderr)
-    print(json.dumps({'parsed': False, 'error': str(e)}))
-EOF
-)
-
-# Check if parsing succeeded
-PARSED_OK=$(echo "$PARSED" | python3 -c "import json,sys; print(json.load(sys.stdin).get('parsed', False))")
-
-if [ "$PARSED_OK" != "True" ]; then
-  # Fallback: log raw input for debugging
-  timestamp=$(date -u +"%Y-%m-%dT%H:%M:%SZ")
-  echo "{\"timestamp\":\"$timestamp\",\"event\":\"parse_error\",\"raw\":$(echo "$INPUT_JSON" | python3 -c 'import json,sys; print(json.dumps(sys.stdin.read()[:1000]))')}" >> "$OBSERVATIONS_FILE"
-  exit 0
+# 快速路径：把载荷交给常驻收集器（observation_collector.py），不启动 python3。
+# 收集器在后台批量写入并 fsync，这里只等待 socket 接收完毕（最多 1 秒）
+if [ -S "$COLLECTOR_SOCKET" ] && command -v nc >/dev/null 2>&1 && \
+    printf '%s\n' "$INPUT_JSON" | nc -U -w 1 "$COLLECTOR_SOCKET" >/dev/null 2>&1; then
+  SENT_TO_COLLECTOR=1
 fi
 
-# Archive if file too large
-if [ -f "$OBSERVATIONS_FILE" ]; then
-  # 使用跨平台的方式获取文件大小
-  if command -v stat >/dev/null 2>&1; then
-    # macOS 和 BSD
-    file_size_bytes=$(stat -f%z "$OBSERVATIONS_FILE" 2>/dev/null || stat -c%s "$OBSERVATIONS_FILE" 2>/dev/null)
-  else
-    # 回退到 du
-    file_size_bytes=$(du -b "$OBSERVATIONS_FILE" 2>/dev/null | cut -f1)
+if [ -z "$SENT_TO_COLLECTOR" ]; then
+  # 回退路径：解析、字段提取（schema 2：epoch 时间、文件路径、错误类别、查询关键词）、
+  # 超限轮转和追加写入都在同一个 python3 进程内完成
+  if ! printf '%s' "$INPUT_JSON" | python3 "$SCRIPTS_DIR/observation_store.py" ingest \
+      --store "$OBSERVATIONS_FILE" --max-size-mb "$MAX_FILE_SIZE_MB"; then
+    echo "Error: Failed to record observation" >&2
+    exit 1
   fi
 
-  file_size_mb=$((${file_size_bytes:-0} / 1024 / 1024))
-
-  if [ "${file_size_mb:-0}" -ge "$MAX_FILE_SIZE_MB" ]; then
-    archive_dir="${CONFIG_DIR}/observations.archive"
-
-    # 创建归档目录，失败则退出
-    if ! mkdir -p "$archive_dir"; then
-      echo "Error: Failed to create archive directory: $archive_dir" >&2
-      exit 1
-    fi
-
-    archive_file="$archive_dir/observations-$(date +%Y%m%d-%H%M%S).jsonl"
-
-    # 移动文件，失败则报错
-    if mv "$OBSERVATIONS_FILE" "$archive_file"; then
-      echo "Archived observations to: $archive_file" >&2
+  # 按需启动收集器（需要支持 -U 的 nc），后续事件走快速路径。
+  # nc 是否支持 -U 首次实际检测一次，结果缓存在 $COLLECTOR_NC_FILE
+  if command -v nc >/dev/null 2>&1 && [ ! -f "$COLLECTOR_NC_FILE" ]; then
+    if python3 "$SCRIPTS_DIR/observation_collector.py" check-nc >/dev/null 2>&1; then
+      echo yes > "$COLLECTOR_NC_FILE"
     else
-      echo "Error: Failed to archive observations file" >&2
-      exit 1
+      echo no > "$COLLECTOR_NC_FILE"
+    fi
+  fi
+  if [ "$(cat "$COLLECTOR_NC_FILE" 2>/dev/null)" = "yes" ]; then
+    collector_pid=$(cat "$COLLECTOR_PID_FILE" 2>/dev/null || true)
+    if [ -z "$collector_pid" ] || ! kill -0 "$collector_pid" 2>/dev/null; then
+      nohup python3 "$SCRIPTS_DIR/observation_collector.py" serve \
+        --store "$OBSERVATIONS_FILE" --socket "$COLLECTOR_SOCKET" \
+        --max-size-mb "$MAX_FILE_SIZE_MB" >/dev/null 2>&1 &
     fi
   fi
 fi
 
-# Build and write observation
-timestamp=$(date -u +"%Y-%m-%dT%H:%M:%SZ")
-
-PARSED_JSON="$PARSED" OBS_TIMESTAMP="$timestamp" OBS_FILE="$OBSERVATIONS_FILE" python3 << 'EOF'
-import json
-import os
-
-parsed = json.loads(os.environ['PARSED_JSON'])
-timestamp = os.environ['OBS_TIMESTAMP']
-obs_file = os.environ['OBS_FILE']
-
-observation = {
-    'timestamp': timestamp,
-    'event': parsed['event'],
-    'tool': parsed['tool'],
-    'session': parsed['session']
-}
-
-if parsed.get('input'):
-    observation['input'] = parsed['input']
-if parsed.get('output'):
-    observation['output'] = parsed['output']
-
-with open(obs_file, 'a') as f:
-    f.write(json.dumps(observation) + '\n')
-
-    # Write user query event if detected
-    if 'user_query_event' in parsed:
-        query_event = parsed['user_query_event']
-        query_event['timestamp'] = timestamp
-        f.write(json.dumps(query_event) + '\n')
-EOF
-
 # Signal observer if running
 OBSERVER_PID_FILE="${CONFIG_DIR}/.observer.pid"
 if [ -f "$OBSERVER_PID_FILE" ]; then
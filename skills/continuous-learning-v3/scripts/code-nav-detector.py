@@ -9,98 +9,66 @@ Code Navigation Pattern Detector
 """
 
 import json
-import re
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+import sys
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+from observation_schema import (
+    extract_keywords,
+    extract_symbol,
+    is_code_search_query,
+    observation_time,
+)
+from config_loader import load_config
+from observation_store import DEFAULT_STORE_PATH, ObservationStore
 
-# 代码查找意图关键词
-CODE_SEARCH_KEYWORDS = [
-    # 中文
-    "我想修改", "找到", "查找", "在哪", "哪里", "定位", "搜索",
-    "看看", "检查", "查看", "打开", "编辑", "更改",
-    # 英文
-    "find", "locate", "where", "search", "look for", "show me",
-    "open", "edit", "modify", "change", "update"
-]
 
+CHECKPOINT_NAME = 'code-nav-detector'
 
-def extract_keywords(query: str) -> List[str]:
-    """
-    从自然语言查询中提取关键词
 
-    Args:
-        query: 用户查询字符串
+def _load_input(tool: Dict) -> Optional[Dict]:
+    """解析工具调用的 input 字段(可能是 JSON 字符串)"""
+    if 'input' not in tool:
+        return None
+    input_data = json.loads(tool['input']) if isinstance(tool['input'], str) else tool['input']
+    return input_data if isinstance(input_data, dict) else None
 
-    Returns:
-        关键词列表
-    """
-    # 移除常见停用词
-    stopwords = {
-        "的", "了", "在", "是", "我", "有", "和", "就", "不", "人", "都", "一", "一个",
-        "the", "a", "an", "is", "are", "was", "were", "be", "been", "being",
-        "have", "has", "had", "do", "does", "did", "will", "would", "should",
-        "can", "could", "may", "might", "must", "i", "you", "he", "she", "it",
-        "we", "they", "this", "that", "these", "those"
-    }
 
-    # 分词(简单实现)
-    words = re.findall(r'\w+', query.lower())
+def extract_file_path(read_tool: Dict) -> Optional[str]:
+    """从 Read 工具调用中提取文件路径(schema 2 记录直接读 paths 字段)"""
+    paths = read_tool.get('paths')
+    if isinstance(paths, list):
+        return paths[0] if paths else None
+    try:
+        input_data = _load_input(read_tool)
+        return input_data.get('file_path') if input_data else None
+    except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+        print(f"Warning: Failed to extract file_path from Read tool: {e}", file=sys.stderr)
+        return None
 
-    # 过滤停用词和短词
-    keywords = [w for w in words if w not in stopwords and len(w) > 1]
 
-    return keywords[:5]  # 最多返回5个关键词
+def extract_function_name(edit_tool: Dict) -> Optional[str]:
+    """从 Edit 工具调用中提取函数名(schema 2 记录直接读 symbol 字段)"""
+    if edit_tool.get('schema', 1) >= 2:
+        return edit_tool.get('symbol')
+    return extract_symbol(edit_tool.get('input'))
 
 
-def is_code_search_query(query: str) -> bool:
-    """
-    判断是否为代码查找查询
+# Grep → Read → Edit 序列的状态
+_STAGE_GREP, _STAGE_READ, _STAGE_EDIT, _STAGE_DONE = range(4)
+_UNSET = object()
 
-    Args:
-        query: 用户查询字符串
 
-    Returns:
-        是否为代码查找查询
-    """
-    query_lower = query.lower()
-    return any(keyword in query_lower for keyword in CODE_SEARCH_KEYWORDS)
-
-
-def get_subsequent_tools(
-    observations: List[Dict],
-    query_index: int,
-    window_minutes: int = 5
-) -> List[Dict]:
-    """
-    获取查询后续的工具调用
-
-    Args:
-        observations: 观测列表
-        query_index: 查询在列表中的索引
-        window_minutes: 时间窗口(分钟)
-
-    Returns:
-        后续工具调用列表
-    """
-    if query_index >= len(observations):
-        return []
-
-    query_time = datetime.fromisoformat(
-        observations[query_index]['timestamp'].replace('Z', '+00:00')
-    )
-    window_end = query_time + timedelta(minutes=window_minutes)
-
-    subsequent = []
-    for obs in observations[query_index + 1:]:
-        obs_time = datetime.fromisoformat(
-            obs['timestamp'].replace('Z', '+00:00')
-        )
-        if obs_time > window_end:
-            break
-        subsequent.append(obs)
-
-    return subsequent
+def _advance_stage(stage: int, tool_name: str) -> int:
+    """根据工具名推进序列状态"""
+    if stage == _STAGE_GREP and 'grep' in tool_name:
+        return _STAGE_READ
+    if stage == _STAGE_READ and 'read' in tool_name:
+        return _STAGE_EDIT
+    if stage == _STAGE_EDIT and 'edit' in tool_name:
+        return _STAGE_DONE
+    return stage
 
 
 def is_grep_read_edit_sequence(tools: List[Dict]) -> Tuple[bool, Optional[Dict]]:
@@ -113,129 +81,233 @@ def is_grep_read_edit_sequence(tools: List[Dict]) -> Tuple[bool, Optional[Dict]]
     Returns:
         (是否匹配, 代码位置信息)
     """
-    # 查找序列
-    grep_idx = None
-    read_idx = None
-    edit_idx = None
-
-    for i, tool in enumerate(tools):
-        tool_name = tool.get('tool', '').lower()
-
-        if 'grep' in tool_name and grep_idx is None:
-            grep_idx = i
-        elif 'read' in tool_name and grep_idx is not None and read_idx is None:
-            read_idx = i
-        elif 'edit' in tool_name and read_idx is not None and edit_idx is None:
-            edit_idx = i
-            break
-
-    # 检查是否找到完整序列
-    if grep_idx is not None and read_idx is not None and edit_idx is not None:
-        # 提取代码位置
-        read_tool = tools[read_idx]
-        edit_tool = tools[edit_idx]
-
-        # 从 Read 工具获取文件路径
-        file_path = None
-        if 'input' in read_tool:
-            try:
-                input_data = json.loads(read_tool['input']) if isinstance(read_tool['input'], str) else read_tool['input']
-                file_path = input_data.get('file_path')
-            except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
-                print(f"Warning: Failed to extract file_path from Read tool: {e}", file=sys.stderr)
-
-        # 从 Edit 工具获取编辑位置
-        function_name = None
-        if 'input' in edit_tool:
-            try:
-                input_data = json.loads(edit_tool['input']) if isinstance(edit_tool['input'], str) else edit_tool['input']
-                old_string = input_data.get('old_string', '')
-                # 尝试提取函数名
-                func_match = re.search(r'function\s+(\w+)|def\s+(\w+)|(\w+)\s*\(', old_string)
-                if func_match:
-                    function_name = next(g for g in func_match.groups() if g)
-            except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
-                print(f"Warning: Failed to extract function_name from Edit tool: {e}", file=sys.stderr)
-
-        if file_path:
-            return True, {
-                'file_path': file_path,
-                'function_name': function_name,
-                'confirmation_method': 'implicit'
-            }
+    stage = _STAGE_GREP
+    read_tool = None
+
+    for tool in tools:
+        next_stage = _advance_stage(stage, tool.get('tool', '').lower())
+        if next_stage == _STAGE_EDIT and stage == _STAGE_READ:
+            read_tool = tool
+        elif next_stage == _STAGE_DONE:
+            file_path = extract_file_path(read_tool)
+            if file_path:
+                return True, {
+                    'file_path': file_path,
+                    'function_name': extract_function_name(tool),
+                    'confirmation_method': 'implicit'
+                }
+            return False, None
+        stage = next_stage
 
     return False, None
 
 
-def detect_code_navigation_pattern(observations: List[Dict]) -> List[Dict]:
-    """
-    检测代码导航模式
+class _OpenQuery:
+    """时间窗口内尚未闭合的用户查询"""
 
-    Args:
-        observations: 观测列表
+    __slots__ = ('obs', 'keywords', 'window_end', 'stage', 'read_tool')
 
-    Returns:
-        检测到的模式列表
+    def __init__(self, obs: Dict, keywords: List[str], window_end: float):
+        self.obs = obs
+        self.keywords = keywords
+        self.window_end = window_end
+        self.stage = _STAGE_GREP
+        self.read_tool: Optional[Dict] = None
+
+
+class CodeNavigationDetector:
     """
-    patterns = []
+    单遍流式代码导航检测器
 
-    for i, obs in enumerate(observations):
-        # 跳过非用户查询事件
-        if obs.get('event') != 'user_query':
-            continue
+    维护一个按时间排序的未闭合查询窗口,时间取 schema 2 的 epoch 字段
+    (旧记录的 ISO 时间戳只解析一次);
+    查询的 Grep → Read → Edit 序列一闭合就产出模式,超出时间窗口的查询直接丢弃。
 
-        query = obs.get('query', '')
+    Args:
+        window_minutes: 查询后追踪工具调用的时间窗口(分钟)
+    """
 
-        # 检查是否为代码查找查询
+    def __init__(self, window_minutes: int = 5):
+        self.window = window_minutes * 60
+        self.open_queries: deque = deque()
+
+    def state(self) -> Dict:
+        """导出未闭合查询,供检查点持久化"""
+        return {
+            'open_queries': [
+                {
+                    'obs': query.obs,
+                    'keywords': query.keywords,
+                    'window_end': query.window_end,
+                    'stage': query.stage,
+                    'read_tool': query.read_tool
+                }
+                for query in self.open_queries
+            ]
+        }
+
+    def restore(self, state: Dict) -> None:
+        """从检查点恢复未闭合查询"""
+        self.open_queries = deque()
+        for item in state.get('open_queries', []):
+            window_end = item['window_end']
+            if isinstance(window_end, str):
+                # 旧检查点以 ISO 字符串保存窗口结束时间
+                window_end = observation_time({'timestamp': window_end})
+            query = _OpenQuery(item['obs'], item['keywords'], window_end)
+            query.stage = item['stage']
+            query.read_tool = item.get('read_tool')
+            self.open_queries.append(query)
+
+    def feed(self, obs: Dict) -> List[Dict]:
+        """
+        处理一条观测
+
+        Args:
+            obs: 观测字典
+
+        Returns:
+            因这条观测而闭合的模式列表
+        """
+        obs_time = observation_time(obs)
+        if obs_time is None:
+            return []
+
+        patterns = []
+        if self.open_queries:
+            patterns = self._advance(obs, obs_time)
+
+        if obs.get('event') == 'user_query':
+            self._open(obs, obs_time)
+
+        return patterns
+
+    def _advance(self, obs: Dict, obs_time: float) -> List[Dict]:
+        """用一条观测推进所有未闭合查询,返回闭合产生的模式"""
+        tool_name = (obs.get('tool') or '').lower()
+        patterns = []
+        still_open = deque()
+        function_name = _UNSET
+
+        for query in self.open_queries:
+            # 超出时间窗口的查询直接关闭
+            if obs_time > query.window_end:
+                continue
+            if not tool_name:
+                still_open.append(query)
+                continue
+            next_stage = _advance_stage(query.stage, tool_name)
+            if next_stage == _STAGE_EDIT and query.stage == _STAGE_READ:
+                query.read_tool = obs
+            elif next_stage == _STAGE_DONE:
+                file_path = extract_file_path(query.read_tool)
+                if file_path:
+                    # 同一条 Edit 可能同时闭合多个查询,函数名只提取一次
+                    if function_name is _UNSET:
+                        function_name = extract_function_name(obs)
+                    patterns.append(self._pattern(query, {
+                        'file_path': file_path,
+                        'function_name': function_name,
+                        'confirmation_method': 'implicit'
+                    }))
+                continue
+            query.stage = next_stage
+            still_open.append(query)
+
+        self.open_queries = still_open
+        return patterns
+
+    def _open(self, obs: Dict, obs_time: float) -> None:
+        """为代码查找查询打开一个追踪窗口"""
+        query = obs.get('query', '')
         if not is_code_search_query(query):
-            continue
+            return
 
-        # 提取关键词
-        keywords = extract_keywords(query)
+        # schema 2 记录在写入时已提取关键词
+        keywords = obs['keywords'] if 'keywords' in obs else extract_keywords(query)
         if not keywords:
-            continue
+            return
 
-        # 获取后续工具调用
-        subsequent_tools = get_subsequent_tools(observations, i)
+        self.open_queries.append(_OpenQuery(obs, keywords, obs_time + self.window))
 
-        # 检测 Grep → Read → Edit 序列
-        is_sequence, code_location = is_grep_read_edit_sequence(subsequent_tools)
+    @staticmethod
+    def _pattern(query: _OpenQuery, code_location: Dict) -> Dict:
+        return {
+            'natural_language': query.obs.get('query', ''),
+            'keywords': query.keywords,
+            'code_location': code_location,
+            'timestamp': query.obs['timestamp'],
+            'session': query.obs.get('session', 'unknown'),
+            'confidence': 0.5  # 隐式确认的初始置信度
+        }
 
-        if is_sequence and code_location:
-            patterns.append({
-                'natural_language': query,
-                'keywords': keywords,
-                'code_location': code_location,
-                'timestamp': obs['timestamp'],
-                'session': obs.get('session', 'unknown'),
-                'confidence': 0.5  # 隐式确认的初始置信度
-            })
 
-    return patterns
+def iter_code_navigation_patterns(observations: Iterable[Dict]) -> Iterator[Dict]:
+    """
+    流式检测代码导航模式
 
+    Args:
+        observations: 观测序列(可以是惰性生成器)
+
+    Yields:
+        检测到的模式,序列一闭合即产出
+    """
+    detector = CodeNavigationDetector()
+    for obs in observations:
+        yield from detector.feed(obs)
 
-def main():
-    """主函数"""
-    import sys
 
-    if len(sys.argv) < 2:
-        print("Usage: code-nav-detector.py <observations.jsonl>")
-        sys.exit(1)
+def detect_code_navigation_pattern(observations: List[Dict]) -> List[Dict]:
+    """
+    检测代码导航模式
 
-    observations_file = sys.argv[1]
+    Args:
+        observations: 观测列表
 
-    # 读取观测数据
-    observations = []
-    with open(observations_file, 'r') as f:
-        for line in f:
-            if line.strip():
-                observations.append(json.loads(line))
+    Returns:
+        检测到的模式列表
+    """
+    return list(iter_code_navigation_patterns(observations))
 
-    # 检测模式
-    patterns = detect_code_navigation_pattern(observations)
 
-    # 输出结果
-    print(json.dumps(patterns, indent=2, ensure_ascii=False))
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Detect code navigation patterns')
+    parser.add_argument('observations_file', help='Path to observations.jsonl')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore the checkpoint and rescan all observations '
+                             '(files other than the configured store are always scanned in full)')
+
+    args = parser.parse_args()
+
+    # 只有配置的观测日志才增量检测:对其他文件的临时运行不读写检查点,
+    # 否则第二次运行会从上次的游标继续而输出空结果
+    store = ObservationStore(args.observations_file)
+    default_store = load_config().get('observation', {}).get('store_path', str(DEFAULT_STORE_PATH))
+    incremental = store.store_path.resolve() == Path(default_store).expanduser().resolve()
+
+    # 从检查点恢复游标和未闭合查询,只处理新增观测(活动段 + 归档段)
+    if incremental and not args.full:
+        checkpoint = store.load_checkpoint(CHECKPOINT_NAME)
+    else:
+        checkpoint = {'cursor': None, 'state': {}}
+    detector = CodeNavigationDetector()
+    detector.restore(checkpoint['state'])
+    cursor = checkpoint['cursor']
+
+    # 边检测边输出 JSON 数组
+    separator = '\n'
+    print('[', end='')
+    for obs, cursor in store.iter_from(cursor):
+        for pattern in detector.feed(obs):
+            print(separator + json.dumps(pattern, indent=2, ensure_ascii=False), end='', flush=True)
+            separator = ',\n'
+    print('\n]' if separator != '\n' else ']')
+
+    if incremental:
+        store.save_checkpoint(CHECKPOINT_NAME, cursor, detector.state())
 
 
 if __name__ == '__main__':
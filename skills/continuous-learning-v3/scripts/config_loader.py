@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Config Loader
+
+读取 continuous-learning-v3 的 config.json。
+
+v3 的各个脚本（观测存储、收集器、直觉索引、instinct-cli、instinct-manager）
+和 claudeception 的 detect-candidates 共用这一份读取逻辑，
+彼此之间不必为了读配置而互相导入。
+"""
+
+import json
+from pathlib import Path
+from typing import Dict
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / 'config.json'
+
+
+def load_config() -> Dict:
+    """加载 v3 配置，缺失或无法解析时返回空配置"""
+    try:
+        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
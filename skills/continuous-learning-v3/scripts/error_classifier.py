@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Error Classifier
+
+把工具输出归类为错误类别（TypeError、测试失败、网络错误等）。
+
+模式在构建时统一转为小写并按类别优先级排好，输出只转一次小写，
+再按优先级逐个做 C 层面的子串查找（忽略大小写）。
+CPython 下这比正则交替或纯 Python 的 Aho-Corasick 自动机都快得多。
+子串命中后再用构建时编译好的守卫正则确认，排除计数为零的报告
+（"0 errors"、"no failures"、"Errors: 0"）和更长单词的一部分（"error_handler"）；
+大多数输出不含任何模式，只需子串查找。
+
+模式可在 config.json → claudeception.error_patterns 中配置，
+按声明顺序决定优先级（越靠前越具体）。
+"""
+
+import re
+from typing import Dict, List, Optional, Pattern, Tuple
+
+
+DEFAULT_ERROR_PATTERNS: Dict[str, List[str]] = {
+    'type_error': ['TypeError'],
+    'syntax_error': ['SyntaxError', 'IndentationError', 'Unexpected token'],
+    'reference_error': ['ReferenceError', 'NameError', 'is not defined'],
+    'import_error': ['ModuleNotFoundError', 'ImportError', 'Cannot find module'],
+    'file_not_found': ['FileNotFoundError', 'No such file', 'ENOENT'],
+    'permission': ['PermissionError', 'Permission denied', 'EACCES', 'EPERM'],
+    'network': ['ECONNREFUSED', 'ECONNRESET', 'ETIMEDOUT', 'ENOTFOUND',
+                'Connection refused', 'timed out'],
+    'test_failure': ['AssertionError', 'tests failed', 'test failed', 'failing', 'FAIL:'],
+    'generic': ['traceback', 'exception', 'error', 'failed'],
+}
+
+# 模式前面是零计数（"0 errors"、"no errors"、"zero errors"）时不算命中
+_ZERO_COUNT_GUARD = r'(?<!\b0 )(?<!\bno )(?<!\bzero )'
+# 模式后面是零计数（"errors: 0"、"failed=0"）时不算命中
+_ZERO_VALUE_GUARD = r'(?!\s*[:=]\s*0\b)'
+
+
+def _guarded_pattern(keyword: str) -> Pattern:
+    """
+    把小写模式编译为带零计数守卫的正则
+
+    以单词字符结尾的模式允许复数 s，但不能是更长单词的一部分
+    （"errors" 命中 error，"error_handler" 不命中；前面的字母不限，"ValueError" 仍命中）。
+    """
+    suffix = r's?(?!\w)' if re.match(r'\w', keyword[-1]) else ''
+    return re.compile(_ZERO_COUNT_GUARD + re.escape(keyword) + suffix + _ZERO_VALUE_GUARD)
+
+
+class ErrorClassifier:
+    """
+    多模式错误分类器
+
+    Args:
+        patterns: 类别 → 模式列表，按优先级从高到低排列
+    """
+
+    def __init__(self, patterns: Dict[str, List[str]]):
+        self.categories = [category for category, keywords in patterns.items() if keywords]
+        self._compiled: List[Tuple[str, Tuple[Tuple[str, Pattern], ...]]] = [
+            (category, tuple((keyword, _guarded_pattern(keyword))
+                             for keyword in dict.fromkeys(k.lower() for k in patterns[category] if k)))
+            for category in self.categories
+        ]
+
+    def classify(self, text: str) -> Optional[str]:
+        """
+        返回文本中优先级最高的错误类别
+
+        Args:
+            text: 工具输出
+
+        Returns:
+            错误类别名，未命中时返回 None
+        """
+        if not text:
+            return None
+
+        lowered = text.lower()
+        for category, keywords in self._compiled:
+            for keyword, guarded in keywords:
+                if keyword in lowered and guarded.search(lowered):
+                    return category
+        return None
+
+    def is_error(self, text: str) -> bool:
+        """判断文本是否包含任何错误模式"""
+        return self.classify(text) is not None
+
+
+def load_error_classifier(config: Optional[Dict] = None) -> ErrorClassifier:
+    """
+    根据配置构建错误分类器
+
+    Args:
+        config: v3 配置（读取 claudeception.error_patterns，缺省使用内置模式）
+
+    Returns:
+        错误分类器
+    """
+    patterns = (config or {}).get('claudeception', {}).get('error_patterns') or DEFAULT_ERROR_PATTERNS
+    return ErrorClassifier(patterns)
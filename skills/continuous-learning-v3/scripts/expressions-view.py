@@ -6,12 +6,13 @@ Reads communication-domain instincts from ~/.claude/homunculus/instincts/
 and generates a formatted expressions table at ~/.claude/homunculus/views/expressions.md
 """
 
-import os
 import re
 import sys
 from pathlib import Path
 from datetime import datetime
 
+from instinct_store import open_store
+
 HOMUNCULUS_DIR = Path.home() / ".claude" / "homunculus"
 INSTINCTS_DIR = HOMUNCULUS_DIR / "instincts"
 VIEWS_DIR = HOMUNCULUS_DIR / "views"
@@ -23,67 +24,9 @@ SUBTYPE_LABELS = {
 }
 
 
-def parse_instinct_file(content: str) -> list[dict]:
-    """Parse YAML-like instinct file format."""
-    instincts = []
-    current = {}
-    in_frontmatter = False
-    content_lines = []
-
-    for line in content.split('\n'):
-        if line.strip() == '---':
-            if in_frontmatter:
-                in_frontmatter = False
-                if current:
-                    current['content'] = '\n'.join(content_lines).strip()
-                    instincts.append(current)
-                    current = {}
-                    content_lines = []
-            else:
-                in_frontmatter = True
-                if current:
-                    current['content'] = '\n'.join(content_lines).strip()
-                    instincts.append(current)
-                current = {}
-                content_lines = []
-        elif in_frontmatter:
-            if ':' in line:
-                key, value = line.split(':', 1)
-                key = key.strip()
-                value = value.strip().strip('"').strip("'")
-                if key == 'confidence':
-                    current[key] = float(value)
-                else:
-                    current[key] = value
-        else:
-            content_lines.append(line)
-
-    if current:
-        current['content'] = '\n'.join(content_lines).strip()
-        instincts.append(current)
-
-    return [i for i in instincts if i.get('id')]
-
-
 def load_communication_instincts() -> list[dict]:
-    """Load all communication-domain instincts."""
-    instincts = []
-
-    for directory in [INSTINCTS_DIR / "personal", INSTINCTS_DIR / "inherited"]:
-        if not directory.exists():
-            continue
-        for file in directory.glob("*.yaml"):
-            try:
-                content = file.read_text()
-                parsed = parse_instinct_file(content)
-                for inst in parsed:
-                    if inst.get('domain') == 'communication':
-                        inst['_source_file'] = str(file)
-                        instincts.append(inst)
-            except Exception as e:
-                print(f"Warning: Failed to parse {file}: {e}", file=sys.stderr)
-
-    return instincts
+    """Load all communication-domain instincts (indexed query on the instinct store)."""
+    return open_store().query(domain='communication')
 
 
 def extract_expression_pair(inst: dict) -> tuple[str, str]:
@@ -7,6 +7,8 @@ Aggregates data from:
 - Learned Skills (~/.claude/skills/learned/*.md)
 - Instincts (~/.claude/homunculus/instincts/personal/*.yaml)
 - File-Memory (.claude/plans/*/progress.md, task_plan.md)
+- Observations (~/.claude/homunculus/observations.jsonl + compressed archive,
+  summarized from per-frame indexes without decompressing the whole history)
 
 Usage:
   growth-report.py [days]              # Default 7 days
@@ -18,10 +20,13 @@ import argparse
 import re
 import sys
 from pathlib import Path
-from datetime import datetime, timedelta
-from collections import defaultdict, Counter
+from datetime import datetime, timedelta, timezone
+from collections import Counter
 from typing import Dict, List, Optional
 
+from instinct_store import open_store
+from observation_store import DEFAULT_STORE_PATH, ObservationStore
+
 
 # ─────────────────────────────────────────────
 # Configuration
@@ -29,7 +34,7 @@ from typing import Dict, List, Optional
 
 SESSIONS_DIR = Path.home() / ".claude" / "sessions"
 LEARNED_SKILLS_DIR = Path.home() / ".claude" / "skills" / "learned"
-INSTINCTS_DIR = Path.home() / ".claude" / "homunculus" / "instincts" / "personal"
+OBSERVATIONS_FILE = DEFAULT_STORE_PATH
 
 
 # ─────────────────────────────────────────────
@@ -40,6 +45,7 @@ class GrowthReportGenerator:
     def __init__(self, days: int = 7):
         self.days = days
         self.cutoff_date = datetime.now() - timedelta(days=days)
+        self._observation_summary: Optional[Dict] = None
 
     def _is_recent(self, file_path: Path) -> bool:
         """Check if file was modified within the time window."""
@@ -91,6 +97,17 @@ class GrowthReportGenerator:
             print(f"Warning: Failed to parse session file {file_path}: {e}", file=sys.stderr)
             return None
 
+    def extract_observation_summary(self) -> Dict:
+        """Summarize observed tool events in the time window (cached per report)."""
+        if self._observation_summary is None:
+            since = datetime.now(timezone.utc) - timedelta(days=self.days)
+            try:
+                self._observation_summary = ObservationStore(OBSERVATIONS_FILE).summarize(since=since)
+            except OSError as e:
+                print(f"Warning: Failed to read observations: {e}", file=sys.stderr)
+                self._observation_summary = {'observations': 0, 'sessions': [], 'tools': {}, 'errors': {}}
+        return self._observation_summary
+
     def extract_work_overview(self) -> Dict:
         """Extract work overview from session files."""
         if not SESSIONS_DIR.exists():
@@ -156,57 +173,13 @@ class GrowthReportGenerator:
             print(f"Warning: Failed to parse learned skill {file_path}: {e}", file=sys.stderr)
             return None
 
-    def _parse_instinct_file(self, content: str) -> List[Dict]:
-        """Parse YAML-like instinct file format (reused from instinct-cli.py)."""
-        instincts = []
-        current = {}
-        in_frontmatter = False
-        content_lines = []
-
-        for line in content.split('\n'):
-            if line.strip() == '---':
-                if in_frontmatter:
-                    in_frontmatter = False
-                    if current:
-                        current['content'] = '\n'.join(content_lines).strip()
-                        instincts.append(current)
-                        current = {}
-                        content_lines = []
-                else:
-                    in_frontmatter = True
-                    if current:
-                        current['content'] = '\n'.join(content_lines).strip()
-                        instincts.append(current)
-                    current = {}
-                    content_lines = []
-            elif in_frontmatter:
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    key = key.strip()
-                    value = value.strip().strip('"').strip("'")
-                    if key == 'confidence':
-                        current[key] = float(value)
-                    else:
-                        current[key] = value
-            else:
-                content_lines.append(line)
-
-        if current:
-            current['content'] = '\n'.join(content_lines).strip()
-            instincts.append(current)
-
-        return [i for i in instincts if i.get('id')]
-
-    def _parse_instincts(self, file_path: Path) -> List[Dict]:
-        """Parse instincts from a YAML file."""
-        try:
-            content = file_path.read_text()
-            instincts = self._parse_instinct_file(content)
-            # Filter high-confidence instincts (>=0.7)
-            return [i for i in instincts if i.get('confidence', 0) >= 0.7]
-        except Exception as e:
-            print(f"Warning: Failed to parse instinct file {file_path}: {e}", file=sys.stderr)
-            return []
+    def _recent_instincts(self, min_confidence: float) -> List[Dict]:
+        """Personal instincts modified in the time window (indexed query on the instinct store)."""
+        return open_store().query(
+            source_type='personal',
+            min_confidence=min_confidence,
+            modified_since=self.cutoff_date.timestamp()
+        )
 
     def extract_learned_patterns(self) -> List[Dict]:
         """Extract learned patterns from Learned Skills and Instincts."""
@@ -221,20 +194,16 @@ class GrowthReportGenerator:
                         parsed['type'] = 'skill'
                         patterns.append(parsed)
 
-        # Extract from Instincts
-        if INSTINCTS_DIR.exists():
-            for file in INSTINCTS_DIR.glob("*.yaml"):
-                if self._is_recent(file):
-                    instincts = self._parse_instincts(file)
-                    for inst in instincts:
-                        patterns.append({
-                            'type': 'instinct',
-                            'title': inst.get('id', 'unknown'),
-                            'trigger': inst.get('trigger', ''),
-                            'confidence': inst.get('confidence', 0.5),
-                            'domain': inst.get('domain', 'general'),
-                            'file': str(file)
-                        })
+        # Extract from Instincts (high-confidence, >=0.7)
+        for inst in self._recent_instincts(0.7):
+            patterns.append({
+                'type': 'instinct',
+                'title': inst.get('id', 'unknown'),
+                'trigger': inst.get('trigger', ''),
+                'confidence': inst.get('confidence', 0.5),
+                'domain': inst.get('domain', 'general'),
+                'file': inst['_source_file']
+            })
 
         return patterns
 
@@ -296,7 +265,7 @@ class GrowthReportGenerator:
             return []
 
     def extract_recurring_challenges(self) -> List[Dict]:
-        """Extract recurring challenges from File-Memory."""
+        """Extract recurring challenges from File-Memory and observed tool errors."""
         all_errors = []
 
         # Search for .claude/plans/*/progress.md and task_plan.md
@@ -316,8 +285,9 @@ class GrowthReportGenerator:
                     if plan_file.exists() and self._is_recent(plan_file):
                         all_errors.extend(self._extract_errors_from_plan(plan_file))
 
-        # Aggregate errors by type
+        # Aggregate errors by type, plus error categories seen in tool output
         error_counts = Counter(e['error'] for e in all_errors)
+        error_counts.update(self.extract_observation_summary()['errors'])
 
         # Return top errors
         return [
@@ -331,7 +301,8 @@ class GrowthReportGenerator:
 
     def _map_error_to_suggestion(self, error_type: str, count: int) -> str:
         """Map error type to actionable suggestion (rule engine)."""
-        error_lower = error_type.lower()
+        # Observation error categories are snake_case (file_not_found, import_error, ...)
+        error_lower = error_type.lower().replace('_', '')
 
         # File-related errors
         if 'filenotfound' in error_lower or 'no such file' in error_lower:
@@ -384,19 +355,12 @@ class GrowthReportGenerator:
         """Extract strengths from high-confidence instincts (>=0.8)."""
         strengths = []
 
-        if not INSTINCTS_DIR.exists():
-            return strengths
-
-        for file in INSTINCTS_DIR.glob("*.yaml"):
-            if self._is_recent(file):
-                instincts = self._parse_instincts(file)
-                for inst in instincts:
-                    if inst.get('confidence', 0) >= 0.8:
-                        strengths.append({
-                            'pattern': inst.get('trigger', inst.get('id', 'unknown')),
-                            'confidence': inst.get('confidence', 0.8),
-                            'domain': inst.get('domain', 'general')
-                        })
+        for inst in self._recent_instincts(0.8):
+            strengths.append({
+                'pattern': inst.get('trigger', inst.get('id', 'unknown')),
+                'confidence': inst.get('confidence', 0.8),
+                'domain': inst.get('domain', 'general')
+            })
 
         return strengths
 
@@ -424,6 +388,11 @@ class GrowthReportGenerator:
         lines.append(f"  完成任务: {len(overview['tasks'])}")
         if overview['tools']:
             lines.append(f"  使用工具: {', '.join(overview['tools'][:10])}")
+        observed = self.extract_observation_summary()
+        if observed['observations']:
+            lines.append(f"  观测事件: {observed['observations']} 条 ({len(observed['sessions'])} 个会话)")
+            top_tools = Counter(observed['tools']).most_common(5)
+            lines.append(f"  高频工具: {', '.join(f'{tool} ×{count}' for tool, count in top_tools)}")
         lines.append("")
 
         # 2. Learned Patterns
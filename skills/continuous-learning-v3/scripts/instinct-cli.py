@@ -4,22 +4,36 @@ Instinct CLI - Manage instincts for Continuous Learning v2
 
 Commands:
   status   - Show all instincts and their status
-  import   - Import instincts from file or URL
+  import   - Import instincts from files, URLs or manifests
   export   - Export instincts to file
   evolve   - Cluster instincts into skills/commands/agents
 """
 
 import argparse
+import gzip
 import json
 import os
 import sys
 import re
-import urllib.request
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 from typing import Optional
 
+from config_loader import load_config
+from instinct_cluster import (
+    DEFAULT_MIN_CLUSTER_SIZE,
+    DEFAULT_SIMILARITY_THRESHOLD,
+    SignatureCache,
+    cluster_instincts,
+    cluster_label,
+)
+from instinct_evolve import generate_artifacts
+from instinct_parser import format_scalar, iter_instincts
+from instinct_sources import HttpCache, is_url, read_manifest
+from instinct_store import open_store
+from observation_store import ObservationStore
+
 # ─────────────────────────────────────────────
 # Configuration
 # ─────────────────────────────────────────────
@@ -31,80 +45,22 @@ INHERITED_DIR = INSTINCTS_DIR / "inherited"
 EVOLVED_DIR = HOMUNCULUS_DIR / "evolved"
 OBSERVATIONS_FILE = HOMUNCULUS_DIR / "observations.jsonl"
 
+# Import writes accepted instincts in chunks and previews the first few per category
+IMPORT_CHUNK_SIZE = 500
+IMPORT_PREVIEW_SIZE = 20
+
 # Ensure directories exist
 for d in [PERSONAL_DIR, INHERITED_DIR, EVOLVED_DIR / "skills", EVOLVED_DIR / "commands", EVOLVED_DIR / "agents"]:
     d.mkdir(parents=True, exist_ok=True)
 
 
 # ─────────────────────────────────────────────
-# Instinct Parser
+# Instinct Loading
 # ─────────────────────────────────────────────
 
-def parse_instinct_file(content: str) -> list[dict]:
-    """Parse YAML-like instinct file format."""
-    instincts = []
-    current = {}
-    in_frontmatter = False
-    content_lines = []
-
-    for line in content.split('\n'):
-        if line.strip() == '---':
-            if in_frontmatter:
-                # End of frontmatter
-                in_frontmatter = False
-                if current:
-                    current['content'] = '\n'.join(content_lines).strip()
-                    instincts.append(current)
-                    current = {}
-                    content_lines = []
-            else:
-                # Start of frontmatter
-                in_frontmatter = True
-                if current:
-                    current['content'] = '\n'.join(content_lines).strip()
-                    instincts.append(current)
-                current = {}
-                content_lines = []
-        elif in_frontmatter:
-            # Parse YAML-like frontmatter
-            if ':' in line:
-                key, value = line.split(':', 1)
-                key = key.strip()
-                value = value.strip().strip('"').strip("'")
-                if key == 'confidence':
-                    current[key] = float(value)
-                else:
-                    current[key] = value
-        else:
-            content_lines.append(line)
-
-    # Don't forget the last instinct
-    if current:
-        current['content'] = '\n'.join(content_lines).strip()
-        instincts.append(current)
-
-    return [i for i in instincts if i.get('id')]
-
-
 def load_all_instincts() -> list[dict]:
-    """Load all instincts from personal and inherited directories."""
-    instincts = []
-
-    for directory in [PERSONAL_DIR, INHERITED_DIR]:
-        if not directory.exists():
-            continue
-        for file in directory.glob("*.yaml"):
-            try:
-                content = file.read_text()
-                parsed = parse_instinct_file(content)
-                for inst in parsed:
-                    inst['_source_file'] = str(file)
-                    inst['_source_type'] = directory.name
-                instincts.extend(parsed)
-            except Exception as e:
-                print(f"Warning: Failed to parse {file}: {e}", file=sys.stderr)
-
-    return instincts
+    """Load all instincts from personal and inherited directories (via the SQLite index)."""
+    return open_store().all()
 
 
 # ─────────────────────────────────────────────
@@ -113,7 +69,8 @@ def load_all_instincts() -> list[dict]:
 
 def cmd_status(args):
     """Show status of all instincts."""
-    instincts = load_all_instincts()
+    store = open_store()
+    instincts = store.all()
 
     if not instincts:
         print("No instincts found.")
@@ -134,10 +91,19 @@ def cmd_status(args):
     print(f"{'='*60}\n")
 
     # Summary by source
-    personal = [i for i in instincts if i.get('_source_type') == 'personal']
-    inherited = [i for i in instincts if i.get('_source_type') == 'inherited']
-    print(f"  Personal:  {len(personal)}")
-    print(f"  Inherited: {len(inherited)}")
+    by_source = store.count_by('source_type')
+    print(f"  Personal:  {by_source.get('personal', 0)}")
+    print(f"  Inherited: {by_source.get('inherited', 0)}")
+
+    # max_instincts cap on personal instincts (lowest confidence first)
+    max_instincts = load_config().get('instincts', {}).get('max_instincts')
+    if max_instincts:
+        excess = store.excess(max_instincts)
+        if excess:
+            print(f"  Over max_instincts ({max_instincts}) by {len(excess)}; lowest confidence:")
+            for inst in excess[:5]:
+                print(f"    - {inst.get('id')} ({inst.get('confidence', 0.5):.2f})")
+            print("    Run instinct-manager.py cleanup to archive the lowest-value instincts")
     print()
 
     # Print by domain
@@ -185,12 +151,22 @@ def cmd_status(args):
 
                 print()
 
-    # Observations stats
-    if OBSERVATIONS_FILE.exists():
-        obs_count = sum(1 for _ in open(OBSERVATIONS_FILE))
+    # Observations stats (archived segments are counted from their index)
+    store = ObservationStore(OBSERVATIONS_FILE)
+    segments = store.segments()
+    if OBSERVATIONS_FILE.exists() or len(segments) > 1:
+        obs_count = sum(segment.count_lines() for segment in segments)
         print(f"─────────────────────────────────────────────────────────")
         print(f"  Observations: {obs_count} events logged")
         print(f"  File: {OBSERVATIONS_FILE}")
+        archived = [segment.index() for segment in segments if not segment.active]
+        if archived:
+            frames = sum(len(index.get('frames', [])) for index in archived)
+            size_mb = sum(index['bytes'] for index in archived) / 1024 / 1024
+            first = min((i['first_ts'] for i in archived if i['first_ts']), default='?')
+            last = max((i['last_ts'] for i in archived if i['last_ts']), default='?')
+            print(f"  Archived segments: {len(archived)} ({store.archive_dir})")
+            print(f"  Archive: {frames} compressed frames, {size_mb:.1f} MB, {first} → {last}")
 
     print(f"\n{'='*60}\n")
 
@@ -199,120 +175,227 @@ def cmd_status(args):
 # Import Command
 # ─────────────────────────────────────────────
 
-def cmd_import(args):
-    """Import instincts from file or URL."""
-    source = args.source
+def _format_imported(inst: dict, source: str) -> str:
+    """Render one imported instinct for the inherited directory."""
+    output = "---\n"
+    output += f"id: {format_scalar(inst.get('id'))}\n"
+    output += f"trigger: {format_scalar(inst.get('trigger', 'unknown'))}\n"
+    output += f"confidence: {format_scalar(inst.get('confidence', 0.5))}\n"
+    output += f"domain: {format_scalar(inst.get('domain', 'general'))}\n"
+    output += f"source: inherited\n"
+    output += f"imported_from: {format_scalar(source)}\n"
+    if inst.get('source_repo'):
+        output += f"source_repo: {format_scalar(inst.get('source_repo'))}\n"
+    output += "---\n\n"
+    output += inst.get('content', '') + "\n\n"
+    return output
+
+
+def _resolve_import_sources(args) -> Optional[list[tuple[str, Path]]]:
+    """Expand sources and manifests, fetch URLs through the HTTP cache.
+
+    Returns (source, local path) pairs in the given order, or None when
+    nothing can be imported. Unreachable URLs are reported and skipped.
+    """
+    sources = list(args.sources)
+    for manifest in args.manifest or []:
+        try:
+            sources += read_manifest(Path(manifest))
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Error reading manifest {manifest}: {e}", file=sys.stderr)
+            return None
+    sources = list(dict.fromkeys(sources))
+    if not sources:
+        print("No sources to import.", file=sys.stderr)
+        return None
+
+    for source in sources:
+        if not is_url(source) and not Path(source).expanduser().exists():
+            print(f"File not found: {Path(source).expanduser()}", file=sys.stderr)
+            return None
+
+    urls = [source for source in sources if is_url(source)]
+    fetched = {}
+    if urls:
+        print(f"Fetching {len(urls)} URL(s)...")
+        fetched, errors = HttpCache().fetch_all(urls)
+        for url, (_, cached) in fetched.items():
+            print(f"  {'cached ' if cached else 'fetched'} {url}")
+        for url, error in errors:
+            print(f"Error fetching {url}: {error}", file=sys.stderr)
+
+    resolved = [(source, fetched[source][0] if is_url(source) else Path(source).expanduser())
+                for source in sources if not is_url(source) or source in fetched]
+    return resolved or None
+
+
+def _iter_source_instincts(resolved: list[tuple[str, Path]], failed: set, skipped: set):
+    """Yield (source index, ordinal, instinct) across all sources, streaming each file.
+
+    Invalid records are reported once (tracked in `skipped`) and skipped.
+    Sources that fail to read are reported once, added to `failed` and
+    skipped from then on.
+    """
+    for index, (source, path) in enumerate(resolved):
+        if index in failed:
+            continue
+
+        def skip(error: ValueError, index=index, source=source):
+            if (index, str(error)) not in skipped:
+                skipped.add((index, str(error)))
+                print(f"Skipping invalid instinct in {source}: {error}", file=sys.stderr)
 
-    # Fetch content
-    if source.startswith('http://') or source.startswith('https://'):
-        print(f"Fetching from URL: {source}")
         try:
-            with urllib.request.urlopen(source) as response:
-                content = response.read().decode('utf-8')
-        except Exception as e:
-            print(f"Error fetching URL: {e}", file=sys.stderr)
-            return 1
-    else:
-        path = Path(source).expanduser()
-        if not path.exists():
-            print(f"File not found: {path}", file=sys.stderr)
-            return 1
-        content = path.read_text()
-
-    # Parse instincts
-    new_instincts = parse_instinct_file(content)
-    if not new_instincts:
+            with open(path, 'r', encoding='utf-8') as stream:
+                for ordinal, inst in enumerate(iter_instincts(stream, on_error=skip)):
+                    inst['id'] = str(inst['id'])
+                    yield index, ordinal, inst
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            print(f"Error reading {source}: {e}", file=sys.stderr)
+            failed.add(index)
+
+
+def _dedup_source_instincts(resolved: list[tuple[str, Path]], failed: set, skipped: set):
+    """Pick the copy to keep for every instinct id across the sources.
+
+    Returns (best, found): id → (confidence, source index, ordinal) of the
+    most confident copy, and the number of instincts read from sources that
+    did not fail.
+    """
+    best = {}
+    found = {}
+    for index, ordinal, inst in _iter_source_instincts(resolved, failed, skipped):
+        found[index] = found.get(index, 0) + 1
+        confidence = inst.get('confidence', 0.5)
+        kept = best.get(inst['id'])
+        if kept is None or confidence > kept[0]:
+            best[inst['id']] = (confidence, index, ordinal)
+    return best, sum(count for index, count in found.items() if index not in failed)
+
+
+def cmd_import(args):
+    """Import instincts from files, URLs and manifests.
+
+    URLs are fetched concurrently through an on-disk HTTP cache that
+    honours ETag/Last-Modified. A first streaming pass over all sources
+    picks, for every id, the copy with the highest confidence. A second
+    pass classifies the winners as add/update/skip against an id →
+    confidence map of the existing instincts and writes accepted ones
+    in chunks to a temporary file, renamed into place once confirmed.
+    """
+    resolved = _resolve_import_sources(args)
+    if resolved is None:
+        return 1
+
+    # Existing instincts: id → highest confidence (one indexed query, ids as text)
+    existing = {str(inst_id): confidence for inst_id, confidence in open_store().confidence_by_id().items()}
+    min_conf = args.min_confidence or 0.0
+
+    # Dedup pass; a source that fails part-way contributes nothing, so rescan
+    # the remaining sources until none fails
+    failed = set()
+    skipped = set()
+    while True:
+        failures = len(failed)
+        best, found = _dedup_source_instincts(resolved, failed, skipped)
+        if len(failed) == failures:
+            break
+
+    if not best:
         print("No valid instincts found in source.")
         return 1
 
-    print(f"\nFound {len(new_instincts)} instincts to import.\n")
-
-    # Load existing
-    existing = load_all_instincts()
-    existing_ids = {i.get('id') for i in existing}
-
-    # Categorize
-    to_add = []
-    duplicates = []
-    to_update = []
-
-    for inst in new_instincts:
-        inst_id = inst.get('id')
-        if inst_id in existing_ids:
-            # Check if we should update
-            existing_inst = next((e for e in existing if e.get('id') == inst_id), None)
-            if existing_inst:
-                if inst.get('confidence', 0) > existing_inst.get('confidence', 0):
-                    to_update.append(inst)
+    counts = {'add': 0, 'update': 0, 'skip': 0}
+    preview = {'add': [], 'update': [], 'skip': []}
+
+    timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    if len(resolved) > 1:
+        source_name = 'bulk-import'
+    else:
+        source_name = Path(resolved[0][0]).stem if not is_url(resolved[0][0]) else 'web-import'
+    output_file = INHERITED_DIR / f"{source_name}-{timestamp}.yaml"
+    # Not *.yaml, so the index ignores it until it is renamed into place
+    tmp_file = INHERITED_DIR / f".{output_file.name}.tmp"
+
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as out:
+            out.write(''.join(f"# Imported from {source}\n" for source, _ in resolved))
+            out.write(f"# Date: {datetime.now().isoformat()}\n\n")
+            chunk = []
+            for index, ordinal, inst in _iter_source_instincts(resolved, failed, skipped):
+                inst_id = inst['id']
+                if best[inst_id][1:] != (index, ordinal):
+                    continue
+                confidence = inst.get('confidence', 0.5)
+
+                if inst_id in existing:
+                    # Update only when the incoming copy is more confident
+                    action = 'update' if inst.get('confidence', 0) > existing[inst_id] else 'skip'
                 else:
-                    duplicates.append(inst)
-        else:
-            to_add.append(inst)
+                    action = 'add'
+                if action != 'skip' and confidence < min_conf:
+                    continue
+
+                counts[action] += 1
+                if len(preview[action]) < IMPORT_PREVIEW_SIZE:
+                    preview[action].append((inst_id, confidence))
+                if action != 'skip':
+                    chunk.append(_format_imported(inst, resolved[index][0]))
+                    if len(chunk) >= IMPORT_CHUNK_SIZE:
+                        out.write(''.join(chunk))
+                        chunk = []
+            out.write(''.join(chunk))
+        if len(failed) != failures:
+            raise OSError("a source failed while writing the import")
+    except OSError as e:
+        tmp_file.unlink(missing_ok=True)
+        print(f"Error writing {tmp_file}: {e}", file=sys.stderr)
+        return 1
 
-    # Filter by minimum confidence
-    min_conf = args.min_confidence or 0.0
-    to_add = [i for i in to_add if i.get('confidence', 0.5) >= min_conf]
-    to_update = [i for i in to_update if i.get('confidence', 0.5) >= min_conf]
+    print(f"\nFound {found} instincts to import.\n")
+    if found > len(best):
+        print(f"Merged {found - len(best)} duplicate ids across sources (kept the highest confidence).\n")
 
     # Display summary
-    if to_add:
-        print(f"NEW ({len(to_add)}):")
-        for inst in to_add:
-            print(f"  + {inst.get('id')} (confidence: {inst.get('confidence', 0.5):.2f})")
-
-    if to_update:
-        print(f"\nUPDATE ({len(to_update)}):")
-        for inst in to_update:
-            print(f"  ~ {inst.get('id')} (confidence: {inst.get('confidence', 0.5):.2f})")
-
-    if duplicates:
-        print(f"\nSKIP ({len(duplicates)} - already exists with equal/higher confidence):")
-        for inst in duplicates[:5]:
-            print(f"  - {inst.get('id')}")
-        if len(duplicates) > 5:
-            print(f"  ... and {len(duplicates) - 5} more")
+    for action, title, marker in (('add', 'NEW', '+'), ('update', '\nUPDATE', '~')):
+        if counts[action]:
+            print(f"{title} ({counts[action]}):")
+            for inst_id, confidence in preview[action]:
+                print(f"  {marker} {inst_id} (confidence: {confidence:.2f})")
+            if counts[action] > len(preview[action]):
+                print(f"  ... and {counts[action] - len(preview[action])} more")
+
+    if counts['skip']:
+        print(f"\nSKIP ({counts['skip']} - already exists with equal/higher confidence):")
+        for inst_id, _ in preview['skip'][:5]:
+            print(f"  - {inst_id}")
+        if counts['skip'] > 5:
+            print(f"  ... and {counts['skip'] - 5} more")
 
     if args.dry_run:
+        tmp_file.unlink(missing_ok=True)
         print("\n[DRY RUN] No changes made.")
         return 0
 
-    if not to_add and not to_update:
+    if not counts['add'] and not counts['update']:
+        tmp_file.unlink(missing_ok=True)
         print("\nNothing to import.")
         return 0
 
     # Confirm
     if not args.force:
-        response = input(f"\nImport {len(to_add)} new, update {len(to_update)}? [y/N] ")
+        response = input(f"\nImport {counts['add']} new, update {counts['update']}? [y/N] ")
         if response.lower() != 'y':
+            tmp_file.unlink(missing_ok=True)
             print("Cancelled.")
             return 0
 
     # Write to inherited directory
-    timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
-    source_name = Path(source).stem if not source.startswith('http') else 'web-import'
-    output_file = INHERITED_DIR / f"{source_name}-{timestamp}.yaml"
-
-    all_to_write = to_add + to_update
-    output_content = f"# Imported from {source}\n# Date: {datetime.now().isoformat()}\n\n"
-
-    for inst in all_to_write:
-        output_content += "---\n"
-        output_content += f"id: {inst.get('id')}\n"
-        output_content += f"trigger: \"{inst.get('trigger', 'unknown')}\"\n"
-        output_content += f"confidence: {inst.get('confidence', 0.5)}\n"
-        output_content += f"domain: {inst.get('domain', 'general')}\n"
-        output_content += f"source: inherited\n"
-        output_content += f"imported_from: \"{source}\"\n"
-        if inst.get('source_repo'):
-            output_content += f"source_repo: {inst.get('source_repo')}\n"
-        output_content += "---\n\n"
-        output_content += inst.get('content', '') + "\n\n"
-
-    output_file.write_text(output_content)
+    os.replace(tmp_file, output_file)
 
     print(f"\n✅ Import complete!")
-    print(f"   Added: {len(to_add)}")
-    print(f"   Updated: {len(to_update)}")
+    print(f"   Added: {counts['add']}")
+    print(f"   Updated: {counts['update']}")
     print(f"   Saved to: {output_file}")
 
     return 0
@@ -322,47 +405,148 @@ def cmd_import(args):
 # Export Command
 # ─────────────────────────────────────────────
 
+def _format_exported(inst: dict) -> str:
+    """Render one instinct in the YAML-like export format."""
+    output = "---\n"
+    for key in ['id', 'trigger', 'confidence', 'domain', 'source', 'source_repo']:
+        if inst.get(key):
+            output += f"{key}: {format_scalar(inst[key])}\n"
+    output += "---\n\n"
+    output += inst.get('content', '') + "\n\n"
+    return output
+
+
+def _format_exported_json(inst: dict) -> str:
+    """Render one instinct as a JSONL record (index bookkeeping fields dropped)."""
+    record = {k: v for k, v in inst.items() if not k.startswith('_')}
+    return json.dumps(record, ensure_ascii=False, default=str) + "\n"
+
+
+class _ExportWriter:
+    """Stream rendered instincts to stdout, one file, or shards by domain/size."""
+
+    def __init__(self, output: Optional[str], header: str, shard_by: Optional[str] = None,
+                 shard_size: int = 0, compress: bool = False):
+        self.output = Path(output) if output else None
+        self.header = header
+        self.shard_by = shard_by
+        self.shard_size = shard_size
+        self.compress = compress or (output or '').endswith('.gz')
+        self.files = {}     # shard key -> (path, binary stream)
+        self.written = {}   # path -> [instincts, bytes]
+        self.part = 0
+        self.shards = 0
+
+    def _path(self, key: str) -> Path:
+        base = self.output.with_suffix('') if self.output.suffix == '.gz' else self.output
+        if key:
+            base = base.with_name(f"{base.stem}.{key}{base.suffix or '.yaml'}")
+        return base.with_name(base.name + '.gz') if self.compress else base
+
+    def _open(self, key: str):
+        if self.output is None:
+            path, stream = Path('-'), sys.stdout.buffer
+            if self.compress:
+                stream = gzip.GzipFile(fileobj=stream, mode='wb')
+        else:
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            stream = gzip.open(path, 'wb') if self.compress else open(path, 'wb', buffering=1 << 20)
+        self.files[key] = (path, stream)
+        self.written[path] = [0, 0]
+        if self.header:
+            header = self.header
+            if key:
+                # The header is written before the shard's instincts are known, so
+                # shards carry their index instead of a count
+                self.shards += 1
+                header = f"{header.rstrip()}\n# Shard: {self.shards} ({key})\n\n"
+            stream.write(header.encode('utf-8'))
+        return path, stream
+
+    def _close(self, key: str) -> None:
+        path, stream = self.files.pop(key)
+        if stream is sys.stdout.buffer:
+            stream.flush()
+        else:
+            stream.close()
+
+    def write(self, inst: dict, text: str) -> None:
+        data = text.encode('utf-8')
+        if self.shard_by == 'domain':
+            key = re.sub(r'[^\w.-]', '_', inst.get('domain') or 'general')
+        elif self.shard_by == 'size':
+            key = f"part-{self.part:04d}"
+            current = self.files.get(key)
+            if current and self.written[current[0]][1] + len(data) > self.shard_size \
+                    and self.written[current[0]][0]:
+                self._close(key)
+                self.part += 1
+                key = f"part-{self.part:04d}"
+        else:
+            key = ''
+
+        path, stream = self.files.get(key) or self._open(key)
+        stream.write(data)
+        self.written[path][0] += 1
+        self.written[path][1] += len(data)
+
+    def close(self) -> dict:
+        """Close all outputs; returns path -> number of instincts written."""
+        for key in list(self.files):
+            self._close(key)
+        return {path: counts[0] for path, counts in self.written.items()}
+
+
 def cmd_export(args):
-    """Export instincts to file."""
-    instincts = load_all_instincts()
+    """Export instincts to file.
 
-    if not instincts:
+    Instincts are streamed from the index straight into the output, so
+    the export never holds the whole set in memory. The output can be
+    sharded by domain or size, gzip-compressed, and written as YAML-like
+    blocks (importable) or JSONL.
+    """
+    store = open_store()
+
+    if not store.count():
         print("No instincts to export.")
         return 1
 
-    # Filter by domain if specified
-    if args.domain:
-        instincts = [i for i in instincts if i.get('domain') == args.domain]
+    if args.shard_by and not args.output:
+        print("--shard-by requires --output", file=sys.stderr)
+        return 1
 
-    # Filter by minimum confidence
-    if args.min_confidence:
-        instincts = [i for i in instincts if i.get('confidence', 0.5) >= args.min_confidence]
+    # Filter by domain and minimum confidence (indexed query)
+    filters = {'domain': args.domain, 'min_confidence': args.min_confidence or None}
+    total = store.count(**filters)
 
-    if not instincts:
+    if not total:
         print("No instincts match the criteria.")
         return 1
 
-    # Generate output
-    output = f"# Instincts export\n# Date: {datetime.now().isoformat()}\n# Total: {len(instincts)}\n\n"
-
-    for inst in instincts:
-        output += "---\n"
-        for key in ['id', 'trigger', 'confidence', 'domain', 'source', 'source_repo']:
-            if inst.get(key):
-                value = inst[key]
-                if key == 'trigger':
-                    output += f'{key}: "{value}"\n'
-                else:
-                    output += f"{key}: {value}\n"
-        output += "---\n\n"
-        output += inst.get('content', '') + "\n\n"
+    if args.format == 'jsonl':
+        header, render = '', _format_exported_json
+    else:
+        header = f"# Instincts export\n# Date: {datetime.now().isoformat()}\n"
+        # A sharded export has no single total; each shard is numbered instead
+        header += "\n" if args.shard_by else f"# Total: {total}\n\n"
+        render = _format_exported
+
+    writer = _ExportWriter(args.output, header, shard_by=args.shard_by,
+                           shard_size=int(args.shard_size_mb * 1024 * 1024), compress=args.gzip)
+    try:
+        for inst in store.iter_query(**filters):
+            writer.write(inst, render(inst))
+    finally:
+        written = writer.close()
 
-    # Write to file or stdout
     if args.output:
-        Path(args.output).write_text(output)
-        print(f"Exported {len(instincts)} instincts to {args.output}")
-    else:
-        print(output)
+        if len(written) == 1:
+            print(f"Exported {total} instincts to {next(iter(written))}")
+        else:
+            print(f"Exported {total} instincts to {len(written)} files:")
+            for path, count in written.items():
+                print(f"  {path} ({count})")
 
     return 0
 
@@ -373,7 +557,8 @@ def cmd_export(args):
 
 def cmd_evolve(args):
     """Analyze instincts and suggest evolutions to skills/commands/agents."""
-    instincts = load_all_instincts()
+    store = open_store()
+    instincts = store.all()
 
     if len(instincts) < 3:
         print("Need at least 3 instincts to analyze patterns.")
@@ -394,27 +579,26 @@ def cmd_evolve(args):
     high_conf = [i for i in instincts if i.get('confidence', 0) >= 0.8]
     print(f"High confidence instincts (>=80%): {len(high_conf)}")
 
-    # Find clusters (instincts with similar triggers)
-    trigger_clusters = defaultdict(list)
-    for inst in instincts:
-        trigger = inst.get('trigger', '')
-        # Normalize trigger
-        trigger_key = trigger.lower()
-        for keyword in ['when', 'creating', 'writing', 'adding', 'implementing', 'testing']:
-            trigger_key = trigger_key.replace(keyword, '').strip()
-        trigger_clusters[trigger_key].append(inst)
-
-    # Find clusters with 3+ instincts (good skill candidates)
+    # Find clusters (instincts with similar triggers, MinHash/LSH over trigger tokens)
+    evolution = load_config().get('evolution', {})
+    min_cluster_size = evolution.get('cluster_threshold', DEFAULT_MIN_CLUSTER_SIZE)
+    clusters = cluster_instincts(
+        instincts,
+        threshold=evolution.get('similarity_threshold', DEFAULT_SIMILARITY_THRESHOLD),
+        min_size=min_cluster_size,
+        cache=SignatureCache(store.conn)
+    )
+
+    # Clusters with cluster_threshold+ instincts (good skill candidates)
     skill_candidates = []
-    for trigger, cluster in trigger_clusters.items():
-        if len(cluster) >= 2:
-            avg_conf = sum(i.get('confidence', 0.5) for i in cluster) / len(cluster)
-            skill_candidates.append({
-                'trigger': trigger,
-                'instincts': cluster,
-                'avg_confidence': avg_conf,
-                'domains': list(set(i.get('domain', 'general') for i in cluster))
-            })
+    for cluster in clusters:
+        avg_conf = sum(i.get('confidence', 0.5) for i in cluster) / len(cluster)
+        skill_candidates.append({
+            'trigger': cluster_label(cluster),
+            'instincts': cluster,
+            'avg_confidence': avg_conf,
+            'domains': list(set(i.get('domain', 'general') for i in cluster))
+        })
 
     # Sort by cluster size and confidence
     skill_candidates.sort(key=lambda x: (-len(x['instincts']), -x['avg_confidence']))
@@ -448,7 +632,8 @@ def cmd_evolve(args):
             print()
 
     # Agent candidates (complex multi-step patterns)
-    agent_candidates = [c for c in skill_candidates if len(c['instincts']) >= 3 and c['avg_confidence'] >= 0.75]
+    agent_candidates = [c for c in skill_candidates
+                        if len(c['instincts']) >= max(3, min_cluster_size) and c['avg_confidence'] >= 0.75]
     if agent_candidates:
         print(f"\n## AGENT CANDIDATES ({len(agent_candidates)})\n")
         for cand in agent_candidates[:3]:
@@ -459,10 +644,18 @@ def cmd_evolve(args):
             print()
 
     if args.generate:
-        print("\n[Would generate evolved structures here]")
-        print("  Skills would be saved to:", EVOLVED_DIR / "skills")
-        print("  Commands would be saved to:", EVOLVED_DIR / "commands")
-        print("  Agents would be saved to:", EVOLVED_DIR / "agents")
+        result = generate_artifacts(EVOLVED_DIR, skill_candidates, workflow_instincts, agent_candidates)
+        print(f"\n## GENERATED ({EVOLVED_DIR})\n")
+        print(f"  Written:   {len(result['written'])}")
+        print(f"  Unchanged: {len(result['unchanged'])}")
+        for relpath in result['written']:
+            print(f"    + {relpath}")
+        for relpath in result['edited']:
+            print(f"    ! {relpath} (edited by hand, not overwritten)")
+        for relpath in result['removed']:
+            print(f"    - {relpath} (no longer produced)")
+        for relpath in result['kept']:
+            print(f"    ! {relpath} (no longer produced, kept because it was edited)")
 
     print(f"\n{'='*60}\n")
     return 0
@@ -481,7 +674,9 @@ def main():
 
     # Import
     import_parser = subparsers.add_parser('import', help='Import instincts')
-    import_parser.add_argument('source', help='File path or URL')
+    import_parser.add_argument('sources', nargs='*', help='File paths or URLs')
+    import_parser.add_argument('--manifest', action='append',
+                               help='File listing one source (path or URL) per line; repeatable')
     import_parser.add_argument('--dry-run', action='store_true', help='Preview without importing')
     import_parser.add_argument('--force', action='store_true', help='Skip confirmation')
     import_parser.add_argument('--min-confidence', type=float, help='Minimum confidence threshold')
@@ -491,6 +686,13 @@ def main():
     export_parser.add_argument('--output', '-o', help='Output file')
     export_parser.add_argument('--domain', help='Filter by domain')
     export_parser.add_argument('--min-confidence', type=float, help='Minimum confidence')
+    export_parser.add_argument('--format', choices=['yaml', 'jsonl'], default='yaml',
+                               help='Output format (yaml is importable, jsonl is one record per line)')
+    export_parser.add_argument('--shard-by', choices=['domain', 'size'],
+                               help='Split the export into multiple files (requires --output)')
+    export_parser.add_argument('--shard-size-mb', type=float, default=100,
+                               help='Maximum uncompressed size per file with --shard-by size')
+    export_parser.add_argument('--gzip', action='store_true', help='Compress output with gzip')
 
     # Evolve
     evolve_parser = subparsers.add_parser('evolve', help='Analyze and evolve instincts')
@@ -8,10 +8,20 @@ Instinct Generator for Code Navigation
 import json
 import os
 import re
+import subprocess
+import sys
+import tempfile
 import yaml
-from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from instinct_cache import ParseCache
+from instinct_parser import DOCUMENT_CACHE_NAMESPACE, parse_frontmatter_document
+from instinct_stats import StatsSummary
+
+# 同一次运行内共用，main() 结束时写回
+_parse_cache = ParseCache(DOCUMENT_CACHE_NAMESPACE)
 
 
 def slugify(text: str) -> str:
@@ -35,28 +45,45 @@ def slugify(text: str) -> str:
     return text.strip('-')
 
 
-def get_project_name() -> str:
+@lru_cache(maxsize=1)
+def probe_git() -> Tuple[str, str]:
     """
-    获取当前项目名称
+    一次 git 调用同时取得项目名称和当前 commit(同一次运行内缓存)
 
     Returns:
-        项目名称
+        (项目名称, commit hash)；不在 git 仓库中时项目名称回退为当前目录名，
+        仓库还没有提交时 commit 为 'unknown'
     """
     try:
-        # 尝试从 git 获取
-        import subprocess
         result = subprocess.run(
-            ['git', 'rev-parse', '--show-toplevel'],
+            ['git', 'rev-parse', '--show-toplevel', '--short', 'HEAD'],
             capture_output=True,
-            text=True,
-            check=True
+            text=True
         )
-        project_path = result.stdout.strip()
-        return os.path.basename(project_path)
-    except (subprocess.CalledProcessError, FileNotFoundError, OSError) as e:
-        # 回退到当前目录名
-        print(f"Warning: Failed to get git root, using cwd: {e}", file=sys.stderr)
-        return os.path.basename(os.getcwd())
+    except (FileNotFoundError, OSError) as e:
+        print(f"Warning: Failed to run git, using cwd: {e}", file=sys.stderr)
+        return os.path.basename(os.getcwd()), 'unknown'
+
+    # rev-parse 逐个输出参数的结果，HEAD 不存在时仍会先输出仓库根目录
+    lines = result.stdout.split('\n')
+    toplevel = lines[0].strip() if lines else ''
+    commit = lines[1].strip() if len(lines) > 1 and result.returncode == 0 else ''
+    if not toplevel:
+        print(f"Warning: Failed to get git root, using cwd: {result.stderr.strip()}", file=sys.stderr)
+    elif not commit:
+        print(f"Warning: Failed to get git commit hash: {result.stderr.strip()}", file=sys.stderr)
+    return (os.path.basename(toplevel) if toplevel else os.path.basename(os.getcwd()),
+            commit or 'unknown')
+
+
+def get_project_name() -> str:
+    """
+    获取当前项目名称
+
+    Returns:
+        项目名称
+    """
+    return probe_git()[0]
 
 
 def get_git_commit() -> str:
@@ -66,18 +93,7 @@ def get_git_commit() -> str:
     Returns:
         commit hash
     """
-    try:
-        import subprocess
-        result = subprocess.run(
-            ['git', 'rev-parse', '--short', 'HEAD'],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout.strip()
-    except (subprocess.CalledProcessError, FileNotFoundError, OSError) as e:
-        print(f"Warning: Failed to get git commit hash: {e}", file=sys.stderr)
-        return 'unknown'
+    return probe_git()[1]
 
 
 def load_existing_instinct(instinct_id: str, instincts_dir: Path) -> Optional[Dict]:
@@ -95,20 +111,13 @@ def load_existing_instinct(instinct_id: str, instincts_dir: Path) -> Optional[Di
     if not instinct_file.exists():
         return None
 
-    with open(instinct_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # 分离 frontmatter 和 body
-    parts = content.split('---', 2)
-    if len(parts) < 3:
+    document = _parse_cache.get(instinct_file, parse_frontmatter_document)
+    if document is None:
         return None
 
-    frontmatter = yaml.safe_load(parts[1])
-    body = parts[2].strip()
-
     return {
-        'frontmatter': frontmatter,
-        'body': body,
+        'frontmatter': document['frontmatter'],
+        'body': document['body'],
         'file_path': instinct_file
     }
 
@@ -199,106 +208,39 @@ def update_instinct_body(body: str, updates: Dict) -> str:
     return '\n'.join(new_lines)
 
 
-def create_code_navigation_instinct(
-    pattern: Dict,
-    instincts_dir: Path,
-    config: Dict
-) -> str:
-    """
-    创建或更新代码导航 Instinct
+def instinct_id_for(pattern: Dict) -> str:
+    """模式对应的 Instinct ID(取前 2 个关键词)"""
+    keyword_slug = slugify('-'.join(pattern['keywords'][:2]))
+    return f"code-nav-{keyword_slug}"
 
-    Args:
-        pattern: 检测到的模式
-        instincts_dir: Instincts 目录
-        config: 配置
 
-    Returns:
-        Instinct ID
+def new_instinct(instinct_id: str, pattern: Dict, project_name: str, git_commit: str) -> Dict:
     """
-    # 生成 ID
-    keywords = pattern['keywords']
-    keyword_slug = slugify('-'.join(keywords[:2]))  # 使用前2个关键词
-    instinct_id = f"code-nav-{keyword_slug}"
-
-    # 检查是否已存在
-    existing = load_existing_instinct(instinct_id, instincts_dir)
+    由模式创建新的 Instinct(只在内存中)
 
-    project_name = get_project_name()
-    git_commit = get_git_commit()
+    Returns:
+        {'frontmatter', 'body'}
+    """
     natural_language = pattern['natural_language']
     code_location = pattern['code_location']
     timestamp = pattern['timestamp']
+    file_path = code_location['file_path']
+    function_name = code_location.get('function_name', 'unknown')
+    line_number = code_location.get('line_number', 'unknown')
+
+    frontmatter = {
+        'id': instinct_id,
+        'trigger': f"when user says '{natural_language}' or similar phrases",
+        'domain': 'code-navigation',
+        'subtype': 'semantic-mapping',
+        'confidence': pattern['confidence'],
+        'source': 'session-observation',
+        'project': project_name,
+        'usage_count': 1,
+        'last_used': timestamp
+    }
 
-    if existing:
-        # 更新已存在的 Instinct
-        frontmatter = existing['frontmatter']
-        body = existing['body']
-
-        # 增加置信度
-        current_confidence = frontmatter.get('confidence', 0.5)
-        growth = config['code-navigation']['confidence_growth']['implicit_confirmation']
-        new_confidence = min(
-            current_confidence + growth,
-            config['code-navigation']['confidence_max']
-        )
-        frontmatter['confidence'] = new_confidence
-
-        # 提取现有同义词
-        existing_synonyms = extract_synonyms(body)
-
-        # 添加新同义词(如果不同)
-        if natural_language not in existing_synonyms:
-            existing_synonyms.append(natural_language)
-
-        # 限制同义词数量
-        max_synonyms = config['code-navigation']['max_synonyms_per_mapping']
-        existing_synonyms = existing_synonyms[:max_synonyms]
-
-        # 更新 evidence
-        evidence_lines = [
-            f"User confirmed this mapping on {timestamp}",
-            f"Usage count: {frontmatter.get('usage_count', 0) + 1}",
-            f"Last used: {timestamp}",
-            f"Confirmation method: {code_location['confirmation_method']}"
-        ]
-
-        frontmatter['usage_count'] = frontmatter.get('usage_count', 0) + 1
-        frontmatter['last_used'] = timestamp
-
-        # 更新 body
-        body = update_instinct_body(body, {
-            'synonyms': existing_synonyms,
-            'evidence': evidence_lines
-        })
-
-        # 写入文件
-        with open(existing['file_path'], 'w', encoding='utf-8') as f:
-            f.write('---\n')
-            yaml.dump(frontmatter, f, allow_unicode=True, default_flow_style=False)
-            f.write('---\n\n')
-            f.write(body)
-
-        return instinct_id
-
-    else:
-        # 创建新 Instinct
-        file_path = code_location['file_path']
-        function_name = code_location.get('function_name', 'unknown')
-        line_number = code_location.get('line_number', 'unknown')
-
-        frontmatter = {
-            'id': instinct_id,
-            'trigger': f"when user says '{natural_language}' or similar phrases",
-            'domain': 'code-navigation',
-            'subtype': 'semantic-mapping',
-            'confidence': pattern['confidence'],
-            'source': 'session-observation',
-            'project': project_name,
-            'usage_count': 1,
-            'last_used': timestamp
-        }
-
-        body = f"""# 代码导航：{natural_language}
+    body = f"""# 代码导航：{natural_language}
 
 ## Action
 Navigate to: {file_path}:{function_name}()
@@ -321,22 +263,151 @@ Navigate to: {file_path}:{function_name}()
 - Project: {project_name}
 - Codebase version: {git_commit}
 """
+    return {'frontmatter': frontmatter, 'body': body}
+
+
+def merge_pattern(instinct: Dict, pattern: Dict, config: Dict) -> None:
+    """
+    把再次确认的模式合并进已有 Instinct(只在内存中修改)
+
+    Args:
+        instinct: {'frontmatter', 'body'}
+        pattern: 检测到的模式
+        config: 配置
+    """
+    frontmatter = instinct['frontmatter']
+    natural_language = pattern['natural_language']
+    code_location = pattern['code_location']
+    timestamp = pattern['timestamp']
 
-        # 写入文件
-        instinct_file = instincts_dir / f"{instinct_id}.yaml"
-        with open(instinct_file, 'w', encoding='utf-8') as f:
+    # 增加置信度
+    current_confidence = frontmatter.get('confidence', 0.5)
+    growth = config['code-navigation']['confidence_growth']['implicit_confirmation']
+    frontmatter['confidence'] = min(
+        current_confidence + growth,
+        config['code-navigation']['confidence_max']
+    )
+
+    # 提取现有同义词
+    existing_synonyms = extract_synonyms(instinct['body'])
+
+    # 添加新同义词(如果不同)
+    if natural_language not in existing_synonyms:
+        existing_synonyms.append(natural_language)
+
+    # 限制同义词数量
+    max_synonyms = config['code-navigation']['max_synonyms_per_mapping']
+    existing_synonyms = existing_synonyms[:max_synonyms]
+
+    # 更新 evidence
+    evidence_lines = [
+        f"User confirmed this mapping on {timestamp}",
+        f"Usage count: {frontmatter.get('usage_count', 0) + 1}",
+        f"Last used: {timestamp}",
+        f"Confirmation method: {code_location['confirmation_method']}"
+    ]
+
+    frontmatter['usage_count'] = frontmatter.get('usage_count', 0) + 1
+    frontmatter['last_used'] = timestamp
+
+    # 更新 body
+    instinct['body'] = update_instinct_body(instinct['body'], {
+        'synonyms': existing_synonyms,
+        'evidence': evidence_lines
+    })
+
+
+def write_instinct(file_path: Path, frontmatter: Dict, body: str) -> None:
+    """原子写回 Instinct 文件(临时文件 + rename)"""
+    fd, tmp = tempfile.mkstemp(dir=str(file_path.parent), prefix=f'.{file_path.name}.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
             f.write('---\n')
             yaml.dump(frontmatter, f, allow_unicode=True, default_flow_style=False)
             f.write('---\n\n')
             f.write(body)
+        os.replace(tmp, file_path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
 
-        return instinct_id
+
+def generate_instincts(
+    patterns: List[Dict],
+    instincts_dir: Path,
+    config: Dict,
+    stats: Optional[StatsSummary] = None
+) -> List[str]:
+    """
+    批量创建或更新代码导航 Instincts
+
+    项目名称和 commit 只探测一次；每个目标 Instinct 只读取一次，
+    指向同一 ID 的多个模式按顺序在内存中合并，最后每个文件只写一次。
+
+    Args:
+        patterns: 检测到的模式列表
+        instincts_dir: Instincts 目录
+        config: 配置
+        stats: 统计汇总(写入后增量更新，可选)
+
+    Returns:
+        与 patterns 一一对应的 Instinct ID
+    """
+    instinct_ids = [instinct_id_for(pattern) for pattern in patterns]
+
+    # 预加载所有目标 Instinct: ID → {'frontmatter', 'body', 'file_path'}
+    instincts: Dict[str, Dict] = {}
+    for instinct_id in dict.fromkeys(instinct_ids):
+        existing = load_existing_instinct(instinct_id, instincts_dir)
+        if existing:
+            instincts[instinct_id] = existing
+
+    changed = []
+    for instinct_id, pattern in zip(instinct_ids, patterns):
+        if instinct_id in instincts:
+            merge_pattern(instincts[instinct_id], pattern, config)
+        else:
+            project_name, git_commit = probe_git()
+            instincts[instinct_id] = {
+                **new_instinct(instinct_id, pattern, project_name, git_commit),
+                'file_path': instincts_dir / f"{instinct_id}.yaml"
+            }
+        if instinct_id not in changed:
+            changed.append(instinct_id)
+
+    # 每个文件只写一次
+    for instinct_id in changed:
+        instinct = instincts[instinct_id]
+        write_instinct(instinct['file_path'], instinct['frontmatter'], instinct['body'])
+        if stats is not None:
+            stats.record(instinct['file_path'], instinct['frontmatter'])
+
+    return instinct_ids
+
+
+def create_code_navigation_instinct(
+    pattern: Dict,
+    instincts_dir: Path,
+    config: Dict,
+    stats: Optional[StatsSummary] = None
+) -> str:
+    """
+    创建或更新代码导航 Instinct
+
+    Args:
+        pattern: 检测到的模式
+        instincts_dir: Instincts 目录
+        config: 配置
+        stats: 统计汇总(写入后增量更新，可选)
+
+    Returns:
+        Instinct ID
+    """
+    return generate_instincts([pattern], instincts_dir, config, stats)[0]
 
 
 def main():
     """主函数"""
-    import sys
-
     if len(sys.argv) < 2:
         print("Usage: instinct-generator.py <patterns.json>")
         sys.exit(1)
@@ -357,10 +428,9 @@ def main():
     instincts_dir.mkdir(parents=True, exist_ok=True)
 
     # 生成 Instincts
-    created_ids = []
-    for pattern in patterns:
-        instinct_id = create_code_navigation_instinct(pattern, instincts_dir, config)
-        created_ids.append(instinct_id)
+    with StatsSummary(instincts_dir).transaction() as stats:
+        created_ids = generate_instincts(patterns, instincts_dir, config, stats)
+    _parse_cache.save()
 
     print(json.dumps({
         'created': len(created_ids),
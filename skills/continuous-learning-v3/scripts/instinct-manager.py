@@ -3,225 +3,190 @@
 Instinct Manager for Code Navigation
 
 管理代码导航 Instincts:
-- 更新置信度
-- 添加同义词
-- 应用衰减规则
-- 项目级隔离
+- decay: 按 code-navigation.confidence_decay 规则衰减到期 Instincts 的置信度
+- cleanup: 把低置信度或超出数量上限的 Instincts 移入归档
+- restore: 从归档恢复 Instincts
+- stats: 按项目 / 领域汇总的统计(读取增量维护的 stats.json)
 """
 
 import json
 import os
+import tempfile
 import yaml
-from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
-
-
-def load_config() -> Dict:
-    """加载配置"""
-    config_file = Path(__file__).parent.parent / 'config.json'
-    with open(config_file, 'r') as f:
-        return json.load(f)
-
-
-def load_all_instincts(instincts_dir: Path, domain: str = None) -> List[Dict]:
-    """
-    加载所有 Instincts
-
-    Args:
-        instincts_dir: Instincts 目录
-        domain: 过滤领域(可选)
-
-    Returns:
-        Instinct 列表
-    """
-    instincts = []
-
-    for yaml_file in instincts_dir.glob('*.yaml'):
-        try:
-            with open(yaml_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            # 分离 frontmatter 和 body
-            parts = content.split('---', 2)
-            if len(parts) < 3:
-                continue
-
-            frontmatter = yaml.safe_load(parts[1])
-            body = parts[2].strip()
-
-            # 过滤领域
-            if domain and frontmatter.get('domain') != domain:
-                continue
-
-            instincts.append({
-                'frontmatter': frontmatter,
-                'body': body,
-                'file_path': yaml_file
-            })
-        except Exception as e:
-            print(f"Error loading {yaml_file}: {e}")
-            continue
-
-    return instincts
-
-
-def apply_confidence_decay(instincts: List[Dict], config: Dict) -> int:
+from typing import Dict, List
+
+from config_loader import load_config
+from instinct_archive import DEFAULT_ARCHIVE_PATH, InstinctArchive, plan_cleanup
+from instinct_decay import DecaySchedule
+from instinct_parser import parse_frontmatter_document
+from instinct_stats import StatsSummary
+from instinct_store import open_store
+
+
+def write_instinct(file_path: Path, frontmatter: Dict, body: str) -> None:
+    """原子写回 Instinct 文件(临时文件 + rename，中断时不会留下半个文件)"""
+    file_path = Path(file_path)
+    fd, tmp = tempfile.mkstemp(dir=str(file_path.parent), prefix=f'.{file_path.name}.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write('---\n')
+            yaml.dump(frontmatter, f, allow_unicode=True, default_flow_style=False)
+            f.write('---\n\n')
+            f.write(body)
+        os.replace(tmp, file_path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def apply_confidence_decay(instincts_dir: Path, config: Dict, dry_run: bool = False,
+                           full: bool = False) -> List[Dict]:
     """
     应用置信度衰减规则
 
+    由 DecaySchedule 取出自上次运行以来越过 30/60/90 天阈值的 Instinct，
+    只读取和写回这些文件，每个阈值只生效一次。
+
     Args:
-        instincts: Instinct 列表
+        instincts_dir: Instincts 目录
         config: 配置
+        dry_run: 只计算不写入
+        full: 忽略目录 mtime，重新检查所有文件的修改
 
     Returns:
-        更新的 Instinct 数量
+        更新(或 dry_run 时将要更新)的条目: {'instinct', 'frontmatter'(更新后), 'changes'}
     """
-    decay_rules = config['code-navigation']['confidence_decay']
-    now = datetime.now()
-    updated_count = 0
-
-    for instinct in instincts:
-        frontmatter = instinct['frontmatter']
-
-        # 跳过非 code-navigation 领域
-        if frontmatter.get('domain') != 'code-navigation':
-            continue
-
-        # 获取最后使用时间
-        last_used_str = frontmatter.get('last_used')
-        if not last_used_str:
-            continue
-
-        try:
-            last_used = datetime.fromisoformat(last_used_str.replace('Z', '+00:00'))
-        except (ValueError, AttributeError) as e:
-            print(f"Warning: Invalid last_used timestamp in {instinct_file}: {e}", file=sys.stderr)
-            continue
-
-        days_unused = (now - last_used).days
-
-        # 应用衰减规则
-        current_confidence = frontmatter.get('confidence', 0.5)
-        new_confidence = current_confidence
-
-        if days_unused >= 90:
-            # 标记为 stale
-            frontmatter['status'] = 'stale'
-            updated_count += 1
-        elif days_unused >= 60:
-            new_confidence = max(0.1, current_confidence + decay_rules['60_days_unused'])
-            if new_confidence != current_confidence:
-                frontmatter['confidence'] = new_confidence
-                updated_count += 1
-        elif days_unused >= 30:
-            new_confidence = max(0.1, current_confidence + decay_rules['30_days_unused'])
-            if new_confidence != current_confidence:
-                frontmatter['confidence'] = new_confidence
-                updated_count += 1
-
-        # 写回文件
-        if updated_count > 0:
-            with open(instinct['file_path'], 'w', encoding='utf-8') as f:
-                f.write('---\n')
-                yaml.dump(frontmatter, f, allow_unicode=True, default_flow_style=False)
-                f.write('---\n\n')
-                f.write(instinct['body'])
-
-    return updated_count
-
-
-def get_project_instincts(instincts: List[Dict], project_name: str) -> List[Dict]:
+    rules = config['code-navigation']['confidence_decay']
+    schedule = DecaySchedule(instincts_dir)
+    try:
+        if dry_run:
+            return schedule.run(rules, full=full)
+
+        with StatsSummary(instincts_dir).transaction() as stats:
+            def apply(item: Dict) -> None:
+                instinct = item['instinct']
+                write_instinct(instinct['file_path'], item['frontmatter'], instinct['body'])
+                stats.record(instinct['file_path'], item['frontmatter'])
+
+            return schedule.run(rules, apply=apply, full=full)
+    finally:
+        schedule.close()
+
+
+def _print_decay_summary(planned: List[Dict], dry_run: bool) -> None:
+    """输出衰减结果摘要"""
+    stale = sum(1 for item in planned if 'status' in item['changes'])
+    decayed = len(planned) - stale
+    verb = "Would apply" if dry_run else "Applied"
+    print(f"{verb} decay to {len(planned)} instincts ({decayed} confidence decayed, {stale} marked stale)")
+    for item in planned[:20]:
+        changes = item['changes']
+        old = item['instinct']['frontmatter']
+        if 'status' in changes:
+            detail = 'stale'
+        else:
+            detail = f"confidence {old.get('confidence', 0.5):.2f} -> {changes['confidence']:.2f}"
+        print(f"  {old.get('id', Path(item['instinct']['file_path']).stem)}: {detail}")
+    if len(planned) > 20:
+        print(f"  ... and {len(planned) - 20} more")
+
+
+def cleanup_low_confidence(instincts_dir: Path, config: Dict, threshold: float = 0.3,
+                           dry_run: bool = False) -> List[Dict]:
     """
-    获取特定项目的 Instincts
+    清理低置信度 Instincts，并把个人 Instincts 限制在 max_instincts 以内
+
+    选中的文件一次性移入归档(可用 restore 恢复)，随后同步索引和衰减队列。
 
     Args:
-        instincts: Instinct 列表
-        project_name: 项目名称
+        instincts_dir: Instincts 目录
+        config: 配置
+        threshold: 置信度阈值
+        dry_run: 只列出将要归档的文件
 
     Returns:
-        过滤后的 Instinct 列表
+        归档(或 dry_run 时将要归档)的条目: {'path', 'ids', 'reason', 'score'}
     """
-    return [
-        inst for inst in instincts
-        if inst['frontmatter'].get('project') == project_name
-    ]
-
-
-def cleanup_low_confidence(instincts: List[Dict], threshold: float = 0.3) -> int:
+    settings = config.get('instincts', {})
+    store = open_store()
+    try:
+        planned = plan_cleanup(store, threshold, settings.get('max_instincts'),
+                               settings.get('eviction_weights'))
+        if dry_run or not planned:
+            return planned
+
+        with StatsSummary(instincts_dir).transaction() as stats:
+            archived = InstinctArchive().archive(planned)
+            for entry in archived:
+                stats.remove(entry['path'])
+        store.sync()
+    finally:
+        store.close()
+
+    schedule = DecaySchedule(instincts_dir)
+    try:
+        schedule.refresh()
+    finally:
+        schedule.close()
+    return archived
+
+
+def _print_cleanup_summary(planned: List[Dict], dry_run: bool) -> None:
+    """输出清理结果摘要"""
+    low = sum(1 for item in planned if item['reason'] == 'low-confidence')
+    verb = "Would archive" if dry_run else "Archived"
+    print(f"{verb} {len(planned)} instinct files ({low} low-confidence, "
+          f"{len(planned) - low} evicted over max_instincts)")
+    for item in planned[:20]:
+        print(f"  {Path(item['path']).name}: {item['reason']} (score {item['score']:.2f})")
+    if len(planned) > 20:
+        print(f"  ... and {len(planned) - 20} more")
+    if planned and not dry_run:
+        print(f"Archive: {DEFAULT_ARCHIVE_PATH} (restore with: instinct-manager.py restore <id>)")
+
+
+def restore_instincts(instincts_dir: Path, names: List[str], dry_run: bool = False) -> List[Dict]:
     """
-    清理低置信度 Instincts
+    从归档恢复 Instincts
 
     Args:
-        instincts: Instinct 列表
-        threshold: 置信度阈值
+        instincts_dir: Instincts 目录
+        names: Instinct id 或文件名
+        dry_run: 只列出将要恢复的文件
 
     Returns:
-        删除的 Instinct 数量
+        恢复(或 dry_run 时将要恢复)的归档条目
     """
-    deleted_count = 0
-
-    for instinct in instincts:
-        frontmatter = instinct['frontmatter']
-
-        # 跳过非 code-navigation 领域
-        if frontmatter.get('domain') != 'code-navigation':
-            continue
-
-        # 检查置信度
-        confidence = frontmatter.get('confidence', 0.5)
-        if confidence < threshold:
-            try:
-                os.remove(instinct['file_path'])
-                deleted_count += 1
-            except Exception as e:
-                print(f"Error deleting {instinct['file_path']}: {e}")
+    archive = InstinctArchive()
+    if dry_run:
+        return archive.restore(names, dry_run=True)
 
-    return deleted_count
+    with StatsSummary(instincts_dir).transaction() as stats:
+        restored = archive.restore(names)
+        for entry in restored:
+            document = parse_frontmatter_document(entry['content'])
+            if document is not None:
+                stats.record(Path(entry['path']), document['frontmatter'])
+    return restored
 
 
-def get_statistics(instincts: List[Dict]) -> Dict:
+def get_statistics(instincts_dir: Path, rebuild: bool = False) -> Dict:
     """
     获取统计信息
 
+    读取增量维护的汇总(stats.json)，不读取 Instinct 文件；
+    汇总缺失或目录被外部改动时自动重建。
+
     Args:
-        instincts: Instinct 列表
+        instincts_dir: Instincts 目录
+        rebuild: 强制重新读取所有文件
 
     Returns:
         统计字典
     """
-    code_nav_instincts = [
-        inst for inst in instincts
-        if inst['frontmatter'].get('domain') == 'code-navigation'
-    ]
-
-    # 按项目分组
-    projects = {}
-    for inst in code_nav_instincts:
-        project = inst['frontmatter'].get('project', 'unknown')
-        if project not in projects:
-            projects[project] = []
-        projects[project].append(inst)
-
-    # 计算统计
-    stats = {
-        'total': len(code_nav_instincts),
-        'projects': len(projects),
-        'by_project': {}
-    }
-
-    for project, insts in projects.items():
-        avg_confidence = sum(
-            inst['frontmatter'].get('confidence', 0)
-            for inst in insts
-        ) / len(insts) if insts else 0
-
-        stats['by_project'][project] = {
-            'count': len(insts),
-            'avg_confidence': round(avg_confidence, 2)
-        }
-
-    return stats
+    with StatsSummary(instincts_dir).transaction(rebuild=rebuild) as stats:
+        return stats.statistics()
 
 
 def main():
@@ -229,10 +194,16 @@ def main():
     import argparse
 
     parser = argparse.ArgumentParser(description='Manage code navigation instincts')
-    parser.add_argument('command', choices=['decay', 'cleanup', 'stats'],
+    parser.add_argument('command', choices=['decay', 'cleanup', 'restore', 'stats'],
                         help='Command to execute')
+    parser.add_argument('names', nargs='*',
+                        help='Instinct ids or file names to restore (lists the archive when omitted)')
     parser.add_argument('--threshold', type=float, default=0.3,
                         help='Confidence threshold for cleanup')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Show what decay / cleanup / restore would change without writing files')
+    parser.add_argument('--full', action='store_true',
+                        help='Recheck every instinct file for edits (decay) or rebuild the summary (stats)')
 
     args = parser.parse_args()
 
@@ -245,22 +216,35 @@ def main():
         print("No instincts directory found")
         return
 
-    # 加载所有 Instincts
-    instincts = load_all_instincts(instincts_dir)
-
     if args.command == 'decay':
-        # 应用衰减规则
-        updated = apply_confidence_decay(instincts, config)
-        print(f"Applied decay to {updated} instincts")
+        if not config.get('code-navigation', {}).get('confidence_decay'):
+            print("No decay rules configured (code-navigation.confidence_decay in config.json)")
+            return
+        # 应用衰减规则(只处理已到期的 Instincts，不加载全部文件)
+        planned = apply_confidence_decay(instincts_dir, config, dry_run=args.dry_run, full=args.full)
+        _print_decay_summary(planned, args.dry_run)
+        return
 
-    elif args.command == 'cleanup':
-        # 清理低置信度
-        deleted = cleanup_low_confidence(instincts, args.threshold)
-        print(f"Deleted {deleted} low-confidence instincts")
+    if args.command == 'cleanup':
+        # 清理低置信度并执行数量上限(基于索引，不加载全部文件)
+        planned = cleanup_low_confidence(instincts_dir, config, args.threshold, dry_run=args.dry_run)
+        _print_cleanup_summary(planned, args.dry_run)
+
+    elif args.command == 'restore':
+        if not args.names:
+            for entry in InstinctArchive().entries():
+                print(f"{Path(entry['path']).name}  {', '.join(entry['ids'])}  "
+                      f"{entry['reason']}  {entry['archived_at']}")
+            return
+        restored = restore_instincts(instincts_dir, args.names, dry_run=args.dry_run)
+        verb = "Would restore" if args.dry_run else "Restored"
+        print(f"{verb} {len(restored)} instinct files")
+        for entry in restored:
+            print(f"  {entry['path']}")
 
     elif args.command == 'stats':
-        # 显示统计
-        stats = get_statistics(instincts)
+        # 显示统计(读取汇总，不加载 Instinct 文件)
+        stats = get_statistics(instincts_dir, rebuild=args.full)
         print(json.dumps(stats, indent=2, ensure_ascii=False))
 
 
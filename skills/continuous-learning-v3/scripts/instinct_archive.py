@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Instinct Archive
+
+清理出的直觉文件的可恢复归档（~/.claude/homunculus/instincts/archive.jsonl.gz）。
+
+instinct-manager.py cleanup 一次性选出要移除的个人直觉文件：
+- code-navigation 领域、置信度低于阈值的直觉
+- 个人直觉超过 instincts.max_instincts 时，按综合得分（置信度、最近使用、使用次数）
+  从低到高淘汰，直到数量回到上限以内
+
+移除分两步，顺序保证任何时刻中断都不会丢失直觉：
+1. 所有文件的原始内容写入新的归档（临时文件 + fsync + 原子替换），
+   同时合并旧归档：同一路径只保留最新一次的内容
+2. 归档落盘后才删除文件，随后 instincts.db 索引在一个事务内同步
+
+instinct-manager.py restore 把归档中的文件写回原位置并从归档中移除。
+"""
+
+import gzip
+import json
+import math
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from instinct_decay import parse_last_used
+
+HOMUNCULUS_DIR = Path.home() / '.claude' / 'homunculus'
+DEFAULT_ARCHIVE_PATH = HOMUNCULUS_DIR / 'instincts' / 'archive.jsonl.gz'
+
+# 综合得分权重（config.json 的 instincts.eviction_weights 可覆盖）
+DEFAULT_EVICTION_WEIGHTS = {'confidence': 0.5, 'recency': 0.3, 'usage': 0.2}
+RECENCY_HALF_LIFE_DAYS = 30
+DAY_SECONDS = 86400
+
+
+def eviction_score(inst: Dict, file_mtime: float, now: float,
+                   weights: Optional[Dict[str, float]] = None) -> float:
+    """
+    直觉的保留价值，越低越先被淘汰
+
+    Args:
+        inst: 直觉字典
+        file_mtime: 所在文件的修改时间（没有 last_used 时代替最近使用时间）
+        now: 当前时间戳
+        weights: confidence / recency / usage 的权重
+
+    Returns:
+        0~1 之间的得分
+    """
+    weights = {**DEFAULT_EVICTION_WEIGHTS, **(weights or {})}
+    try:
+        confidence = float(inst.get('confidence', 0.5))
+    except (TypeError, ValueError):
+        confidence = 0.5
+
+    last_used = file_mtime
+    if inst.get('last_used'):
+        try:
+            last_used = parse_last_used(inst['last_used']).timestamp()
+        except (ValueError, TypeError, OverflowError):
+            pass
+    days_unused = max(0.0, (now - last_used) / DAY_SECONDS)
+    recency = math.pow(0.5, days_unused / RECENCY_HALF_LIFE_DAYS)
+
+    try:
+        usage_count = max(0, int(inst.get('usage_count', 0)))
+    except (TypeError, ValueError):
+        usage_count = 0
+    usage = usage_count / (usage_count + 1)
+
+    return (weights['confidence'] * confidence + weights['recency'] * recency
+            + weights['usage'] * usage)
+
+
+def plan_cleanup(store, threshold: float, max_instincts: Optional[int] = None,
+                 weights: Optional[Dict[str, float]] = None,
+                 now: Optional[datetime] = None) -> List[Dict]:
+    """
+    选出要归档的个人直觉文件（以文件为单位，文件内所有直觉一起移除）
+
+    Args:
+        store: 已同步的 InstinctStore
+        threshold: code-navigation 直觉的置信度阈值
+        max_instincts: 个人直觉数量上限，None 或 0 表示不限制
+        weights: 淘汰得分权重
+        now: 当前时间(默认取系统时间)
+
+    Returns:
+        [{'path', 'ids', 'reason'('low-confidence' / 'max-instincts'), 'score'}]
+    """
+    now_ts = (now or datetime.now()).timestamp()
+    files: Dict[str, Dict] = {}
+    rows = store.conn.execute(
+        "SELECT source_file, domain, confidence, file_mtime, data FROM instincts "
+        "WHERE source_type = 'personal' ORDER BY source_file, position")
+    for row in rows:
+        inst = json.loads(row['data'])
+        entry = files.setdefault(row['source_file'], {
+            'path': row['source_file'], 'ids': [], 'low': True, 'score': 0.0, 'mtime': row['file_mtime']})
+        entry['ids'].append(inst['id'])
+        entry['low'] = entry['low'] and row['domain'] == 'code-navigation' and row['confidence'] < threshold
+        entry['score'] = max(entry['score'], eviction_score(inst, row['file_mtime'], now_ts, weights))
+
+    planned = [dict(entry, reason='low-confidence') for entry in files.values() if entry['low']]
+    remaining = sum(len(entry['ids']) for entry in files.values() if not entry['low'])
+
+    if max_instincts and remaining > max_instincts:
+        candidates = sorted((entry for entry in files.values() if not entry['low']),
+                            key=lambda entry: (entry['score'], entry['mtime'], entry['path']))
+        for entry in candidates:
+            if remaining <= max_instincts:
+                break
+            planned.append(dict(entry, reason='max-instincts'))
+            remaining -= len(entry['ids'])
+
+    return [{key: entry[key] for key in ('path', 'ids', 'reason', 'score')} for entry in planned]
+
+
+class InstinctArchive:
+    """
+    gzip 压缩的 JSONL 归档，每行一个被移除的直觉文件
+
+    Args:
+        path: 归档文件路径
+    """
+
+    def __init__(self, path: Path = DEFAULT_ARCHIVE_PATH):
+        self.path = Path(path).expanduser()
+
+    def entries(self) -> Iterator[Dict]:
+        """逐条读取归档（path / ids / reason / score / archived_at / content）"""
+        if not self.path.exists():
+            return
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def _rewrite(self, kept: Iterable[Dict], added: Iterable[Dict]) -> None:
+        """写出新的归档并原子替换旧文件"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), prefix=f'.{self.path.name}.')
+        try:
+            with os.fdopen(fd, 'wb') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                    for entry in kept:
+                        f.write((json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8'))
+                    for entry in added:
+                        f.write((json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8'))
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def archive(self, planned: List[Dict]) -> List[Dict]:
+        """
+        归档并删除 plan_cleanup 选出的文件
+
+        Args:
+            planned: plan_cleanup 的结果
+
+        Returns:
+            实际归档的条目（已不存在的文件被跳过）
+        """
+        archived_at = datetime.now().isoformat()
+        added = []
+        for item in planned:
+            try:
+                with open(item['path'], 'r', encoding='utf-8') as f:
+                    content = f.read()
+            except FileNotFoundError:
+                continue
+            added.append({**item, 'archived_at': archived_at, 'content': content})
+        if not added:
+            return []
+
+        paths = {entry['path'] for entry in added}
+        self._rewrite((entry for entry in self.entries() if entry['path'] not in paths), added)
+
+        # 归档已落盘，此后删除文件；中断时文件仍在原处，下次清理会再次归档
+        for entry in added:
+            try:
+                os.remove(entry['path'])
+            except FileNotFoundError:
+                pass
+        return added
+
+    def restore(self, selectors: List[str], dry_run: bool = False) -> List[Dict]:
+        """
+        把归档中的文件写回原位置
+
+        Args:
+            selectors: 直觉 id、文件名或完整路径
+            dry_run: 只返回匹配的条目
+
+        Returns:
+            写回（或将要写回）的条目；原位置已有同名文件的条目保留在归档中且不返回
+        """
+        wanted = set(selectors)
+        restored = []
+        for entry in self.entries():
+            path = Path(entry['path'])
+            if not (wanted & {entry['path'], path.name, path.stem, *entry.get('ids', [])}):
+                continue
+            if path.exists():
+                continue
+            restored.append(entry)
+        if dry_run or not restored:
+            return restored
+
+        for entry in restored:
+            path = Path(entry['path'])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f'.{path.name}.')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(entry['content'])
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+
+        # 文件已写回，再从归档中移除；中断时只会在归档中多留一份
+        paths = {entry['path'] for entry in restored}
+        self._rewrite((entry for entry in self.entries() if entry['path'] not in paths), [])
+        return restored
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Instinct Parse Cache
+
+直觉文件解析结果的磁盘缓存（~/.claude/homunculus/.instinct-parse-cache.pickle）。
+
+每个条目以文件的 (mtime_ns, size) 为键保存 pickle 后的解析结果，
+只有新增或修改过的文件才重新解析 YAML；删除的文件在保存时剔除。
+不同解析器以 namespace 区分，同一缓存文件可以同时服务 instinct-manager
+和 instinct-generator。缓存损坏或版本不符时直接丢弃重建，不影响结果。
+"""
+
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+HOMUNCULUS_DIR = Path.home() / '.claude' / 'homunculus'
+DEFAULT_CACHE_PATH = HOMUNCULUS_DIR / '.instinct-parse-cache.pickle'
+CACHE_VERSION = 1
+
+# 路径 → (mtime_ns, size, pickle 后的解析结果)
+_Entries = Dict[str, Tuple[int, int, bytes]]
+
+
+class ParseCache:
+    """
+    按 (mtime, size) 失效的解析缓存
+
+    条目保存序列化后的字节，每次 get() 返回新的对象：调用方修改返回值
+    （例如衰减时改写 frontmatter）不会污染缓存。
+
+    Args:
+        namespace: 解析器标识（名称和版本），解析逻辑变化时更换即可让旧条目失效
+        path: 缓存文件路径
+    """
+
+    def __init__(self, namespace: str, path: Path = DEFAULT_CACHE_PATH):
+        self.namespace = namespace
+        self.path = Path(path).expanduser()
+        self._data: Optional[Dict[str, _Entries]] = None
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self) -> Dict[str, _Entries]:
+        if self._data is None:
+            try:
+                with open(self.path, 'rb') as f:
+                    data = pickle.load(f)
+                if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+                    raise ValueError('cache version mismatch')
+                self._data = data['namespaces']
+            except (OSError, EOFError, ValueError, TypeError, KeyError,
+                    AttributeError, pickle.UnpicklingError):
+                self._data = {}
+        return self._data
+
+    @property
+    def _entries(self) -> _Entries:
+        return self._load().setdefault(self.namespace, {})
+
+    def get(self, file: Path, parse: Callable[[str], Any]) -> Any:
+        """
+        返回文件的解析结果，缓存未命中时读取文件并调用 parse
+
+        Args:
+            file: 直觉文件
+            parse: 解析函数（文件内容 → 结果），异常原样抛出且不写入缓存
+
+        Returns:
+            解析结果
+        """
+        stat = os.stat(file)
+        key = str(file)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            self.hits += 1
+            return pickle.loads(entry[2])
+
+        self.misses += 1
+        with open(file, 'r', encoding='utf-8') as f:
+            result = parse(f.read())
+        self._entries[key] = (stat.st_mtime_ns, stat.st_size,
+                              pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+        self._dirty = True
+        return result
+
+    def _prune(self) -> None:
+        """剔除已不存在的文件的条目（所有 namespace）"""
+        for entries in self._load().values():
+            for key in [key for key in entries if not os.path.exists(key)]:
+                del entries[key]
+                self._dirty = True
+
+    def save(self) -> None:
+        """有新增或失效条目时原子写回缓存文件；写入失败只影响下次的命中率"""
+        if self._data is None:
+            return
+        self._prune()
+        if not self._dirty:
+            return
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), prefix='.instinct-parse-cache.')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump({'version': CACHE_VERSION, 'namespaces': self._data},
+                                f, pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError:
+            return
+        self._dirty = False
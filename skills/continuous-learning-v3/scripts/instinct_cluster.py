@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Instinct Clustering
+
+按 trigger 相似度聚类直觉（instinct-cli evolve 使用）。
+
+1. trigger 规范化为词元集合（小写、去掉 when/creating 等无区分度的词，中文按字）
+2. 每个集合计算 MinHash 签名，签名按 trigger 内容缓存在 instincts.db 中
+3. LSH 分带：同一带内签名相同的直觉成为候选对，再用精确 Jaccard 相似度确认
+4. 并查集合并确认的候选对（单链接），整体接近线性时间
+
+相似度阈值为 config.json 的 evolution.similarity_threshold，
+达到 evolution.cluster_threshold 个直觉的簇才是进化候选。
+"""
+
+import hashlib
+import random
+import re
+import sqlite3
+from array import array
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+NUM_PERM = 64
+DEFAULT_SIMILARITY_THRESHOLD = 0.5
+DEFAULT_MIN_CLUSTER_SIZE = 3
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x1A57)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+|[一-鿿]')
+STOPWORDS = frozenset({
+    'when', 'creating', 'writing', 'adding', 'implementing', 'testing',
+    'a', 'an', 'the', 'to', 'of', 'in', 'on', 'for', 'and', 'or', 'with', 'is', 'are',
+    'user', 'says', 'similar', 'phrases',
+})
+
+
+def shingles(text: str) -> FrozenSet[str]:
+    """trigger 的词元集合"""
+    return frozenset(token for token in _TOKEN_RE.findall(text.lower()) if token not in STOPWORDS)
+
+
+@lru_cache(maxsize=65536)
+def _token_hashes(token: str) -> Tuple[int, ...]:
+    """词元在 NUM_PERM 个哈希函数下的取值（词元在直觉间大量重复，按词元缓存）"""
+    h = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+    return tuple((a * h + b) % _PRIME for a, b in _PERMUTATIONS)
+
+
+def minhash(tokens: FrozenSet[str]) -> Tuple[int, ...]:
+    """
+    计算 MinHash 签名
+
+    Args:
+        tokens: 非空词元集合
+
+    Returns:
+        NUM_PERM 个最小哈希值
+    """
+    if len(tokens) == 1:
+        return _token_hashes(next(iter(tokens)))
+    return tuple(map(min, *(_token_hashes(token) for token in tokens)))
+
+
+def lsh_params(threshold: float, num_perm: int = NUM_PERM) -> Tuple[int, int]:
+    """
+    选择分带数和每带行数，使 LSH 的 S 曲线拐点 (1/b)^(1/r) 最接近阈值
+
+    Returns:
+        (bands, rows)
+    """
+    candidates = [(bands, num_perm // bands) for bands in range(1, num_perm + 1) if num_perm % bands == 0]
+    return min(candidates, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class SignatureCache:
+    """
+    MinHash 签名缓存（instincts.db 的 trigger_signatures 表）
+
+    以规范化后的词元集合为键，trigger 不变的直觉不会重新计算签名。
+
+    Args:
+        conn: SQLite 连接（通常是 InstinctStore.conn）
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        conn.execute('CREATE TABLE IF NOT EXISTS trigger_signatures '
+                     '(key BLOB PRIMARY KEY, signature BLOB NOT NULL)')
+
+    @staticmethod
+    def key(tokens: FrozenSet[str]) -> bytes:
+        text = f'{NUM_PERM}\0' + '\0'.join(sorted(tokens))
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def signatures(self, token_sets: Sequence[FrozenSet[str]]) -> List[Tuple[int, ...]]:
+        """
+        取出（或计算并写入）一组词元集合的签名，顺序与输入一致
+
+        不再使用的条目超过当前数量时整体重建，表的大小随直觉数量而非历史累积增长。
+        """
+        keys = {self.key(tokens): tokens for tokens in token_sets}
+        cached = {}
+        for row in self.conn.execute('SELECT key, signature FROM trigger_signatures'):
+            if row[0] in keys:
+                cached[bytes(row[0])] = tuple(array('Q', row[1]))
+        stored = self.conn.execute('SELECT COUNT(*) FROM trigger_signatures').fetchone()[0]
+
+        missing = {key: minhash(tokens) for key, tokens in keys.items() if key not in cached}
+        with self.conn:
+            if stored - len(cached) > len(keys):
+                self.conn.execute('DELETE FROM trigger_signatures')
+                missing.update(cached)
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO trigger_signatures (key, signature) VALUES (?, ?)',
+                [(key, array('Q', sig).tobytes()) for key, sig in missing.items()])
+        cached.update(missing)
+        return [cached[self.key(tokens)] for tokens in token_sets]
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_instincts(instincts: List[Dict], threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+                      min_size: int = DEFAULT_MIN_CLUSTER_SIZE,
+                      cache: Optional[SignatureCache] = None) -> List[List[Dict]]:
+    """
+    按 trigger 相似度聚类
+
+    Args:
+        instincts: 直觉列表
+        threshold: Jaccard 相似度阈值
+        min_size: 簇的最小直觉数
+        cache: 签名缓存，None 时每次重新计算
+
+    Returns:
+        直觉簇列表（簇内保持输入顺序），没有 trigger 词元的直觉不参与聚类
+    """
+    # trigger 词元相同的直觉先合并为一组，LSH 只处理互不相同的词元集合
+    groups: Dict[FrozenSet[str], List[int]] = defaultdict(list)
+    for index, inst in enumerate(instincts):
+        tokens = shingles(str(inst.get('trigger') or ''))
+        if tokens:
+            groups[tokens].append(index)
+    token_sets = list(groups)
+    if not token_sets:
+        return []
+
+    signatures = cache.signatures(token_sets) if cache else [minhash(tokens) for tokens in token_sets]
+    bands, rows = lsh_params(threshold)
+    parent = list(range(len(token_sets)))
+
+    for band in range(bands):
+        buckets: Dict[Tuple[int, ...], List[int]] = defaultdict(list)
+        for i, signature in enumerate(signatures):
+            buckets[signature[band * rows:(band + 1) * rows]].append(i)
+        for members in buckets.values():
+            # 只与桶内第一个和前一个成员比较，避免大桶内两两比较；同桶成员大多彼此相似
+            for position in range(1, len(members)):
+                i = members[position]
+                for j in {members[0], members[position - 1]}:
+                    if _find(parent, i) != _find(parent, j) and \
+                            jaccard(token_sets[i], token_sets[j]) >= threshold:
+                        parent[_find(parent, i)] = _find(parent, j)
+
+    clusters: Dict[int, List[int]] = defaultdict(list)
+    for i, tokens in enumerate(token_sets):
+        clusters[_find(parent, i)].extend(groups[tokens])
+    return [[instincts[index] for index in sorted(members)]
+            for members in clusters.values() if len(members) >= min_size]
+
+
+def cluster_label(cluster: List[Dict], size: int = 3) -> str:
+    """簇内最常见的几个 trigger 词元，作为簇的名称（同频按字母序，保证每次运行结果一致）"""
+    counts = Counter(token for inst in cluster for token in shingles(str(inst.get('trigger') or '')))
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return ' '.join(token for token, _ in ranked[:size])
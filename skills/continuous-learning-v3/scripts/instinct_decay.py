@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Instinct Decay Schedule
+
+code-navigation 直觉置信度衰减的持久化调度队列（instincts.db 的 decay_schedule 表）。
+
+每个直觉文件按下一个衰减阈值（last_used 之后 30 / 60 / 90 天）的到期时间排队，
+到期时间列有索引，一次衰减只读取已到期的文件：
+- 每个阈值只生效一次：30 天衰减、60 天衰减、90 天标记为 stale
+- 到期时重新读取文件，last_used 被更新（直觉再次被使用）则从头排队
+- 目录 mtime 变化时才逐个 stat，新增或修改过的文件重新排队，删除的出队
+- 每个文件的队列行在写回前后各提交一次，中途中断不会导致同一阈值重复衰减
+
+因此每次会话开始时运行 `instinct-manager.py decay` 的开销与到期的直觉数量成正比。
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from instinct_parser import parse_frontmatter_document
+
+HOMUNCULUS_DIR = Path.home() / '.claude' / 'homunculus'
+DEFAULT_DB_PATH = HOMUNCULUS_DIR / 'instincts.db'
+
+# 阈值（天）：依次对应 30_days_unused / 60_days_unused / 90_days_unused 规则
+DECAY_THRESHOLDS = (30, 60, 90)
+STALE_STAGE = len(DECAY_THRESHOLDS)
+DAY_SECONDS = 86400
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decay_schedule (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    last_used REAL,
+    stage INTEGER NOT NULL,
+    due REAL
+);
+CREATE INDEX IF NOT EXISTS idx_decay_schedule_due ON decay_schedule(due);
+CREATE TABLE IF NOT EXISTS decay_directories (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+"""
+
+
+def parse_last_used(value) -> datetime:
+    """解析 last_used（ISO 字符串或 YAML 解析出的 datetime），统一为本地时间的 naive datetime"""
+    if isinstance(value, datetime):
+        last_used = value
+    else:
+        last_used = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if last_used.tzinfo is not None:
+        last_used = last_used.astimezone().replace(tzinfo=None)
+    return last_used
+
+
+def decay_stage(days_unused: float) -> int:
+    """未使用天数已越过的阈值个数"""
+    return sum(1 for days in DECAY_THRESHOLDS if days_unused >= days)
+
+
+def decay_changes(frontmatter: Dict, stage: int, rules: Dict) -> Dict:
+    """
+    越过第 stage 个阈值时对 frontmatter 的修改
+
+    Args:
+        frontmatter: 直觉 frontmatter
+        stage: decay_stage() 的结果
+        rules: config.json 的 code-navigation.confidence_decay
+
+    Returns:
+        需要修改的字段，没有变化时为空
+    """
+    if stage >= STALE_STAGE:
+        # 标记为 stale(已标记的不再重写)
+        return {'status': 'stale'} if frontmatter.get('status') != 'stale' else {}
+    if stage < 1:
+        return {}
+
+    rule = rules['60_days_unused'] if stage == 2 else rules['30_days_unused']
+    current_confidence = frontmatter.get('confidence', 0.5)
+    new_confidence = max(0.1, current_confidence + rule)
+    return {'confidence': new_confidence} if new_confidence != current_confidence else {}
+
+
+def _read_document(path: str) -> Optional[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_frontmatter_document(f.read())
+
+
+def _last_used_timestamp(frontmatter: Dict) -> Optional[float]:
+    """code-navigation 直觉的 last_used 时间戳；其他领域或没有有效 last_used 时为 None（不参与衰减）"""
+    if frontmatter.get('domain') != 'code-navigation' or not frontmatter.get('last_used'):
+        return None
+    try:
+        return parse_last_used(frontmatter['last_used']).timestamp()
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def _due(last_used: Optional[float], stage: int) -> Optional[float]:
+    if last_used is None or stage >= STALE_STAGE:
+        return None
+    return last_used + DECAY_THRESHOLDS[stage] * DAY_SECONDS
+
+
+class DecaySchedule:
+    """
+    按到期时间排序的衰减队列
+
+    Args:
+        directory: 直觉目录（通常是 instincts/personal）
+        db_path: 数据库路径
+    """
+
+    def __init__(self, directory: Path, db_path: Path = DEFAULT_DB_PATH):
+        self.directory = Path(directory).expanduser()
+        self.db_path = Path(db_path).expanduser()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _schedule(self, path: str, mtime_ns: int, previous: Optional[sqlite3.Row]) -> None:
+        """（重新）计算一个文件的排队位置；last_used 未变时保留已生效的阈值"""
+        try:
+            document = _read_document(path)
+        except (OSError, ValueError):
+            document = None
+        frontmatter = document['frontmatter'] if document else {}
+        last_used = _last_used_timestamp(frontmatter)
+
+        if previous is not None and previous['last_used'] == last_used:
+            stage = previous['stage']
+        else:
+            stage = STALE_STAGE if frontmatter.get('status') == 'stale' else 0
+
+        self.conn.execute(
+            'INSERT OR REPLACE INTO decay_schedule (path, mtime_ns, last_used, stage, due) '
+            'VALUES (?, ?, ?, ?, ?)', (path, mtime_ns, last_used, stage, _due(last_used, stage)))
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        让队列与目录保持一致
+
+        目录 mtime 未变且 full 为 False 时不做任何文件系统扫描。
+
+        Args:
+            full: 忽略目录 mtime，逐个 stat 所有文件
+
+        Returns:
+            重新排队的文件数
+        """
+        conn = self.conn
+        directory = str(self.directory)
+        try:
+            dir_mtime_ns = self.directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+        row = conn.execute('SELECT mtime_ns FROM decay_directories WHERE path = ?', (directory,)).fetchone()
+        if not full and row is not None and row['mtime_ns'] == dir_mtime_ns:
+            return 0
+
+        found = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.name.endswith('.yaml'):
+                    continue
+                try:
+                    found[entry.path] = entry.stat().st_mtime_ns
+                except FileNotFoundError:
+                    continue
+
+        prefix = os.path.join(directory, '')
+        known = {row['path']: row for row in conn.execute(
+            'SELECT * FROM decay_schedule WHERE substr(path, 1, ?) = ?', (len(prefix), prefix))}
+
+        changed = 0
+        with conn:
+            conn.executemany('DELETE FROM decay_schedule WHERE path = ?',
+                             [(path,) for path in known if path not in found])
+            for path, mtime_ns in sorted(found.items()):
+                previous = known.get(path)
+                if previous is not None and previous['mtime_ns'] == mtime_ns:
+                    continue
+                self._schedule(path, mtime_ns, previous)
+                changed += 1
+            conn.execute('INSERT OR REPLACE INTO decay_directories (path, mtime_ns) VALUES (?, ?)',
+                         (directory, dir_mtime_ns))
+        return changed
+
+    def run(self, rules: Dict, now: Optional[datetime] = None,
+            apply: Optional[Callable[[Dict], None]] = None, full: bool = False) -> List[Dict]:
+        """
+        处理到期的直觉
+
+        Args:
+            rules: config.json 的 code-navigation.confidence_decay
+            now: 当前时间(默认取系统时间)
+            apply: 写回一个条目的函数；None 时只计算(dry run)，不写文件也不推进队列
+            full: 先对所有文件重新 stat（见 refresh）
+
+        Returns:
+            需要更新的条目: {'instinct'({'frontmatter', 'body', 'file_path'}), 'frontmatter'(更新后), 'changes'}
+        """
+        self.refresh(full=full)
+        conn = self.conn
+        now_ts = (now or datetime.now()).timestamp()
+        prefix = os.path.join(str(self.directory), '')
+        due_rows = conn.execute(
+            'SELECT * FROM decay_schedule WHERE due IS NOT NULL AND due <= ? '
+            'AND substr(path, 1, ?) = ? ORDER BY due', (now_ts, len(prefix), prefix)).fetchall()
+
+        planned = []
+        for row in due_rows:
+            path = row['path']
+            try:
+                document = _read_document(path)
+            except FileNotFoundError:
+                if apply is not None:
+                    with conn:
+                        conn.execute('DELETE FROM decay_schedule WHERE path = ?', (path,))
+                continue
+            except (OSError, ValueError):
+                document = None
+            if document is None:
+                if apply is not None:
+                    self._advance(path, os.stat(path).st_mtime_ns, None, 0)
+                continue
+
+            frontmatter = document['frontmatter']
+            last_used = _last_used_timestamp(frontmatter)
+            stage = row['stage']
+            if last_used != row['last_used']:
+                # last_used 被更新：重新开始计算阈值
+                stage = STALE_STAGE if frontmatter.get('status') == 'stale' else 0
+
+            target = decay_stage((now_ts - last_used) / DAY_SECONDS) if last_used is not None else stage
+            changes = decay_changes(frontmatter, target, rules) if target > stage else {}
+            if changes:
+                item = {
+                    'instinct': {'frontmatter': frontmatter, 'body': document['body'],
+                                 'file_path': Path(path)},
+                    'frontmatter': {**frontmatter, **changes},
+                    'changes': changes
+                }
+                planned.append(item)
+            if apply is None:
+                continue
+
+            # 每个文件的队列行与写回同步提交：先推进阈值再写文件，
+            # 中断时最多漏掉这一次衰减，不会在下次运行时重复衰减
+            mtime_ns = os.stat(path).st_mtime_ns
+            self._advance(path, mtime_ns, last_used, max(stage, target))
+            if changes:
+                try:
+                    apply(item)
+                except BaseException:
+                    # 文件没有被写回时撤销推进，下次运行重试
+                    if os.stat(path).st_mtime_ns == mtime_ns:
+                        self._advance(path, row['mtime_ns'], row['last_used'], row['stage'])
+                    raise
+                # 记录写回后的 mtime，refresh 不再把它当作外部修改
+                self._advance(path, os.stat(path).st_mtime_ns, last_used, target)
+        return planned
+
+    def _advance(self, path: str, mtime_ns: int, last_used: Optional[float], stage: int) -> None:
+        """更新一个文件的队列行（mtime、阈值、下次到期时间）并立即提交"""
+        with self.conn:
+            self.conn.execute('UPDATE decay_schedule SET mtime_ns = ?, last_used = ?, stage = ?, due = ? '
+                              'WHERE path = ?', (mtime_ns, last_used, stage, _due(last_used, stage), path))
+
+    def next_due(self) -> Optional[datetime]:
+        """队列中最早的到期时间"""
+        prefix = os.path.join(str(self.directory), '')
+        row = self.conn.execute('SELECT MIN(due) FROM decay_schedule WHERE substr(path, 1, ?) = ?',
+                                (len(prefix), prefix)).fetchone()
+        return datetime.fromtimestamp(row[0]) if row[0] is not None else None
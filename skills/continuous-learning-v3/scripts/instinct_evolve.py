@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Instinct Evolve
+
+把 evolve 分析得到的候选写成技能 / 命令 / 智能体文件（instinct-cli evolve --generate）。
+
+- 所有产物由线程池并行渲染和写入，写入为临时文件 + 原子替换
+- 产物内容确定（不含时间戳），与清单中记录的 sha256 相同时跳过写入
+- 清单 evolved/manifest.json 记录每个产物的哈希和来源直觉；
+  磁盘上的哈希与清单不同的产物视为手工修改过：仍会产生的跳过写入并报告，
+  不再产生的保留并移出清单，其余不再产生的产物删除
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+MANIFEST_NAME = 'manifest.json'
+DEFAULT_EMIT_WORKERS = 8
+
+_ACTION_RE = re.compile(r'## Action\s*\n\s*(.+?)(?:\n\n|\n##|$)', re.DOTALL)
+
+
+def _slug(text: str, limit: int = 40) -> str:
+    slug = re.sub(r'[^\w]+', '-', text.lower(), flags=re.UNICODE).strip('-')
+    return slug[:limit].rstrip('-') or 'evolved'
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _instinct_action(inst: Dict) -> str:
+    """直觉正文中 ## Action 段的第一行，没有时取第一行非标题文字"""
+    content = inst.get('content', '')
+    match = _ACTION_RE.search(content)
+    if match:
+        return match.group(1).strip().split('\n')[0]
+    for line in content.split('\n'):
+        if line.strip() and not line.lstrip().startswith('#'):
+            return line.strip()
+    return ''
+
+
+def _frontmatter(fields: List[Tuple[str, str]], evolved_from: List[str]) -> str:
+    # description 来自 trigger、直觉 id 来自直觉文件，可能含冒号或是 yes/123 这类会被
+    # YAML 解析成其他类型的值，写成 JSON 字符串（同时是合法的 YAML 双引号标量）
+    lines = ['---'] + [f'{key}: {json.dumps(value, ensure_ascii=False) if key == "description" else value}'
+                       for key, value in fields] + ['evolved_from:']
+    lines += [f'  - {json.dumps(str(inst_id), ensure_ascii=False)}' for inst_id in evolved_from] + ['---', '']
+    return '\n'.join(lines)
+
+
+def _bullets(title: str, items: List[str]) -> str:
+    items = [item for item in dict.fromkeys(items) if item]
+    if not items:
+        return ''
+    return f'## {title}\n\n' + '\n'.join(f'- {item}' for item in items) + '\n\n'
+
+
+def render_skill(name: str, candidate: Dict) -> str:
+    """技能文件：触发条件和动作来自簇内直觉"""
+    instincts = candidate['instincts']
+    description = (f"{candidate['trigger']} (evolved from {len(instincts)} instincts, "
+                   f"avg confidence {candidate['avg_confidence']:.0%})")
+    return (_frontmatter([('name', name), ('description', description)], [i['id'] for i in instincts])
+            + f"\n# {name.replace('-', ' ').title()} 技能 (Skill)\n\n"
+            + _bullets('When to Apply', [str(i.get('trigger', '')) for i in instincts])
+            + _bullets('Actions', [_instinct_action(i) for i in instincts]))
+
+
+def render_command(name: str, inst: Dict) -> str:
+    """命令文件：来自单个高置信度 workflow 直觉"""
+    description = f"{inst.get('trigger', name)} (confidence {inst.get('confidence', 0.5):.0%})"
+    steps = [line.strip()[2:] if line.strip().startswith('- ') else line.strip()
+             for line in inst.get('content', '').split('\n')
+             if line.strip() and not line.lstrip().startswith('#')]
+    return (_frontmatter([('name', name), ('description', description), ('command', f'/{name}')],
+                         [inst['id']])
+            + f"\n# {name.replace('-', ' ').title()} 命令\n\n"
+            + ('## 步骤\n\n' + '\n'.join(f'{n}. {step}' for n, step in enumerate(steps, 1)) + '\n'
+               if steps else ''))
+
+
+def render_agent(name: str, candidate: Dict) -> str:
+    """智能体文件：来自大且高置信度的簇"""
+    instincts = candidate['instincts']
+    description = f"{candidate['trigger']} agent covering {len(instincts)} instincts"
+    return (_frontmatter([('name', name), ('description', description), ('model', 'sonnet')],
+                         [i['id'] for i in instincts])
+            + f"\n# {name.replace('-', ' ').title()} 智能体 (Agent)\n\n"
+            + _bullets('Handles', [str(i.get('trigger', '')) for i in instincts])
+            + _bullets('Procedure', [_instinct_action(i) for i in instincts]))
+
+
+def plan_artifacts(skill_candidates: List[Dict], command_instincts: List[Dict],
+                   agent_candidates: List[Dict]) -> List[Dict]:
+    """
+    为候选分配产物名称（同类内重名时追加序号）
+
+    Returns:
+        产物描述列表：kind / name / relpath / render / source
+    """
+    plans = []
+    for kind, subdir, items, name_of, render in (
+        ('skill', 'skills', skill_candidates, lambda c: _slug(c['trigger']), render_skill),
+        ('command', 'commands', command_instincts,
+         lambda i: _slug(str(i.get('trigger', i['id'])).replace('when ', '').replace('implementing ', ''), 20),
+         render_command),
+        ('agent', 'agents', agent_candidates, lambda c: _slug(c['trigger'], 20) + '-agent', render_agent),
+    ):
+        used = set()
+        for item in items:
+            base = name = name_of(item)
+            n = 2
+            while name in used:
+                name = f'{base}-{n}'
+                n += 1
+            used.add(name)
+            plans.append({'kind': kind, 'name': name, 'relpath': f'{subdir}/{name}.md',
+                          'render': render, 'source': item})
+    return plans
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f'.{path.name}.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _file_hash(path: Path) -> Optional[str]:
+    try:
+        return _sha256(path.read_bytes())
+    except OSError:
+        return None
+
+
+def load_manifest(evolved_dir: Path) -> Dict:
+    try:
+        return json.loads((evolved_dir / MANIFEST_NAME).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {'artifacts': {}}
+
+
+def generate_artifacts(evolved_dir: Path, skill_candidates: List[Dict], command_instincts: List[Dict],
+                       agent_candidates: List[Dict], workers: int = DEFAULT_EMIT_WORKERS) -> Dict[str, List[str]]:
+    """
+    生成（或增量更新）演进产物
+
+    Args:
+        evolved_dir: 演进目录（skills / commands / agents 的父目录）
+        skill_candidates: 技能候选簇
+        command_instincts: 命令候选直觉
+        agent_candidates: 智能体候选簇
+        workers: 并行渲染写入的线程数
+
+    Returns:
+        {'written': [...], 'unchanged': [...], 'edited': [...], 'removed': [...], 'kept': [...]}，
+        元素为相对路径；edited 为仍会产生、但因手工修改过而未覆盖的产物
+    """
+    evolved_dir = Path(evolved_dir)
+    manifest = load_manifest(evolved_dir)
+    previous = manifest.get('artifacts', {})
+    plans = plan_artifacts(skill_candidates, command_instincts, agent_candidates)
+
+    def emit(plan: Dict) -> Tuple[Dict, str, str]:
+        data = plan['render'](plan['name'], plan['source']).encode('utf-8')
+        digest = _sha256(data)
+        path = evolved_dir / plan['relpath']
+        entry = previous.get(plan['relpath'])
+        if entry:
+            current = _file_hash(path)
+            if current is not None and current != entry.get('sha256'):
+                return plan, digest, 'edited'
+            if current == digest:
+                return plan, digest, 'unchanged'
+        _atomic_write(path, data)
+        return plan, digest, 'written'
+
+    result = {'written': [], 'unchanged': [], 'edited': [], 'removed': [], 'kept': []}
+    artifacts = {}
+    now = datetime.now().isoformat()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(plans) or 1))) as pool:
+        for plan, digest, status in pool.map(emit, plans):
+            result[status].append(plan['relpath'])
+            if status == 'edited':
+                # 保留上次生成时的清单记录，手工修改一直可被识别，直到文件被删除或还原
+                artifacts[plan['relpath']] = previous[plan['relpath']]
+                continue
+            source = plan['source']
+            instincts = source['instincts'] if 'instincts' in source else [source]
+            entry = previous.get(plan['relpath'], {})
+            artifacts[plan['relpath']] = {
+                'kind': plan['kind'],
+                'sha256': digest,
+                'evolved_from': [inst['id'] for inst in instincts],
+                'generated_at': entry.get('generated_at', now) if status == 'unchanged' else now,
+            }
+
+    # 不再产生的产物：未被手工修改的删除，修改过的保留
+    for relpath, entry in previous.items():
+        if relpath in artifacts:
+            continue
+        path = evolved_dir / relpath
+        current = _file_hash(path)
+        if current is None:
+            continue
+        if current == entry.get('sha256'):
+            path.unlink()
+            result['removed'].append(relpath)
+        else:
+            result['kept'].append(relpath)
+
+    manifest = {'version': 1, 'updated_at': now, 'artifacts': artifacts}
+    _atomic_write(evolved_dir / MANIFEST_NAME,
+                  json.dumps(manifest, indent=2, ensure_ascii=False).encode('utf-8'))
+    return result
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Instinct Parser
+
+解析直觉文件：一个文件可以包含多个直觉，每个直觉由 `---` 包围的
+frontmatter 和其后的 Markdown 正文组成。
+
+所有 continuous-learning 脚本共用这里的解析器。frontmatter 按行扫描一遍：
+常见的扁平 `key: 标量` 直接转换（除下面两点外与 yaml.safe_load 相同），
+遇到嵌套、多行、锚点等复杂写法时整块交给 YAML 解析；
+YAML 解析失败或未安装 PyYAML 时逐行按 `key: value` 宽松读取，不丢弃整个文件。
+
+与早期的逐行解析器保持一致的两点：
+- 双引号值只去掉两端的引号、不处理转义，
+  `"when user says "deploy" to prod"`、`"C:\\new\\tests"` 都按原样读取；
+- 布尔值只认 true / false，yes / no / on / off 保持字符串
+  （完整 YAML 解析同样使用只解析 true / false 的 SafeLoader 子类）。
+写入端用 format_scalar() 生成能原样读回的单行值。
+
+load_instinct_files() 用有界线程池并行读取大量文件（例如导入的团队直觉包），
+可选地把解析交给进程池；结果按输入顺序返回，单个文件的错误单独收集。
+
+Usage:
+  instinct_parser.py bench [--instincts N] [--repeat N]
+"""
+
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+_KEY_RE = re.compile(r'([A-Za-z_][\w-]*):(?:[ \t]+(.*))?$')
+_INT_RE = re.compile(r'[-+]?(?:0|[1-9][0-9]*)$')
+_FLOAT_RE = re.compile(r'(?:[-+]?[0-9]+\.[0-9]*|\.[0-9]+)(?:[eE][-+][0-9]+)?$')
+
+# 以字母开头、却不是字符串的标量（YAML 1.1 的 yes / no / on / off 保持字符串）
+_WORD_SCALARS = {
+    **{word: True for word in ('true', 'True', 'TRUE')},
+    **{word: False for word in ('false', 'False', 'FALSE')},
+    **{word: None for word in ('null', 'Null', 'NULL')},
+}
+_BOOL_TAG = 'tag:yaml.org,2002:bool'
+_BOOL_RE = re.compile(r'^(?:true|True|TRUE|false|False|FALSE)$')
+
+# 快速路径无法处理时的标记
+_COMPLEX = object()
+
+DEFAULT_LOAD_WORKERS = 8
+# 文件数少于该值时不启动进程池，进程启动开销大于解析本身
+PROCESS_POOL_MIN_FILES = 200
+
+# parse_frontmatter_document 结果在 ParseCache 中的 namespace，解析规则变化时更换
+DOCUMENT_CACHE_NAMESPACE = 'frontmatter-document/4'
+
+# 单个文件的读取或解析错误
+_LOAD_ERRORS = (OSError, UnicodeDecodeError, ValueError)
+
+
+def _parse_scalar(value: str):
+    """
+    把单行标量转换为与 yaml.safe_load 相同的值（双引号值只去掉引号，yes / no 等保持字符串）
+
+    Returns:
+        转换结果；需要完整 YAML 解析时返回 _COMPLEX
+    """
+    if not value or value == '~':
+        return None
+
+    first = value[0]
+    if first == "'":
+        inner = value[1:-1]
+        if len(value) < 2 or value[-1] != "'" or "'" in inner.replace("''", ''):
+            return _COMPLEX
+        return inner.replace("''", "'")
+    if first == '"':
+        if len(value) < 2 or value[-1] != '"':
+            return _COMPLEX
+        # 只去掉引号，不按 JSON / YAML 处理反斜杠转义
+        return value[1:-1]
+
+    if first.isalpha() or first in '_/':
+        if ': ' in value or ' #' in value or value.endswith(':'):
+            return _COMPLEX
+        return _WORD_SCALARS.get(value, value)
+
+    if _INT_RE.match(value):
+        return int(value)
+    if _FLOAT_RE.match(value):
+        return float(value)
+    return _COMPLEX
+
+
+def _parse_lenient(lines: List[str]) -> Dict:
+    """
+    宽松的逐行解析（YAML 解析失败或未安装 PyYAML 时）
+
+    能快速转换的 `key: 标量` 行照常转换，其余含冒号的行在第一个冒号处拆开，
+    值去掉两端空白和引号后按字符串读取。
+    """
+    data = {}
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith('#') or ':' not in line:
+            continue
+        match = _KEY_RE.match(line.rstrip())
+        if match:
+            value = _parse_scalar((match.group(2) or '').strip())
+            if value is not _COMPLEX:
+                data[match.group(1)] = value
+                continue
+        key, value = line.split(':', 1)
+        data[key.strip()] = value.strip().strip('"').strip("'")
+    return data
+
+
+@lru_cache(maxsize=None)
+def _yaml_loader():
+    """yaml.SafeLoader 的子类：布尔值只解析 true / false，与快速路径一致"""
+    import yaml
+
+    class FrontmatterLoader(yaml.SafeLoader):
+        pass
+
+    FrontmatterLoader.yaml_implicit_resolvers = {
+        first: [(tag, regexp) for tag, regexp in resolvers if tag != _BOOL_TAG]
+        for first, resolvers in yaml.SafeLoader.yaml_implicit_resolvers.items()
+    }
+    FrontmatterLoader.add_implicit_resolver(_BOOL_TAG, _BOOL_RE, list('tTfF'))
+    return FrontmatterLoader
+
+
+def _load_yaml(lines: List[str]) -> Dict:
+    """用只解析 true / false 布尔值的 SafeLoader 解析整块 frontmatter，失败时退回逐行宽松解析"""
+    try:
+        import yaml
+    except ImportError:
+        return _parse_lenient(lines)
+
+    try:
+        data = yaml.load('\n'.join(lines), Loader=_yaml_loader())
+    except yaml.YAMLError:
+        return _parse_lenient(lines)
+    if not isinstance(data, dict):
+        return _parse_lenient(lines)
+    return data
+
+
+def format_scalar(value) -> str:
+    """
+    把 frontmatter 值写成单行标量，parse_frontmatter 与 yaml.safe_load 都能原样读回
+
+    不能写成普通标量的字符串（含引号、`: `、`#`、首尾空白等）写成 YAML 单引号形式；
+    换行等控制字符替换为空格（frontmatter 值都是单行）。
+    """
+    if not isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    text = re.sub(r'[\x00-\x1f\x7f]+', ' ', value)
+    if text and text == text.strip() and _parse_scalar(text) == text and text[0] not in '"\'':
+        try:
+            import yaml
+            plain = yaml.safe_load(text) == text
+        except ImportError:
+            plain = True
+        except yaml.YAMLError:
+            plain = False
+        if plain:
+            return text
+    return "'" + text.replace("'", "''") + "'"
+
+
+def parse_frontmatter(lines: List[str]) -> Dict:
+    """
+    解析 frontmatter（两条 `---` 之间的行）
+
+    Args:
+        lines: frontmatter 行，不含分隔线
+
+    Returns:
+        字段字典；除双引号值和 yes / no 等词外与 yaml.safe_load 的结果一致，YAML 无法解析时为逐行宽松解析的结果
+    """
+    data = {}
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        match = _KEY_RE.match(line.rstrip())
+        if not match:
+            # 缩进续行、列表项、引号键等
+            return _load_yaml(lines)
+        value = _parse_scalar((match.group(2) or '').strip())
+        if value is _COMPLEX:
+            return _load_yaml(lines)
+        data[match.group(1)] = value
+    return data
+
+
+def iter_instincts(lines: Iterable[str],
+                   on_error: Optional[Callable[[ValueError], None]] = None) -> Iterator[Dict]:
+    """
+    流式解析直觉：逐行读入，每个直觉的正文结束时立即产出
+
+    Args:
+        lines: 文件行（可以是打开的文件或网络响应，行尾换行符会被去掉）
+        on_error: 单个直觉无效（如置信度无法转换）时的回调；给出时跳过该直觉继续解析，
+            否则抛出 ValueError
+
+    Yields:
+        直觉（frontmatter 字段 + content 正文），没有 id 的条目被跳过
+    """
+    current: Optional[Dict] = None
+    frontmatter_lines: Optional[List[str]] = None
+    content_lines: List[str] = []
+
+    def finish(inst: Optional[Dict]) -> Optional[Dict]:
+        if inst is None or not inst.get('id'):
+            return None
+        inst['content'] = '\n'.join(content_lines).strip()
+        if 'confidence' in inst:
+            confidence = inst['confidence']
+            try:
+                inst['confidence'] = float(confidence)
+            except (TypeError, ValueError):
+                error = ValueError(f"Missing confidence value in instinct {inst['id']}" if confidence is None
+                                   else f"Invalid confidence {confidence!r} in instinct {inst['id']}")
+                if on_error is None:
+                    raise error
+                on_error(error)
+                return None
+        return inst
+
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line.strip() == '---':
+            if frontmatter_lines is not None:
+                # End of frontmatter, the body follows
+                current = parse_frontmatter(frontmatter_lines)
+                frontmatter_lines = None
+            else:
+                # Start of frontmatter
+                inst = finish(current)
+                if inst is not None:
+                    yield inst
+                current = None
+                frontmatter_lines = []
+            content_lines = []
+        elif frontmatter_lines is not None:
+            frontmatter_lines.append(line)
+        else:
+            content_lines.append(line)
+
+    # Frontmatter that is never closed still counts
+    if frontmatter_lines is not None:
+        current = parse_frontmatter(frontmatter_lines)
+    inst = finish(current)
+    if inst is not None:
+        yield inst
+
+
+def parse_instinct_file(content: str) -> List[Dict]:
+    """
+    解析 YAML 风格的直觉文件
+
+    Args:
+        content: 文件内容
+
+    Returns:
+        直觉列表（frontmatter 字段 + content 正文），没有 id 的条目被丢弃
+    """
+    return list(iter_instincts(content.split('\n')))
+
+
+def parse_frontmatter_document(content: str) -> Optional[Dict]:
+    """
+    解析单直觉文件（instinct-manager / instinct-generator 读写的格式）
+
+    与 parse_instinct_file 不同，第一段 frontmatter 之后的全部内容都是正文，
+    正文中的 `---` 分隔线不会开始新的直觉。
+
+    Args:
+        content: 文件内容
+
+    Returns:
+        {'frontmatter': dict, 'body': str}；没有 frontmatter 时返回 None
+    """
+    lines = content.split('\n')
+    start = 0
+    while start < len(lines) and not lines[start].strip():
+        start += 1
+    if start == len(lines) or lines[start].strip() != '---':
+        return None
+
+    for end in range(start + 1, len(lines)):
+        if lines[end].strip() == '---':
+            return {
+                'frontmatter': parse_frontmatter(lines[start + 1:end]),
+                'body': '\n'.join(lines[end + 1:]).strip()
+            }
+    return None
+
+
+def _read_file(path: str) -> Tuple[Optional[str], Optional[str]]:
+    try:
+        return Path(path).read_text(encoding='utf-8'), None
+    except _LOAD_ERRORS as e:
+        return None, str(e)
+
+
+def _parse_content(parse: Callable[[str], Any], content: str) -> Tuple[Any, Optional[str]]:
+    try:
+        return parse(content), None
+    except _LOAD_ERRORS as e:
+        return None, str(e)
+
+
+def _load_file(parse: Callable[[str], Any], path: str) -> Tuple[Any, Optional[str]]:
+    content, error = _read_file(path)
+    if error is not None:
+        return None, error
+    return _parse_content(parse, content)
+
+
+def load_instinct_files(
+    paths: Sequence[str],
+    parse: Callable[[str], Any] = parse_instinct_file,
+    workers: int = DEFAULT_LOAD_WORKERS,
+    processes: int = 0
+) -> Tuple[List[Tuple[str, Any]], List[Tuple[str, str]]]:
+    """
+    并行读取并解析直觉文件
+
+    Args:
+        paths: 文件路径
+        parse: 解析函数（文件内容 → 结果），使用进程池时必须是模块级函数
+        workers: 读取文件的线程数上限
+        processes: 大于 1 时用该数量的进程并行解析（文件数不少于 PROCESS_POOL_MIN_FILES 时生效）
+
+    Returns:
+        ([(路径, 解析结果)], [(路径, 错误信息)])，两个列表都按 paths 的顺序排列
+    """
+    paths = [str(path) for path in paths]
+    if not paths:
+        return [], []
+    workers = max(1, min(workers, len(paths)))
+
+    if processes > 1 and len(paths) >= PROCESS_POOL_MIN_FILES:
+        # 线程池只负责 I/O，解析按块分给进程池
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            read = list(pool.map(_read_file, paths))
+        parsable = [(path, content) for path, (content, error) in zip(paths, read) if error is None]
+        chunksize = max(1, len(parsable) // (processes * 4))
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parsed = dict(zip(
+                (path for path, _ in parsable),
+                pool.map(_parse_content, [parse] * len(parsable),
+                         [content for _, content in parsable], chunksize=chunksize)
+            ))
+        outcomes = [parsed.get(path, (None, error)) for path, (_, error) in zip(paths, read)]
+    elif workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(_load_file, [parse] * len(paths), paths))
+    else:
+        outcomes = [_load_file(parse, path) for path in paths]
+
+    results, errors = [], []
+    for path, (result, error) in zip(paths, outcomes):
+        if error is None:
+            results.append((path, result))
+        else:
+            errors.append((path, error))
+    return results, errors
+
+
+def _benchmark(count: int, repeat: int) -> None:
+    """对比快速解析与逐段 yaml.safe_load 解析同一个多直觉文件的耗时"""
+    import time
+
+    import yaml
+
+    documents = []
+    for i in range(count):
+        frontmatter = {
+            'id': f'code-nav-instinct-{i}',
+            'trigger': f"when user says 'find handler {i}' or similar phrases",
+            'domain': 'code-navigation',
+            'subtype': 'semantic-mapping',
+            'confidence': round(0.3 + (i % 60) / 100, 2),
+            'source': 'session-observation',
+            'project': 'everything-claude-code',
+            'usage_count': i % 7 + 1,
+            'last_used': '2026-01-01T00:00:00Z',
+        }
+        body = f"# 代码导航：handler {i}\n\n## Action\nNavigate to: src/handler_{i}.py:handle()\n"
+        documents.append('---\n' + yaml.dump(frontmatter, allow_unicode=True,
+                                               default_flow_style=False) + '---\n\n' + body)
+    content = '\n'.join(documents)
+
+    def parse_with_yaml(text: str) -> List[Dict]:
+        parts = re.split(r'^---$', text, flags=re.MULTILINE)
+        return [yaml.safe_load(parts[i]) for i in range(1, len(parts) - 1, 2)]
+
+    expected = parse_with_yaml(content)
+    parsed = parse_instinct_file(content)
+    if [{k: v for k, v in inst.items() if k != 'content'} for inst in parsed] != expected:
+        raise SystemExit("Fast parser result differs from yaml.safe_load")
+
+    timings = {}
+    for name, parse in (('fast', parse_instinct_file), ('yaml.safe_load', parse_with_yaml)):
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            parse(content)
+            best = min(best, time.perf_counter() - started)
+        timings[name] = best
+
+    print(f"{count} instincts, {len(content) / 1024:.0f} KiB, best of {repeat}")
+    for name, seconds in timings.items():
+        print(f"  {name:<15} {seconds * 1000:8.1f} ms")
+    print(f"  speedup         {timings['yaml.safe_load'] / timings['fast']:8.1f}x")
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Shared instinct file parser')
+    parser.add_argument('command', choices=['bench'], help='Command to execute')
+    parser.add_argument('--instincts', type=int, default=1000,
+                        help='Number of instincts in the generated file')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions')
+
+    args = parser.parse_args()
+
+    if args.command == 'bench':
+        _benchmark(args.instincts, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Instinct Sources
+
+直觉导入来源：本地文件、URL 和清单文件（每行一个来源）。
+
+URL 由有界线程池并发下载到磁盘 HTTP 缓存（~/.claude/homunculus/http-cache/）：
+- 每个工作线程为每个主机保持一条 keep-alive 连接，同一主机的多个来源复用连接
+- 缓存条目记录 ETag / Last-Modified，再次导入时发送条件请求，304 直接使用缓存
+- 响应体分块写入缓存文件，导入时从文件流式解析，不在内存中保留整个响应
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import ssl
+import tempfile
+import threading
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+HOMUNCULUS_DIR = Path.home() / '.claude' / 'homunculus'
+HTTP_CACHE_DIR = HOMUNCULUS_DIR / 'http-cache'
+
+DEFAULT_FETCH_WORKERS = 8
+FETCH_TIMEOUT = 30  # 秒
+MAX_REDIRECTS = 5
+CHUNK_SIZE = 64 * 1024
+
+# 连接被服务器关闭等可以换新连接重试一次的错误
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                            ConnectionResetError, BrokenPipeError)
+
+
+class FetchError(Exception):
+    """URL 无法下载（HTTP 错误状态、重定向过多等）"""
+
+
+def is_url(source: str) -> bool:
+    """来源是否为 http(s) URL"""
+    return source.startswith('http://') or source.startswith('https://')
+
+
+def read_manifest(path: Path) -> List[str]:
+    """
+    读取清单文件
+
+    每行一个来源（文件路径或 URL），空行和 # 开头的注释被忽略；
+    相对路径相对于清单文件所在目录。
+
+    Args:
+        path: 清单文件路径
+
+    Returns:
+        来源列表
+    """
+    path = Path(path).expanduser()
+    sources = []
+    for line in path.read_text(encoding='utf-8').splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if not is_url(line) and not Path(line).expanduser().is_absolute():
+            line = str(path.parent / line)
+        sources.append(line)
+    return sources
+
+
+class HttpCache:
+    """
+    带条件请求的磁盘 HTTP 缓存
+
+    Args:
+        directory: 缓存目录
+        workers: 并发下载的线程数上限
+        timeout: 单次请求超时（秒）
+    """
+
+    def __init__(self, directory: Path = HTTP_CACHE_DIR,
+                 workers: int = DEFAULT_FETCH_WORKERS, timeout: float = FETCH_TIMEOUT):
+        self.directory = Path(directory).expanduser()
+        self.workers = workers
+        self.timeout = timeout
+        self._local = threading.local()
+        self._opened: List[http.client.HTTPConnection] = []
+        self._opened_lock = threading.Lock()
+
+    def _entry_paths(self, url: str) -> Tuple[Path, Path]:
+        """缓存条目的 (响应体, 元数据) 路径"""
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+        return self.directory / f'{key}.body', self.directory / f'{key}.json'
+
+    def _connection(self, scheme: str, netloc: str) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        当前线程到该主机的 keep-alive 连接
+
+        Returns:
+            (连接, 是否经 HTTP 代理转发——此时请求行需要写完整 URL)
+        """
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+        key = (scheme, netloc)
+        if key in connections:
+            return connections[key]
+
+        host = urllib.parse.urlsplit(f'{scheme}://{netloc}').hostname or ''
+        proxy = urllib.request.getproxies().get(scheme)
+        if proxy and urllib.request.proxy_bypass(host):
+            proxy = None
+
+        if proxy:
+            proxy_netloc = urllib.parse.urlsplit(proxy).netloc or proxy
+            if scheme == 'https':
+                # CONNECT 隧道，TLS 仍与目标主机握手
+                conn = http.client.HTTPSConnection(proxy_netloc, timeout=self.timeout,
+                                                   context=ssl.create_default_context())
+                conn.set_tunnel(netloc)
+            else:
+                conn = http.client.HTTPConnection(proxy_netloc, timeout=self.timeout)
+            via_proxy = scheme == 'http'
+        elif scheme == 'https':
+            conn = http.client.HTTPSConnection(netloc, timeout=self.timeout,
+                                               context=ssl.create_default_context())
+            via_proxy = False
+        else:
+            conn = http.client.HTTPConnection(netloc, timeout=self.timeout)
+            via_proxy = False
+
+        connections[key] = (conn, via_proxy)
+        with self._opened_lock:
+            self._opened.append(conn)
+        return connections[key]
+
+    def _drop_connection(self, scheme: str, netloc: str) -> None:
+        conn, _ = self._local.connections.pop((scheme, netloc))
+        conn.close()
+
+    def close(self) -> None:
+        """关闭所有线程打开的 keep-alive 连接"""
+        with self._opened_lock:
+            opened, self._opened = self._opened, []
+        for conn in opened:
+            conn.close()
+        self._local = threading.local()
+
+    def _request(self, url: str, headers: Dict[str, str]) -> http.client.HTTPResponse:
+        """发送 GET 请求；复用的连接已被服务器关闭时换新连接重试一次"""
+        parts = urllib.parse.urlsplit(url)
+        target = parts.path or '/'
+        if parts.query:
+            target += f'?{parts.query}'
+
+        for attempt in range(2):
+            conn, via_proxy = self._connection(parts.scheme, parts.netloc)
+            try:
+                conn.request('GET', url if via_proxy else target, headers=headers)
+                return conn.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                self._drop_connection(parts.scheme, parts.netloc)
+                if attempt:
+                    raise
+            except (OSError, http.client.HTTPException):
+                self._drop_connection(parts.scheme, parts.netloc)
+                raise
+
+    def fetch(self, url: str) -> Tuple[Path, bool]:
+        """
+        下载 URL 到缓存（缓存有效时只发送条件请求）
+
+        Args:
+            url: http(s) URL
+
+        Returns:
+            (缓存中响应体的路径, 是否直接使用了缓存)
+        """
+        body_path, meta_path = self._entry_paths(url)
+        meta = {}
+        if body_path.exists():
+            try:
+                meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                meta = {}
+
+        headers = {'User-Agent': 'instinct-cli', 'Accept-Encoding': 'identity'}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+        location = url
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._request(location, headers)
+            if response.status in (301, 302, 303, 307, 308) and response.getheader('Location'):
+                response.read()
+                location = urllib.parse.urljoin(location, response.getheader('Location'))
+                continue
+            break
+        else:
+            raise FetchError(f"Too many redirects fetching {url}")
+
+        if response.status == 304 and meta:
+            response.read()
+            return body_path, True
+        if response.status != 200:
+            response.read()
+            raise FetchError(f"HTTP {response.status} {response.reason}")
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(self.directory), prefix='.fetch-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                while True:
+                    chunk = response.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+            os.replace(tmp, body_path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+        meta = {
+            'url': url,
+            'etag': response.getheader('ETag'),
+            'last_modified': response.getheader('Last-Modified'),
+            'fetched_at': datetime.now().isoformat()
+        }
+        meta_tmp = meta_path.with_name(meta_path.name + f'.{os.getpid()}.{threading.get_ident()}')
+        meta_tmp.write_text(json.dumps(meta), encoding='utf-8')
+        os.replace(meta_tmp, meta_path)
+        return body_path, False
+
+    def fetch_all(self, urls: List[str]) -> Tuple[Dict[str, Tuple[Path, bool]], List[Tuple[str, str]]]:
+        """
+        并发下载多个 URL
+
+        Args:
+            urls: URL 列表（重复的只下载一次）
+
+        Returns:
+            ({URL: (响应体路径, 是否来自缓存)}, [(URL, 错误信息)])，错误按输入顺序排列
+        """
+        unique = list(dict.fromkeys(urls))
+        if not unique:
+            return {}, []
+
+        def fetch_one(url: str):
+            try:
+                return self.fetch(url), None
+            except (OSError, http.client.HTTPException, FetchError) as e:
+                return None, str(e) or type(e).__name__
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(unique)))) as pool:
+                outcomes = list(pool.map(fetch_one, unique))
+        finally:
+            # 工作线程已退出，它们的连接不会再被复用
+            self.close()
+
+        results, errors = {}, []
+        for url, (result, error) in zip(unique, outcomes):
+            if error is None:
+                results[url] = result
+            else:
+                errors.append((url, error))
+        return results, errors
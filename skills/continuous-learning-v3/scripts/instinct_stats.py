@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Instinct Stats Summary
+
+个人直觉统计的物化汇总（~/.claude/homunculus/instincts/stats.json）。
+
+汇总保存每个文件的统计字段（领域、项目、置信度、是否 stale）和按领域 / 项目的
+计数与置信度之和、置信度直方图、stale 计数。instinct-generator.py 和
+instinct-manager.py 写入、归档或恢复直觉文件时在同一把文件锁内增量更新，
+instinct-manager.py stats 直接读取汇总，不读取直觉文件。
+
+其他途径（observer、手工新建或删除）改动目录时目录 mtime 随之变化，
+下次读取时整体重建；就地手工编辑不改变目录 mtime，需 stats --full 重建。
+"""
+
+import fcntl
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from instinct_cache import ParseCache
+from instinct_parser import DOCUMENT_CACHE_NAMESPACE, parse_frontmatter_document
+
+HOMUNCULUS_DIR = Path.home() / '.claude' / 'homunculus'
+DEFAULT_STATS_PATH = HOMUNCULUS_DIR / 'instincts' / 'stats.json'
+STATS_VERSION = 1
+HISTOGRAM_BUCKETS = 10
+
+
+def file_record(frontmatter: Dict) -> Dict:
+    """一个直觉文件对汇总的贡献"""
+    confidence = frontmatter.get('confidence', 0)
+    try:
+        confidence = float(confidence)
+    except (TypeError, ValueError):
+        confidence = 0.0
+    return {
+        'domain': str(frontmatter.get('domain') or 'general'),
+        'project': str(frontmatter.get('project', 'unknown')),
+        'confidence': confidence,
+        'stale': frontmatter.get('status') == 'stale'
+    }
+
+
+def _bucket(confidence: float) -> int:
+    return min(HISTOGRAM_BUCKETS - 1, max(0, int(confidence * HISTOGRAM_BUCKETS)))
+
+
+def _empty_totals() -> Dict:
+    return {'domains': {}, 'projects': {}, 'histogram': [0] * HISTOGRAM_BUCKETS, 'stale': 0, 'total': 0}
+
+
+class StatsSummary:
+    """
+    增量维护的统计汇总
+
+    修改和读取都应在 transaction() 内进行：持有排他锁，
+    进入时加载（目录有外部改动时重建），退出时原子写回。
+
+    Args:
+        directory: 个人直觉目录
+        path: 汇总文件路径
+    """
+
+    def __init__(self, directory: Path, path: Path = DEFAULT_STATS_PATH):
+        self.directory = Path(directory).expanduser()
+        self.path = Path(path).expanduser()
+        self.files: Dict[str, Dict] = {}
+        self.totals = _empty_totals()
+        self._dirty = False
+
+    @property
+    def lock_path(self) -> Path:
+        return self.path.with_name(self.path.name + '.lock')
+
+    def _dir_mtime_ns(self) -> Optional[int]:
+        try:
+            return self.directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    @contextmanager
+    def transaction(self, rebuild: bool = False) -> Iterator['StatsSummary']:
+        """
+        加锁加载汇总，退出时有改动则写回
+
+        Args:
+            rebuild: 忽略已有汇总，重新读取所有直觉文件
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                if rebuild or not self._load():
+                    self.rebuild()
+                yield self
+                self._save()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _load(self) -> bool:
+        """读取汇总；不存在、版本不符或目录已被外部改动时返回 False"""
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != STATS_VERSION or data.get('directory') != str(self.directory) \
+                or data.get('dir_mtime_ns') != self._dir_mtime_ns():
+            return False
+        self.files = data['files']
+        self.totals = data['totals']
+        return True
+
+    def _save(self) -> None:
+        if not self._dirty:
+            return
+        data = {
+            'version': STATS_VERSION,
+            'directory': str(self.directory),
+            'dir_mtime_ns': self._dir_mtime_ns(),
+            'files': self.files,
+            'totals': self.totals
+        }
+        fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), prefix=f'.{self.path.name}.')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._dirty = False
+
+    def rebuild(self) -> None:
+        """读取目录下所有直觉文件重建汇总（未修改的文件走解析缓存）"""
+        self.files = {}
+        self.totals = _empty_totals()
+        cache = ParseCache(DOCUMENT_CACHE_NAMESPACE)
+        for file in sorted(self.directory.glob('*.yaml')) if self.directory.exists() else []:
+            try:
+                document = cache.get(file, parse_frontmatter_document)
+            except (OSError, ValueError):
+                continue
+            if document is not None:
+                self.record(file, document['frontmatter'])
+        cache.save()
+        self._dirty = True
+
+    def _apply(self, record: Dict, sign: int) -> None:
+        totals = self.totals
+        domain = totals['domains'].setdefault(record['domain'], {'count': 0, 'confidence_sum': 0.0})
+        domain['count'] += sign
+        domain['confidence_sum'] += sign * record['confidence']
+        if domain['count'] <= 0:
+            del totals['domains'][record['domain']]
+
+        # 项目、直方图、stale 只统计 code-navigation 直觉(与 instinct-manager 的管理范围一致)
+        if record['domain'] != 'code-navigation':
+            return
+        project = totals['projects'].setdefault(record['project'], {'count': 0, 'confidence_sum': 0.0})
+        project['count'] += sign
+        project['confidence_sum'] += sign * record['confidence']
+        if project['count'] <= 0:
+            del totals['projects'][record['project']]
+        totals['histogram'][_bucket(record['confidence'])] += sign
+        totals['stale'] += sign * record['stale']
+        totals['total'] += sign
+
+    def record(self, file: Path, frontmatter: Dict) -> None:
+        """文件被写入（新建或更新）后调用"""
+        key = Path(file).name
+        previous = self.files.get(key)
+        if previous is not None:
+            self._apply(previous, -1)
+        record = file_record(frontmatter)
+        self.files[key] = record
+        self._apply(record, 1)
+        self._dirty = True
+
+    def remove(self, file: Path) -> None:
+        """文件被删除或归档后调用"""
+        previous = self.files.pop(Path(file).name, None)
+        if previous is not None:
+            self._apply(previous, -1)
+            self._dirty = True
+
+    def statistics(self) -> Dict:
+        """
+        统计结果
+
+        Returns:
+            code-navigation 的 total / projects / by_project / stale / confidence_histogram，
+            以及所有领域的 by_domain
+        """
+        totals = self.totals
+
+        def summary(groups: Dict) -> Dict:
+            return {
+                key: {'count': value['count'],
+                      'avg_confidence': round(value['confidence_sum'] / value['count'], 2)}
+                for key, value in sorted(groups.items(), key=lambda item: (-item[1]['count'], item[0]))
+            }
+
+        return {
+            'total': totals['total'],
+            'projects': len(totals['projects']),
+            'by_project': summary(totals['projects']),
+            'stale': totals['stale'],
+            'confidence_histogram': {
+                f'{n / HISTOGRAM_BUCKETS:.1f}-{(n + 1) / HISTOGRAM_BUCKETS:.1f}': count
+                for n, count in enumerate(totals['histogram'])
+            },
+            'by_domain': summary(totals['domains'])
+        }
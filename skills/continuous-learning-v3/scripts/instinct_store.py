@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Instinct Store
+
+直觉的 SQLite 索引（~/.claude/homunculus/instincts.db）。
+
+YAML 文件仍是唯一的数据源，人工编辑后无需任何操作：每次查询前 sync()
+比较各文件的 (mtime, size)，只重新解析新增或修改过的文件，删除的文件同步移除。
+变化的文件由有界线程池并行读取（config.json 的 instincts.load_workers），
+instincts.parse_processes 大于 1 时解析交给进程池。
+索引覆盖 domain / confidence / project，status、export --domain、
+max_instincts 上限检查都是索引查询，不再逐个读取和解析 YAML。
+
+Usage:
+  instinct_store.py sync
+  instinct_store.py query [--domain D] [--min-confidence C] [--project P]
+  instinct_store.py rebuild
+"""
+
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config_loader import load_config
+from instinct_parser import DEFAULT_LOAD_WORKERS, load_instinct_files
+
+HOMUNCULUS_DIR = Path.home() / '.claude' / 'homunculus'
+DEFAULT_DB_PATH = HOMUNCULUS_DIR / 'instincts.db'
+DEFAULT_DIRECTORIES = {
+    'personal': HOMUNCULUS_DIR / 'instincts' / 'personal',
+    'inherited': HOMUNCULUS_DIR / 'instincts' / 'inherited',
+}
+SCHEMA_VERSION = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    source_type TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS instincts (
+    source_file TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    source_type TEXT NOT NULL,
+    domain TEXT,
+    subtype TEXT,
+    confidence REAL,
+    project TEXT,
+    last_used TEXT,
+    source TEXT,
+    trigger TEXT,
+    file_mtime REAL NOT NULL,
+    body TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (source_file, position)
+);
+CREATE INDEX IF NOT EXISTS idx_instincts_id ON instincts(id);
+CREATE INDEX IF NOT EXISTS idx_instincts_domain ON instincts(domain, confidence);
+CREATE INDEX IF NOT EXISTS idx_instincts_confidence ON instincts(confidence);
+CREATE INDEX IF NOT EXISTS idx_instincts_project ON instincts(project);
+"""
+
+# 查询结果按目录（personal 在前）、文件、文件内位置排序，与逐个读取文件的顺序一致
+_ORDER = "ORDER BY CASE source_type WHEN 'personal' THEN 0 ELSE 1 END, source_file, position"
+
+
+def _text(value) -> Optional[str]:
+    """索引列中的文本字段：YAML 回退解析可能得到日期、列表等，统一转为字符串"""
+    return value if value is None or isinstance(value, str) else str(value)
+
+
+def _confidence(value) -> float:
+    """索引列中的置信度：未写或无法解析时按默认 0.5，过滤条件因此可以直接走索引"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.5
+
+
+class InstinctStore:
+    """
+    SQLite 直觉索引
+
+    Args:
+        db_path: 数据库路径
+        directories: 来源类型 → 直觉目录，默认 personal / inherited
+        workers: 读取文件的线程数上限
+        processes: 解析进程数，0 或 1 表示在线程中解析
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH,
+                 directories: Optional[Dict[str, Path]] = None,
+                 workers: int = DEFAULT_LOAD_WORKERS, processes: int = 0):
+        self.db_path = Path(db_path).expanduser()
+        self.directories = directories or DEFAULT_DIRECTORIES
+        self.workers = workers
+        self.processes = processes
+        self.errors: List[Tuple[str, str]] = []
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA foreign_keys = ON')
+            if conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+                conn.executescript('DROP TABLE IF EXISTS instincts; DROP TABLE IF EXISTS files;')
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _scan(self) -> Dict[str, Tuple[str, int, int]]:
+        """列出所有直觉文件：路径 → (来源类型, mtime_ns, size)"""
+        found = {}
+        for source_type, directory in self.directories.items():
+            directory = Path(directory).expanduser()
+            if not directory.exists():
+                continue
+            for file in directory.glob('*.yaml'):
+                try:
+                    stat = file.stat()
+                except FileNotFoundError:
+                    continue
+                found[str(file)] = (source_type, stat.st_mtime_ns, stat.st_size)
+        return found
+
+    def sync(self) -> int:
+        """
+        让索引与 YAML 文件保持一致
+
+        只解析新增或 (mtime, size) 变化的文件；无法解析的文件记入 self.errors
+        且不进入索引，下次同步时重试。
+
+        Returns:
+            重新解析的文件数
+        """
+        conn = self.conn
+        found = self._scan()
+        known = {row['path']: (row['source_type'], row['mtime_ns'], row['size'])
+                 for row in conn.execute('SELECT path, source_type, mtime_ns, size FROM files')}
+
+        removed = [path for path in known if path not in found]
+        changed = sorted(path for path, meta in found.items() if known.get(path) != meta)
+        if not removed and not changed:
+            return 0
+
+        # 读取和解析在事务外并行完成，写入按路径顺序进行
+        loaded, errors = load_instinct_files(changed, workers=self.workers, processes=self.processes)
+        self.errors.extend(errors)
+
+        with conn:
+            conn.executemany('DELETE FROM files WHERE path = ?',
+                             [(path,) for path in removed] + [(path,) for path in changed])
+            for path, instincts in loaded:
+                source_type, mtime_ns, size = found[path]
+                conn.execute('INSERT INTO files (path, source_type, mtime_ns, size) VALUES (?, ?, ?, ?)',
+                             (path, source_type, mtime_ns, size))
+                conn.executemany(
+                    'INSERT INTO instincts (source_file, position, id, source_type, domain, subtype, '
+                    'confidence, project, last_used, source, trigger, file_mtime, body, data) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    [
+                        (path, position, _text(inst['id']), source_type, _text(inst.get('domain')),
+                         _text(inst.get('subtype')), _confidence(inst.get('confidence')),
+                         _text(inst.get('project')), _text(inst.get('last_used')),
+                         _text(inst.get('source')), _text(inst.get('trigger')), mtime_ns / 1e9,
+                         inst.get('content', ''), json.dumps(inst, ensure_ascii=False, default=str))
+                        for position, inst in enumerate(instincts)
+                    ]
+                )
+        return len(changed)
+
+    def rebuild(self) -> int:
+        """清空索引后全量重建，返回解析的文件数"""
+        with self.conn:
+            self.conn.execute('DELETE FROM files')
+        return self.sync()
+
+    @staticmethod
+    def _where(domain: Optional[str] = None, min_confidence: Optional[float] = None,
+               project: Optional[str] = None, source_type: Optional[str] = None,
+               modified_since: Optional[float] = None) -> Tuple[str, list]:
+        """把过滤条件转换为 WHERE 子句和参数"""
+        clauses, params = [], []
+        for column, value in (('domain', domain), ('project', project), ('source_type', source_type)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        if min_confidence is not None:
+            clauses.append('confidence >= ?')
+            params.append(min_confidence)
+        if modified_since is not None:
+            clauses.append('file_mtime >= ?')
+            params.append(modified_since)
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ''), params
+
+    def iter_query(self, **filters) -> Iterator[Dict]:
+        """
+        按条件逐条产出直觉，不在内存中保留整个结果集（过滤条件同 query）
+
+        Yields:
+            直觉字典
+        """
+        where, params = self._where(**filters)
+        rows = self.conn.execute(
+            f'SELECT source_file, source_type, data FROM instincts {where} {_ORDER}', params)
+        for row in rows:
+            yield self._to_instinct(row)
+
+    def query(self, domain: Optional[str] = None, min_confidence: Optional[float] = None,
+              project: Optional[str] = None, source_type: Optional[str] = None,
+              modified_since: Optional[float] = None) -> List[Dict]:
+        """
+        按条件查询直觉（调用方应先 sync()）
+
+        Args:
+            domain: 领域
+            min_confidence: 最低置信度
+            project: 项目
+            source_type: personal / inherited
+            modified_since: 只返回文件修改时间（epoch 秒）不早于该值的直觉
+
+        Returns:
+            直觉字典列表（与解析结果相同，另含 _source_file / _source_type）
+        """
+        return list(self.iter_query(domain=domain, min_confidence=min_confidence, project=project,
+                                    source_type=source_type, modified_since=modified_since))
+
+    def all(self) -> List[Dict]:
+        """所有直觉"""
+        return self.query()
+
+    def count(self, **filters) -> int:
+        """符合条件（同 query）的直觉数量"""
+        where, params = self._where(**filters)
+        return self.conn.execute(f'SELECT COUNT(*) FROM instincts {where}', params).fetchone()[0]
+
+    def confidence_by_id(self) -> Dict[str, float]:
+        """直觉 id → 已有的最高置信度（导入时按 id 判断新增/更新/跳过）"""
+        rows = self.conn.execute('SELECT id, MAX(confidence) FROM instincts GROUP BY id')
+        return {row[0]: row[1] for row in rows}
+
+    def count_by(self, column: str) -> Dict[str, int]:
+        """按 domain / source_type / project 分组计数"""
+        if column not in ('domain', 'source_type', 'project'):
+            raise ValueError(f'Unsupported group column: {column}')
+        rows = self.conn.execute(
+            f'SELECT {column} AS key, COUNT(*) AS n FROM instincts GROUP BY {column} ORDER BY n DESC')
+        return {row['key'] or 'general': row['n'] for row in rows}
+
+    def excess(self, max_instincts: int) -> List[Dict]:
+        """
+        超出 max_instincts 上限的个人直觉（置信度最低的若干条）
+
+        Args:
+            max_instincts: 个人直觉数量上限
+
+        Returns:
+            按置信度从低到高排列的超额直觉
+        """
+        total = self.conn.execute(
+            "SELECT COUNT(*) FROM instincts WHERE source_type = 'personal'").fetchone()[0]
+        if total <= max_instincts:
+            return []
+        rows = self.conn.execute(
+            "SELECT source_file, source_type, data FROM instincts WHERE source_type = 'personal' "
+            "ORDER BY confidence, file_mtime LIMIT ?", (total - max_instincts,))
+        return [self._to_instinct(row) for row in rows]
+
+    @staticmethod
+    def _to_instinct(row: sqlite3.Row) -> Dict:
+        inst = json.loads(row['data'])
+        inst['_source_file'] = row['source_file']
+        inst['_source_type'] = row['source_type']
+        return inst
+
+
+def _configured_store() -> InstinctStore:
+    """按 config.json 的并行加载设置打开默认位置的索引"""
+    settings = load_config().get('instincts', {})
+    return InstinctStore(workers=settings.get('load_workers', DEFAULT_LOAD_WORKERS),
+                         processes=settings.get('parse_processes', 0))
+
+
+def open_store() -> InstinctStore:
+    """打开默认位置的直觉索引并与 YAML 文件同步，解析失败的文件输出警告"""
+    store = _configured_store()
+    store.sync()
+    for path, error in store.errors:
+        print(f"Warning: Failed to parse {path}: {error}", file=sys.stderr)
+    return store
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='SQLite index of instinct YAML files')
+    parser.add_argument('command', choices=['sync', 'query', 'rebuild'], help='Command to execute')
+    parser.add_argument('--domain', help='Filter by domain')
+    parser.add_argument('--min-confidence', type=float, help='Minimum confidence')
+    parser.add_argument('--project', help='Filter by project')
+
+    args = parser.parse_args()
+    store = _configured_store()
+
+    if args.command == 'sync':
+        print(f"Synced {store.sync()} changed files ({store.count()} instincts)")
+    elif args.command == 'rebuild':
+        print(f"Rebuilt index from {store.rebuild()} files ({store.count()} instincts)")
+    elif args.command == 'query':
+        store.sync()
+        for inst in store.query(args.domain, args.min_confidence, args.project):
+            print(json.dumps({k: v for k, v in inst.items() if k != 'content'}, ensure_ascii=False))
+
+    for path, error in store.errors:
+        print(f"Warning: Failed to parse {path}: {error}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
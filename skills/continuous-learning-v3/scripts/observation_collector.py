@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Observation Collector
+
+常驻的观测收集进程，通过 Unix socket 接收 observe.sh 转发的钩子载荷。
+
+observe.sh 每次工具调用只需把载荷发给 socket（nc -U），不再启动 python3；
+收集器在内存中保持配置和错误分类器，把载荷转换为 schema 2 记录后
+交给写入线程，按批次追加到观测日志，每批只 fsync 一次。
+
+收集器由 observe.sh 按需启动，空闲超过 idle_timeout_minutes 后自动退出；
+未运行或 socket 不可达时，observe.sh 回退为直接写入（observation_store.py ingest）。
+
+协议：每个连接发送一条载荷，以换行结尾；收集器读到完整 JSON 或 EOF 即关闭连接。
+
+Usage:
+  observation_collector.py serve [--store PATH] [--socket PATH] [--max-size-mb N]
+  observation_collector.py status
+  observation_collector.py stop
+  observation_collector.py check-nc
+"""
+
+import fcntl
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config_loader import load_config
+from error_classifier import load_error_classifier
+from observation_schema import build_observations
+from observation_store import (
+    DEFAULT_STORE_PATH,
+    ObservationStore,
+    archive_after_days,
+    parse_hook_payload,
+)
+
+CONFIG_DIR = Path.home() / '.claude' / 'homunculus'
+DEFAULT_SOCKET_PATH = CONFIG_DIR / '.collector.sock'
+PID_FILE_NAME = '.collector.pid'
+
+BATCH_MAX_RECORDS = 256
+RECV_CHUNK_SIZE = 64 * 1024
+RECV_TIMEOUT = 1.0  # 单个连接的读超时（秒）
+POLL_INTERVAL = 1.0  # 主循环检查空闲和停止信号的间隔（秒）
+
+
+class _PayloadHandler(socketserver.BaseRequestHandler):
+    """读取一条钩子载荷，转换为观测记录后放入写入队列"""
+
+    def handle(self):
+        collector: ObservationCollector = self.server.collector
+        collector.touch()
+        conn: socket.socket = self.request
+        conn.settimeout(RECV_TIMEOUT)
+
+        chunks = []
+        records: Optional[List[Dict]] = None
+        try:
+            while True:
+                chunk = conn.recv(RECV_CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                # 载荷以换行结尾且能完整解析时即可关闭连接，不等待客户端 EOF
+                if chunk.endswith(b'\n'):
+                    try:
+                        data = json.loads(b''.join(chunks))
+                    except ValueError:
+                        continue
+                    if isinstance(data, dict):
+                        records = build_observations(data, collector.classifier)
+                    break
+        except socket.timeout:
+            pass
+
+        raw = b''.join(chunks).decode('utf-8', errors='replace').rstrip('\n')
+        if records is None:
+            if not raw.strip():
+                return
+            records = parse_hook_payload(raw, collector.classifier)
+        collector.submit(records)
+
+
+class _CollectorServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    # server_close() 等待处理中的连接把记录放入队列后才返回
+    daemon_threads = False
+    block_on_close = True
+
+
+class ObservationCollector:
+    """
+    常驻观测收集器
+
+    Args:
+        store: 观测存储
+        socket_path: Unix socket 路径
+        max_bytes: 活动段轮转阈值
+        max_age_days: 活动段首条记录早于该天数时轮转，None 表示不按时间轮转
+        flush_interval: 批次等待时间（秒），同一批记录共用一次 write + fsync
+        idle_timeout: 无连接超过该时间（秒）后退出
+    """
+
+    def __init__(self, store: ObservationStore, socket_path: Path, max_bytes: int,
+                 max_age_days: Optional[float] = None,
+                 flush_interval: float = 0.05, idle_timeout: float = 1800):
+        self.store = store
+        self.socket_path = Path(socket_path)
+        self.pid_file = self.socket_path.parent / PID_FILE_NAME
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.flush_interval = flush_interval
+        self.idle_timeout = idle_timeout
+        self.classifier = load_error_classifier(load_config())
+        self.queue: queue.Queue = queue.Queue()
+        self.last_activity = time.monotonic()
+        # stop_requested 结束接受连接的主循环；stopping 在处理线程全部结束后才通知写入线程
+        self.stop_requested = threading.Event()
+        self.stopping = threading.Event()
+
+    def touch(self) -> None:
+        """记录最近一次连接时间"""
+        self.last_activity = time.monotonic()
+
+    def submit(self, records: List[Dict]) -> None:
+        """把一条载荷的记录放入写入队列"""
+        if records:
+            self.queue.put(records)
+
+    def _next_batch(self) -> List[Dict]:
+        """等待第一条载荷，再在 flush_interval 内尽量凑满一批"""
+        try:
+            batch = list(self.queue.get(timeout=POLL_INTERVAL))
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < BATCH_MAX_RECORDS:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.extend(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self) -> List[Dict]:
+        """取出队列中剩余的全部记录"""
+        batch = []
+        while True:
+            try:
+                batch.extend(self.queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _write(self, batch: List[Dict]) -> None:
+        try:
+            archived = self.store.rotate_if_due(self.max_bytes, self.max_age_days)
+            if archived:
+                print(f"Archived observations to: {archived}", file=sys.stderr)
+            self.store.append(batch, fsync=True)
+        except OSError as e:
+            print(f"Error: Failed to write observations: {e}", file=sys.stderr)
+
+    def _writer_loop(self) -> None:
+        """写入线程：按批次追加，停止时写完队列中剩余的记录"""
+        while not self.stopping.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+        batch = self._drain()
+        if batch:
+            self._write(batch)
+
+    def _acquire_pid_lock(self):
+        """独占 pid 文件锁，已有收集器运行时返回 None"""
+        self.pid_file.parent.mkdir(parents=True, exist_ok=True)
+        lock = open(self.pid_file, 'a+')
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock.close()
+            return None
+        lock.seek(0)
+        lock.truncate()
+        lock.write(str(os.getpid()))
+        lock.flush()
+        return lock
+
+    def serve(self) -> bool:
+        """
+        运行收集器直到空闲超时或收到 SIGTERM/SIGINT
+
+        Returns:
+            是否成功启动（已有收集器在运行时返回 False）
+        """
+        lock = self._acquire_pid_lock()
+        if lock is None:
+            return False
+
+        # 持有 pid 锁后残留的 socket 文件一定是上次异常退出留下的
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        old_umask = os.umask(0o077)
+        try:
+            server = _CollectorServer(str(self.socket_path), _PayloadHandler)
+        finally:
+            os.umask(old_umask)
+        server.collector = self
+        server.timeout = POLL_INTERVAL
+
+        def request_stop(signum, frame):
+            self.stop_requested.set()
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+        writer = threading.Thread(target=self._writer_loop, name='observation-writer')
+        writer.start()
+        try:
+            while not self.stop_requested.is_set():
+                server.handle_request()
+                if time.monotonic() - self.last_activity > self.idle_timeout:
+                    break
+        finally:
+            # 先移除 socket，新的钩子调用会回退为直接写入；
+            # 再停止接受连接并等待处理线程提交完记录，写入线程最后一次取出的队列才是完整的
+            try:
+                self.socket_path.unlink(missing_ok=True)
+                server.server_close()
+            finally:
+                self.stopping.set()
+                writer.join()
+                self.pid_file.unlink(missing_ok=True)
+                lock.close()
+        return True
+
+
+def read_pid(socket_path: Path) -> Optional[int]:
+    """读取运行中收集器的 PID，未运行时返回 None"""
+    pid_file = Path(socket_path).parent / PID_FILE_NAME
+    try:
+        pid = int(pid_file.read_text().strip())
+        os.kill(pid, 0)
+    except (OSError, ValueError):
+        return None
+    return pid
+
+
+def nc_supports_unix_sockets(timeout: float = 2.0) -> bool:
+    """
+    检测 nc 能否通过 Unix socket 发送数据（observe.sh 的快速路径依赖 nc -U）
+
+    部分 nc 实现（busybox、traditional netcat）不支持 -U，或把它当作其他选项，
+    因此实际起一个临时 socket 让 nc -U 发送一行数据。
+
+    Args:
+        timeout: 等待 nc 连接和发送的时间（秒）
+
+    Returns:
+        收到 nc 发送的数据时为 True
+    """
+    with tempfile.TemporaryDirectory(prefix='collector-nc-') as directory:
+        path = os.path.join(directory, 'probe.sock')
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(path)
+            server.listen(1)
+            server.settimeout(timeout)
+            try:
+                process = subprocess.Popen(['nc', '-U', '-w', '1', path], stdin=subprocess.PIPE,
+                                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            except OSError:
+                return False
+            try:
+                process.stdin.write(b'probe\n')
+                process.stdin.close()
+                conn, _ = server.accept()
+                with conn:
+                    conn.settimeout(timeout)
+                    return conn.recv(16).startswith(b'probe')
+            except OSError:
+                return False
+            finally:
+                try:
+                    process.wait(timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+        finally:
+            server.close()
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Resident observation collector')
+    parser.add_argument('command', choices=['serve', 'status', 'stop', 'check-nc'], help='Command to execute')
+    parser.add_argument('--store', default=str(DEFAULT_STORE_PATH),
+                        help='Path to observations.jsonl')
+    parser.add_argument('--socket', default=str(DEFAULT_SOCKET_PATH),
+                        help='Unix socket path')
+    parser.add_argument('--max-size-mb', type=int, default=10,
+                        help='Rotate the active segment at this size')
+
+    args = parser.parse_args()
+    socket_path = Path(args.socket)
+
+    if args.command == 'status':
+        pid = read_pid(socket_path)
+        print(f"Collector is running (PID: {pid})" if pid else "Collector not running")
+        sys.exit(0 if pid else 1)
+
+    if args.command == 'check-nc':
+        supported = nc_supports_unix_sockets()
+        print("nc supports Unix sockets" if supported else "nc does not support Unix sockets")
+        sys.exit(0 if supported else 1)
+
+    if args.command == 'stop':
+        pid = read_pid(socket_path)
+        if pid:
+            os.kill(pid, signal.SIGTERM)
+            print(f"Stopping collector (PID: {pid})")
+        else:
+            print("Collector not running")
+        return
+
+    config = load_config()
+    settings = config.get('observation', {}).get('collector', {})
+    collector = ObservationCollector(
+        ObservationStore(args.store),
+        socket_path,
+        max_bytes=args.max_size_mb * 1024 * 1024,
+        max_age_days=archive_after_days(config),
+        flush_interval=settings.get('flush_interval_ms', 50) / 1000,
+        idle_timeout=settings.get('idle_timeout_minutes', 30) * 60
+    )
+    if not collector.serve():
+        print("Collector already running")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Observation Schema
+
+观测记录的版本化格式。字段在写入观测时（observe.sh）提取一次，
+下游检测器直接读取，不再解析嵌套的 input JSON 或 ISO 时间戳。
+
+schema 2 记录字段：
+  schema     记录格式版本（旧记录没有该字段，视为 1）
+  timestamp  ISO 时间（UTC，保留给 observer 智能体和旧读取方）
+  ts         epoch 秒
+  event      tool_start / tool_complete / user_query / parse_error
+  tool       工具名
+  session    会话 ID
+  input      截断后的工具输入（tool_start）
+  output     截断后的工具输出（tool_complete）
+  paths      工具输入中的文件路径（tool_start）
+  symbol     Edit 修改处的函数名（tool_start）
+  error      输出的错误类别，无错误时省略（tool_complete）
+  query / intent / keywords   用户查询及其关键词（user_query）
+"""
+
+import json
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+SCHEMA_VERSION = 2
+MAX_FIELD_LENGTH = 5000
+
+# 代码查找意图关键词
+CODE_SEARCH_KEYWORDS = [
+    # 中文
+    "我想修改", "找到", "查找", "在哪", "哪里", "定位", "搜索",
+    "看看", "检查", "查看", "打开", "编辑", "更改",
+    # 英文
+    "find", "locate", "where", "search", "look for", "show me",
+    "open", "edit", "modify", "change", "update"
+]
+
+STOPWORDS = {
+    "的", "了", "在", "是", "我", "有", "和", "就", "不", "人", "都", "一", "一个",
+    "the", "a", "an", "is", "are", "was", "were", "be", "been", "being",
+    "have", "has", "had", "do", "does", "did", "will", "would", "should",
+    "can", "could", "may", "might", "must", "i", "you", "he", "she", "it",
+    "we", "they", "this", "that", "these", "those"
+}
+
+
+# 工具输入中表示文件路径的字段
+PATH_FIELDS = ('file_path', 'path', 'notebook_path')
+# 这些工具的 pattern 字段是路径 glob（Grep 的 pattern 是正则，不算路径）
+PATH_PATTERN_TOOLS = {'Glob'}
+
+
+def normalize_path(path: str, cwd: Optional[str] = None) -> str:
+    """
+    规范化文件路径
+
+    Args:
+        path: 原始路径
+        cwd: 工具调用时的工作目录，用于补全相对路径
+
+    Returns:
+        规范化后的路径
+    """
+    path = path.strip()
+    if cwd and not os.path.isabs(path) and not path.startswith('~'):
+        path = os.path.join(cwd, path)
+    return os.path.normpath(path)
+
+
+def extract_paths(tool: str, tool_input: Any, cwd: Optional[str] = None) -> List[str]:
+    """
+    从结构化的工具输入中提取文件路径
+
+    Args:
+        tool: 工具名
+        tool_input: 工具输入（dict 或 JSON 字符串）
+        cwd: 工具调用时的工作目录
+
+    Returns:
+        去重后的规范化路径列表（保持出现顺序）
+    """
+    if isinstance(tool_input, str):
+        try:
+            tool_input = json.loads(tool_input)
+        except (json.JSONDecodeError, ValueError):
+            return []
+    if not isinstance(tool_input, dict):
+        return []
+
+    fields = PATH_FIELDS + (('pattern',) if tool in PATH_PATTERN_TOOLS else ())
+    paths = []
+    for field in fields:
+        value = tool_input.get(field)
+        if isinstance(value, str) and value.strip():
+            path = normalize_path(value, cwd)
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def observation_paths(obs: Dict) -> List[str]:
+    """
+    读取观测的文件路径
+
+    新记录直接使用写入时提取的 paths 字段；旧记录没有该字段，
+    回退为解析 input（JSON 被截断时按空白切分做启发式识别）。
+
+    Args:
+        obs: 观测字典
+
+    Returns:
+        文件路径列表
+    """
+    paths = obs.get('paths')
+    if isinstance(paths, list):
+        return paths
+
+    input_data = obs.get('input', '')
+    paths = extract_paths(obs.get('tool', ''), input_data)
+    if paths or not isinstance(input_data, str):
+        return paths
+
+    for segment in input_data.split():
+        if '/' in segment and ('.' in segment.split('/')[-1]):
+            paths.append(segment.strip('"\','))
+    return paths
+
+
+def is_code_search_query(query: str) -> bool:
+    """
+    判断是否为代码查找查询
+
+    Args:
+        query: 用户查询字符串
+
+    Returns:
+        是否为代码查找查询
+    """
+    query_lower = query.lower()
+    return any(keyword in query_lower for keyword in CODE_SEARCH_KEYWORDS)
+
+
+def extract_keywords(query: str) -> List[str]:
+    """
+    从自然语言查询中提取关键词
+
+    Args:
+        query: 用户查询字符串
+
+    Returns:
+        关键词列表(最多 5 个)
+    """
+    # 分词(简单实现)
+    words = re.findall(r'\w+', query.lower())
+
+    # 过滤停用词和短词
+    keywords = [w for w in words if w not in STOPWORDS and len(w) > 1]
+
+    return keywords[:5]
+
+
+def extract_symbol(tool_input: Any) -> Optional[str]:
+    """
+    从 Edit 工具输入的 old_string 中提取函数名
+
+    Args:
+        tool_input: 工具输入（dict 或 JSON 字符串）
+
+    Returns:
+        函数名或 None
+    """
+    if isinstance(tool_input, str):
+        try:
+            tool_input = json.loads(tool_input)
+        except (json.JSONDecodeError, ValueError):
+            return None
+    if not isinstance(tool_input, dict):
+        return None
+
+    old_string = tool_input.get('old_string', '')
+    if not isinstance(old_string, str):
+        return None
+    func_match = re.search(r'function\s+(\w+)|def\s+(\w+)|(\w+)\s*\(', old_string)
+    if func_match:
+        return next(g for g in func_match.groups() if g)
+    return None
+
+
+def _truncate(value: Any) -> str:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)[:MAX_FIELD_LENGTH]
+    return str(value)[:MAX_FIELD_LENGTH]
+
+
+def build_observations(data: Dict, classifier=None, now: Optional[float] = None) -> List[Dict]:
+    """
+    把 Claude Code 钩子载荷转换为 schema 2 观测记录
+
+    Args:
+        data: 钩子 JSON（PreToolUse / PostToolUse）
+        classifier: 错误分类器（error_classifier.ErrorClassifier），为 None 时不标记错误
+        now: 记录时间（epoch 秒），默认当前时间
+
+    Returns:
+        观测记录列表（工具事件，以及可能的用户查询事件）
+    """
+    now = time.time() if now is None else now
+    timestamp = datetime.fromtimestamp(now, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    hook_type = data.get('hook_event_name', data.get('hook_type', 'unknown'))
+    tool_name = data.get('tool_name', data.get('tool', 'unknown'))
+    tool_input = data.get('tool_input', data.get('input', {}))
+    tool_output = data.get('tool_response', data.get('tool_output', data.get('output', '')))
+    session_id = data.get('session_id', 'unknown')
+    user_message = data.get('user_message', '')
+
+    is_pre = 'Pre' in hook_type
+    observation = {
+        'schema': SCHEMA_VERSION,
+        'timestamp': timestamp,
+        'ts': round(now, 3),
+        'event': 'tool_start' if is_pre else 'tool_complete',
+        'tool': tool_name,
+        'session': session_id
+    }
+
+    if is_pre:
+        input_str = _truncate(tool_input)
+        if input_str:
+            observation['input'] = input_str
+        paths = extract_paths(tool_name, tool_input, data.get('cwd'))
+        if paths:
+            observation['paths'] = paths
+        if tool_name == 'Edit':
+            symbol = extract_symbol(tool_input)
+            if symbol:
+                observation['symbol'] = symbol
+    else:
+        output_str = _truncate(tool_output)
+        if output_str:
+            observation['output'] = output_str
+            if classifier is not None:
+                category = classifier.classify(output_str)
+                if category:
+                    observation['error'] = category
+
+    observations = [observation]
+
+    # Code navigation: detect user query intent
+    if user_message and is_pre and is_code_search_query(user_message):
+        observations.append({
+            'schema': SCHEMA_VERSION,
+            'timestamp': timestamp,
+            'ts': round(now, 3),
+            'event': 'user_query',
+            'query': user_message,
+            'intent': 'code_search',
+            'keywords': extract_keywords(user_message),
+            'session': session_id
+        })
+
+    return observations
+
+
+def parse_error_observation(raw: str, now: Optional[float] = None) -> Dict:
+    """钩子载荷无法解析时记录原始输入（截断）便于排查"""
+    now = time.time() if now is None else now
+    return {
+        'schema': SCHEMA_VERSION,
+        'timestamp': datetime.fromtimestamp(now, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'ts': round(now, 3),
+        'event': 'parse_error',
+        'raw': raw[:1000]
+    }
+
+
+def observation_time(obs: Dict) -> Optional[float]:
+    """
+    读取观测的 epoch 时间
+
+    schema 2 记录直接使用 ts 字段，旧记录回退为解析 ISO 时间戳。
+
+    Args:
+        obs: 观测字典
+
+    Returns:
+        epoch 秒或 None
+    """
+    ts = obs.get('ts')
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    value = obs.get('timestamp')
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
@@ -0,0 +1,1203 @@
+#!/usr/bin/env python3
+"""
+Observation Store
+
+分段观测日志：
+- 活动段：observations.jsonl（observe.sh 持续追加）
+- 归档段：observations.archive/*.jsonl.gz（轮转后压缩的历史段；
+  未压缩的 *.jsonl 归档同样可读：旧版本留下的，或钩子回退路径轮转后
+  正由后台进程压缩的）
+
+压缩段由多个独立的 gzip 帧（member）拼接而成，每帧约 FRAME_SIZE 字节原文，
+整体仍是标准 gzip 文件（zcat 可直接读）。索引为每帧记录压缩偏移、时间范围、
+会话、工具和错误类别，时间窗口查询、游标续读和尾部读取只解压相关的帧；
+summarize() 对完全落在窗口内的帧直接累加索引计数，不解压。
+
+活动段超过 max_file_size_mb，或首条记录早于 archive_after_days 时轮转。
+追加持有 observations.jsonl.lock 的共享锁（每批记录一次 O_APPEND write），
+轮转持有排他锁，因此多个会话并发写入时既不会交错，也不会写进正在归档的段。
+
+每个归档段旁有一个 .idx.json 索引（行数、行偏移采样、会话、时间范围、工具、
+帧目录，以及按会话和小时分桶的文件访问计数），尾部读取、计数、时间窗口查询和
+热点文件查询只需访问相关段，而不必扫描全部历史。
+段文件本身保持纯 JSONL，observer 智能体和 `wc -l` 仍可直接读取。
+
+Usage:
+  observation_store.py count
+  observation_store.py tail [N]
+  observation_store.py summary [--since ISO] [--until ISO] [--session ID]
+  observation_store.py rotate
+  observation_store.py compress
+  observation_store.py reindex
+  observation_store.py hot-files [--since ISO] [--until ISO] [--session ID]
+  observation_store.py ingest [--max-size-mb N] < hook.json
+"""
+
+import bisect
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import zlib
+from contextlib import contextmanager
+from functools import lru_cache
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from config_loader import load_config
+from observation_schema import observation_paths, observation_time
+
+
+DEFAULT_STORE_PATH = Path.home() / '.claude' / 'homunculus' / 'observations.jsonl'
+INDEX_SUFFIX = '.idx.json'
+INDEX_VERSION = 5
+FRAME_SIZE = 256 * 1024  # 压缩段每帧的原文字节数（按整行切分）
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+FRAME_READ_SIZE = 64 * 1024  # 逐帧解压时每次读入的压缩字节数
+LOCK_SUFFIX = '.lock'
+COMPRESS_LOCK_NAME = '.compress.lock'
+ARCHIVE_SUFFIX = '.jsonl.gz'
+DEFAULT_ARCHIVE_AFTER_DAYS = 7
+OFFSET_STRIDE = 1000  # 每隔多少行记录一次字节偏移
+READ_CHUNK_SIZE = 1024 * 1024
+HOUR_BUCKET_LEN = len('2026-01-01T00')  # 文件访问计数按小时分桶
+TAIL_BLOCK_SIZE = 64 * 1024
+
+TimeBound = Optional[Union[str, datetime]]
+Cursor = Dict  # {'head': 段首行摘要, 'offset': 段内字节偏移}
+
+# 归档段名中的轮转时间和同一秒内的序号：observations-20260101-120000-1.jsonl.gz
+_SEGMENT_NAME_RE = re.compile(r'-(\d{8})-(\d{6})(?:-(\d+))?\.jsonl(?:\.gz)?$')
+
+
+def _to_iso(bound: TimeBound) -> Optional[str]:
+    """将时间边界统一为观测使用的 ISO 字符串格式（UTC，Z 结尾）"""
+    if bound is None or isinstance(bound, str):
+        return bound
+    if bound.tzinfo is not None:
+        bound = bound.astimezone(timezone.utc)
+    return bound.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _decode_line(line: bytes) -> Optional[Dict]:
+    """解码一行观测，空行或损坏行返回 None"""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        record = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def _open_segment(path: Path):
+    """以二进制模式打开段文件，压缩归档透明解压"""
+    if path.name.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def _iter_gzip_frames(path: Path) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    逐帧解压多 member 的 gzip 文件
+
+    每帧从其压缩偏移开始按 FRAME_READ_SIZE 分块喂给解压器，
+    帧结束后多读的部分（unused_data）不超过一块，不会为每帧复制文件剩余部分。
+
+    Yields:
+        (帧的压缩偏移, 帧的压缩长度, 帧原文)
+    """
+    with open(path, 'rb') as f:
+        position = 0
+        while True:
+            f.seek(position)
+            decompressor = zlib.decompressobj(GZIP_WBITS)
+            parts = []
+            consumed = 0
+            while not decompressor.eof:
+                chunk = f.read(FRAME_READ_SIZE)
+                if not chunk:
+                    break
+                parts.append(decompressor.decompress(chunk))
+                consumed += len(chunk)
+            if not decompressor.eof:
+                # 文件结束，或写了一半的尾帧（丢弃）
+                break
+            length = consumed - len(decompressor.unused_data)
+            yield position, length, b''.join(parts)
+            position += length
+
+
+def _read_frame(f, frame: Dict) -> bytes:
+    """读取并解压索引中的一帧"""
+    f.seek(frame['offset'])
+    return zlib.decompress(f.read(frame['length']), GZIP_WBITS)
+
+
+def _frame_matches(frame: Dict, since: Optional[str], until: Optional[str],
+                   session: Optional[str]) -> bool:
+    """判断帧的时间范围和会话是否可能包含匹配的观测"""
+    if session is not None and session not in frame['sessions']:
+        return False
+    first, last = frame.get('first_ts'), frame.get('last_ts')
+    if first is None or last is None:
+        return True
+    if since is not None and last < since:
+        return False
+    if until is not None and first > until:
+        return False
+    return True
+
+
+def _record_matches(record: Dict, since: Optional[str], until: Optional[str],
+                    session: Optional[str]) -> bool:
+    if session is not None and record.get('session') != session:
+        return False
+    if since is None and until is None:
+        return True
+    ts = record.get('timestamp')
+    if not isinstance(ts, str):
+        return False
+    if since is not None and ts < since:
+        return False
+    if until is not None and ts > until:
+        return False
+    return True
+
+
+def _segment_order(path: Path) -> Tuple[str, int, str]:
+    """
+    归档段的排序键：(轮转时间, 序号, 文件名)
+
+    observations-* 与 start-observer.sh 旧版本的 processed-* 前缀不同，
+    但都在名字里带有轮转时间；名字里没有时间的段退回到修改时间。
+    """
+    match = _SEGMENT_NAME_RE.search(path.name)
+    if match:
+        return match.group(1) + match.group(2), int(match.group(3) or 0), path.name
+    return datetime.fromtimestamp(path.stat().st_mtime).strftime('%Y%m%d%H%M%S'), 0, path.name
+
+
+def _line_digest(line: bytes) -> str:
+    """段首行摘要，用于在轮转后重新定位游标所在的段"""
+    return hashlib.sha1(line.rstrip(b'\n')).hexdigest()[:16]
+
+
+def _iter_lines_reverse(f, block_size: int = TAIL_BLOCK_SIZE) -> Iterator[bytes]:
+    """
+    从文件末尾按块向前读取，逐行倒序产出
+
+    只在内存中保留当前块和一个跨块的不完整行。
+
+    Args:
+        f: 以二进制模式打开的文件
+        block_size: 每次向前读取的字节数
+
+    Yields:
+        行内容（不含换行符），从最后一行开始
+    """
+    f.seek(0, os.SEEK_END)
+    position = f.tell()
+    remainder = b''
+
+    while position > 0:
+        read_size = min(block_size, position)
+        position -= read_size
+        f.seek(position)
+        lines = (f.read(read_size) + remainder).split(b'\n')
+        # 第一段可能是被块边界截断的行，留到下一轮拼接
+        remainder = lines[0]
+        for line in reversed(lines[1:]):
+            yield line
+
+    if remainder:
+        yield remainder
+
+
+class Segment:
+    """观测日志中的一个段（活动段或归档段）"""
+
+    def __init__(self, path: Path, active: bool = False):
+        self.path = path
+        self.active = active
+        self._index: Optional[Dict] = None
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def index_path(self) -> Path:
+        return self.path.with_name(self.path.name + INDEX_SUFFIX)
+
+    @property
+    def compressed(self) -> bool:
+        return self.path.name.endswith('.gz')
+
+    def frames(self) -> List[Dict]:
+        """压缩段的帧目录；活动段和未压缩段为空"""
+        if self.active or not self.compressed:
+            return []
+        return self.index().get('frames', [])
+
+    def iter_frames(self, since: Optional[str] = None, until: Optional[str] = None,
+                    session: Optional[str] = None,
+                    reverse: bool = False) -> Iterator[Tuple[Dict, bytes]]:
+        """
+        只解压与时间窗口、会话相交的帧
+
+        Args:
+            since: 起始时间（含）
+            until: 结束时间（含）
+            session: 会话 ID
+            reverse: 是否从最后一帧开始
+
+        Yields:
+            (帧索引, 帧原文)
+        """
+        frames = self.frames()
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            for frame in (reversed(frames) if reverse else frames):
+                if _frame_matches(frame, since, until, session):
+                    yield frame, _read_frame(f, frame)
+
+    def iter_records(self) -> Iterator[Dict]:
+        """按写入顺序逐条产出该段的观测"""
+        if self.frames():
+            for _, content in self.iter_frames():
+                for line in content.splitlines():
+                    record = _decode_line(line)
+                    if record is not None:
+                        yield record
+            return
+        try:
+            f = _open_segment(self.path)
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                record = _decode_line(line)
+                if record is not None:
+                    yield record
+
+    def iter_records_from(self, offset: int = 0) -> Iterator[Tuple[Dict, int]]:
+        """
+        从指定字节偏移开始逐条产出观测及其结束偏移
+
+        只消费以换行结尾的完整行，未写完的最后一行留给下次读取。
+
+        Args:
+            offset: 起始字节偏移（压缩段为解压后的偏移）
+
+        Yields:
+            (观测, 该行之后的字节偏移)
+        """
+        frames = self.frames()
+        if frames:
+            # 从包含该偏移的帧开始解压，之前的帧直接跳过
+            start = max(bisect.bisect_right([frame['data_offset'] for frame in frames], offset) - 1, 0)
+            with open(self.path, 'rb') as f:
+                for frame in frames[start:]:
+                    position = frame['data_offset']
+                    for line in _read_frame(f, frame).splitlines(keepends=True):
+                        position += len(line)
+                        if position <= offset:
+                            continue
+                        record = _decode_line(line)
+                        if record is not None:
+                            yield record, position
+            return
+        try:
+            f = _open_segment(self.path)
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                record = _decode_line(line)
+                if record is not None:
+                    yield record, offset
+
+    def head(self) -> Optional[str]:
+        """段首行摘要；段为空时返回 None"""
+        if not self.active:
+            return self.index().get('head')
+        try:
+            with open(self.path, 'rb') as f:
+                first = f.readline()
+        except FileNotFoundError:
+            return None
+        return _line_digest(first) if first.endswith(b'\n') else None
+
+    def size(self) -> int:
+        """段内容的字节数（压缩段为解压后的大小，与游标偏移一致）"""
+        if not self.active:
+            return self.index().get('data_bytes', 0)
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def iter_records_reverse(self) -> Iterator[Dict]:
+        """
+        从段末尾倒序逐条产出观测
+
+        并发钩子可能正在写最后一行，未写完的行无法解码，直接跳过。
+        压缩段从最后一帧开始逐帧解压，凑够条数即可停止。
+        """
+        if self.frames():
+            for _, content in self.iter_frames(reverse=True):
+                for line in reversed(content.splitlines()):
+                    record = _decode_line(line)
+                    if record is not None:
+                        yield record
+            return
+        try:
+            f = _open_segment(self.path)
+        except FileNotFoundError:
+            return
+        with f:
+            for line in _iter_lines_reverse(f):
+                record = _decode_line(line)
+                if record is not None:
+                    yield record
+
+    def count_lines(self) -> int:
+        """统计该段的行数（归档段读索引，活动段按块扫描换行符，不解码 JSON）"""
+        if not self.active:
+            return self.index()['lines']
+        return self._scan_line_count()
+
+    def _scan_line_count(self) -> int:
+        count = 0
+        last = b'\n'
+        try:
+            with open(self.path, 'rb') as f:
+                while True:
+                    chunk = f.read(READ_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    count += chunk.count(b'\n')
+                    last = chunk[-1:]
+        except FileNotFoundError:
+            return 0
+        # 末尾没有换行的不完整行也算一行
+        return count + (0 if last == b'\n' else 1)
+
+    def index(self) -> Dict:
+        """
+        读取段索引，缺失或过期时重建
+
+        活动段仍在增长，不持久化索引，每次现算。
+
+        Returns:
+            索引字典
+        """
+        if self._index is not None:
+            return self._index
+
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return build_index(self.path)
+
+        if not self.active and self.index_path.exists():
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                if (cached.get('version') == INDEX_VERSION
+                        and cached.get('bytes') == stat.st_size
+                        and cached.get('mtime') == stat.st_mtime):
+                    self._index = cached
+                    return cached
+            except (OSError, json.JSONDecodeError):
+                pass
+
+        index = build_index(self.path)
+        if not self.active:
+            write_index(self.index_path, index)
+            self._index = index
+        return index
+
+    def overlaps(self, since: Optional[str], until: Optional[str]) -> bool:
+        """判断该段的时间范围是否与查询窗口相交"""
+        if since is None and until is None:
+            return True
+        index = self.index()
+        first, last = index.get('first_ts'), index.get('last_ts')
+        if first is None or last is None:
+            return index.get('lines', 0) > 0
+        if since is not None and last < since:
+            return False
+        if until is not None and first > until:
+            return False
+        return True
+
+
+class _SpanStats:
+    """一段观测（整个段或其中一帧）的汇总：行数、时间范围、会话、工具、错误类别"""
+
+    __slots__ = ('lines', 'first_ts', 'last_ts', 'sessions', 'tools', 'errors')
+
+    def __init__(self):
+        self.lines = 0
+        self.first_ts: Optional[str] = None
+        self.last_ts: Optional[str] = None
+        self.sessions = set()
+        self.tools: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, record: Dict) -> None:
+        ts = record.get('timestamp')
+        if isinstance(ts, str):
+            if self.first_ts is None or ts < self.first_ts:
+                self.first_ts = ts
+            if self.last_ts is None or ts > self.last_ts:
+                self.last_ts = ts
+        session = record.get('session')
+        if session:
+            self.sessions.add(session)
+        tool = record.get('tool')
+        if tool:
+            self.tools[tool] = self.tools.get(tool, 0) + 1
+        error = record.get('error')
+        if isinstance(error, str):
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def to_dict(self) -> Dict:
+        return {
+            'lines': self.lines,
+            'first_ts': self.first_ts,
+            'last_ts': self.last_ts,
+            'sessions': sorted(self.sessions),
+            'tools': self.tools,
+            'errors': self.errors,
+        }
+
+
+def build_index(path: Path) -> Dict:
+    """
+    扫描段文件构建索引
+
+    Args:
+        path: 段文件路径
+
+    Returns:
+        索引字典：行数、文件字节数、解压后字节数、偏移采样（解压后偏移）、
+        时间范围、会话、工具和错误类别计数，压缩段另有帧目录
+    """
+    index = {
+        'version': INDEX_VERSION,
+        'lines': 0,
+        'bytes': 0,
+        'data_bytes': 0,
+        'mtime': None,
+        'offsets': [],
+        'first_ts': None,
+        'last_ts': None,
+        'sessions': [],
+        'tools': {},
+        'errors': {},
+        'head': None,
+        'path_counts': {},
+        'frames': [],
+    }
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return index
+
+    totals = _SpanStats()
+    path_counts: Dict[str, Dict[str, Dict[str, int]]] = {}
+    offset = 0
+
+    def scan(lines: Iterable[bytes], frame: Optional[_SpanStats]) -> None:
+        nonlocal offset
+        for raw in lines:
+            if offset == 0 and raw.endswith(b'\n'):
+                index['head'] = _line_digest(raw)
+            if raw.strip():
+                if totals.lines % OFFSET_STRIDE == 0:
+                    index['offsets'].append(offset)
+                totals.lines += 1
+                if frame is not None:
+                    frame.lines += 1
+                record = _decode_line(raw)
+                if record is not None:
+                    totals.add(record)
+                    if frame is not None:
+                        frame.add(record)
+                    paths = observation_paths(record)
+                    if paths:
+                        ts = record.get('timestamp')
+                        bucket = ts[:HOUR_BUCKET_LEN] if isinstance(ts, str) else ''
+                        session = record.get('session') or ''
+                        counts = path_counts.setdefault(session, {}).setdefault(bucket, {})
+                        for file_path in paths:
+                            counts[file_path] = counts.get(file_path, 0) + 1
+            offset += len(raw)
+
+    if path.name.endswith('.gz'):
+        for frame_offset, frame_length, content in _iter_gzip_frames(path):
+            frame = _SpanStats()
+            data_offset = offset
+            scan(content.splitlines(keepends=True), frame)
+            index['frames'].append(dict(frame.to_dict(), offset=frame_offset,
+                                        length=frame_length, data_offset=data_offset))
+    else:
+        with open(path, 'rb') as f:
+            scan(f, None)
+
+    index.update(totals.to_dict())
+    index.update({
+        'bytes': stat.st_size,
+        'data_bytes': offset,
+        'mtime': stat.st_mtime,
+        'path_counts': path_counts,
+    })
+    return index
+
+
+def write_index(index_path: Path, index: Dict) -> None:
+    """原子写入段索引（先写临时文件再替换）"""
+    tmp_path = index_path.with_name(index_path.name + '.tmp')
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp_path, index_path)
+    except OSError as e:
+        print(f"Warning: Failed to write segment index {index_path}: {e}", file=sys.stderr)
+
+
+class ObservationStore:
+    """
+    分段观测日志的读取接口
+
+    Args:
+        store_path: 活动段路径（observations.jsonl）
+        archive_dir: 归档目录，默认与活动段同级的 observations.archive/
+    """
+
+    def __init__(self, store_path: Union[str, Path] = DEFAULT_STORE_PATH,
+                 archive_dir: Optional[Union[str, Path]] = None):
+        self.store_path = Path(store_path).expanduser()
+        if archive_dir is None:
+            archive_dir = self.store_path.parent / 'observations.archive'
+        self.archive_dir = Path(archive_dir).expanduser()
+
+    def segments(self) -> List[Segment]:
+        """
+        列出所有段，按时间从旧到新排列，活动段在最后
+
+        归档段按文件名中的轮转时间和序号排序（见 _segment_order），
+        不依赖修改时间：复制或备份恢复归档目录后顺序不变。
+        同名的压缩段和未压缩段同时存在时（压缩中途退出），以压缩段为准。
+        """
+        archived = []
+        if self.archive_dir.exists():
+            for path in self.archive_dir.iterdir():
+                if path.name.endswith('.jsonl'):
+                    if path.with_name(path.name + '.gz').exists():
+                        continue
+                elif not path.name.endswith(ARCHIVE_SUFFIX):
+                    continue
+                try:
+                    archived.append((_segment_order(path), path))
+                except FileNotFoundError:
+                    continue
+        archived.sort()
+
+        segments = [Segment(path) for _, path in archived]
+        segments.append(Segment(self.store_path, active=True))
+        return segments
+
+    def count(self) -> int:
+        """观测总数：归档段读索引，只扫描活动段"""
+        return sum(segment.count_lines() for segment in self.segments())
+
+    def tail(self, limit: int = 200) -> List[Dict]:
+        """
+        读取最近的观测
+
+        从最新段的末尾按块向前读，只解码最后 limit 条有效记录，
+        凑够即停止，耗时与历史长度无关。
+
+        Args:
+            limit: 最多返回的条数
+
+        Returns:
+            观测列表（按时间从旧到新）
+        """
+        if limit <= 0:
+            return []
+
+        result: List[Dict] = []
+        for segment in reversed(self.segments()):
+            for record in segment.iter_records_reverse():
+                result.append(record)
+                if len(result) >= limit:
+                    break
+            if len(result) >= limit:
+                break
+
+        result.reverse()
+        return result
+
+    def iter_records(self, since: TimeBound = None, until: TimeBound = None,
+                     session: Optional[str] = None) -> Iterator[Dict]:
+        """
+        按时间顺序逐条产出观测，可按时间窗口和会话过滤
+
+        时间范围或会话不匹配的归档段直接跳过，不打开文件；
+        压缩段只解压与窗口、会话相交的帧。
+
+        Args:
+            since: 起始时间（含）
+            until: 结束时间（含）
+            session: 只返回该会话的观测
+
+        Yields:
+            观测字典
+        """
+        since_iso, until_iso = _to_iso(since), _to_iso(until)
+
+        for segment in self.segments():
+            if not segment.active:
+                if not segment.overlaps(since_iso, until_iso):
+                    continue
+                if session is not None and session not in segment.index()['sessions']:
+                    continue
+
+            if segment.frames():
+                for _, content in segment.iter_frames(since_iso, until_iso, session):
+                    for line in content.splitlines():
+                        record = _decode_line(line)
+                        if record is not None and _record_matches(record, since_iso, until_iso, session):
+                            yield record
+                continue
+
+            for record in segment.iter_records():
+                if _record_matches(record, since_iso, until_iso, session):
+                    yield record
+
+    def summarize(self, since: TimeBound = None, until: TimeBound = None,
+                  session: Optional[str] = None) -> Dict:
+        """
+        汇总时间窗口内的观测：条数、会话、工具和错误类别计数
+
+        完全落在窗口内的压缩帧直接累加帧索引的计数，不解压；
+        只有跨越窗口边界的帧和活动段需要逐条读取。
+
+        Args:
+            since: 起始时间（含）
+            until: 结束时间（含）
+            session: 只统计该会话（帧计数不分会话，此时相关帧需要解压）
+
+        Returns:
+            {'observations': 条数, 'sessions': 会话列表, 'tools': {工具: 次数},
+             'errors': {错误类别: 次数}, 'first_ts': 最早时间, 'last_ts': 最晚时间}
+        """
+        since_iso, until_iso = _to_iso(since), _to_iso(until)
+        totals = _SpanStats()
+
+        def merge(frame: Dict) -> None:
+            totals.lines += frame['lines']
+            totals.sessions.update(frame['sessions'])
+            for key, target in (('tools', totals.tools), ('errors', totals.errors)):
+                for name, count in frame[key].items():
+                    target[name] = target.get(name, 0) + count
+            for ts in (frame['first_ts'], frame['last_ts']):
+                if ts is not None:
+                    totals.add({'timestamp': ts})
+
+        for segment in self.segments():
+            if not segment.active:
+                if not segment.overlaps(since_iso, until_iso):
+                    continue
+                if session is not None and session not in segment.index()['sessions']:
+                    continue
+
+            frames = segment.frames()
+            if not frames:
+                for record in segment.iter_records():
+                    if _record_matches(record, since_iso, until_iso, session):
+                        totals.lines += 1
+                        totals.add(record)
+                continue
+
+            pending = []
+            for frame in frames:
+                if not _frame_matches(frame, since_iso, until_iso, session):
+                    continue
+                inside = (session is None and frame['first_ts'] is not None
+                          and (since_iso is None or frame['first_ts'] >= since_iso)
+                          and (until_iso is None or frame['last_ts'] <= until_iso))
+                if inside:
+                    merge(frame)
+                else:
+                    pending.append(frame)
+
+            if pending:
+                with open(segment.path, 'rb') as f:
+                    for frame in pending:
+                        for line in _read_frame(f, frame).splitlines():
+                            record = _decode_line(line)
+                            if record is not None and _record_matches(record, since_iso, until_iso, session):
+                                totals.lines += 1
+                                totals.add(record)
+
+        summary = totals.to_dict()
+        summary['observations'] = summary.pop('lines')
+        return summary
+
+    @property
+    def lock_path(self) -> Path:
+        return self.store_path.with_name(self.store_path.name + LOCK_SUFFIX)
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        """持有活动段的文件锁：追加用共享锁，轮转用排他锁"""
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _compress_locked(self):
+        """持有归档目录的压缩锁，同一时间只有一个进程压缩归档段"""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.archive_dir / COMPRESS_LOCK_NAME, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def rotate(self) -> Optional[Path]:
+        """
+        将活动段轮转为压缩归档段并写入其索引
+
+        Returns:
+            新归档段路径；活动段不存在或为空时返回 None
+        """
+        return self._rotate(lambda size, first_time: size > 0)
+
+    def rotate_if_due(self, max_bytes: int, max_age_days: Optional[float] = None,
+                      compress: bool = True) -> Optional[Path]:
+        """
+        活动段超过 max_bytes，或首条记录早于 max_age_days 天时轮转
+
+        Args:
+            max_bytes: 大小阈值
+            max_age_days: 时间阈值（天），None 表示不按时间轮转
+            compress: 是否在当前进程内压缩新归档段；False 时留给 compress_archives()
+
+        Returns:
+            新归档段路径；未轮转时返回 None
+        """
+        oldest = time.time() - max_age_days * 86400 if max_age_days else None
+
+        def due(size: int, first_time: Optional[float]) -> bool:
+            if size >= max_bytes:
+                return True
+            return oldest is not None and first_time is not None and first_time < oldest
+
+        # 先不加锁判断，绝大多数调用无需轮转
+        if not due(self._active_size(), self._first_time() if oldest is not None else None):
+            return None
+        return self._rotate(due, compress)
+
+    def _active_size(self) -> int:
+        try:
+            return self.store_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _first_time(self) -> Optional[float]:
+        """活动段首条记录的时间"""
+        try:
+            with open(self.store_path, 'rb') as f:
+                record = _decode_line(f.readline())
+        except FileNotFoundError:
+            return None
+        return observation_time(record) if record else None
+
+    def _rotate(self, due, compress: bool = True) -> Optional[Path]:
+        """在排他锁内复核轮转条件并移走活动段，再在锁外压缩"""
+        with self._locked(exclusive=True):
+            # 并发的另一个进程可能刚刚完成轮转
+            size = self._active_size()
+            if size == 0 or not due(size, self._first_time()):
+                return None
+
+            self.archive_dir.mkdir(parents=True, exist_ok=True)
+            stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+            archive_path = self.archive_dir / f"observations-{stamp}.jsonl"
+            suffix = 1
+            while archive_path.exists() or archive_path.with_name(archive_path.name + '.gz').exists():
+                archive_path = self.archive_dir / f"observations-{stamp}-{suffix}.jsonl"
+                suffix += 1
+            os.replace(self.store_path, archive_path)
+
+        if not compress:
+            return archive_path
+        with self._compress_locked():
+            return self._compress(archive_path)
+
+    def _compress(self, path: Path) -> Path:
+        """
+        把未压缩的归档段压缩为分帧的 .jsonl.gz 并写入索引
+
+        每约 FRAME_SIZE 字节原文（整行）压缩为一个独立的 gzip 帧。
+        先写临时文件再替换，保留原段的修改时间，最后删除原段。
+        """
+        gz_path = path.with_name(path.name + '.gz')
+        tmp_path = gz_path.with_name(gz_path.name + '.tmp')
+        stat = path.stat()
+        with open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            frame: List[bytes] = []
+            frame_size = 0
+            for line in src:
+                frame.append(line)
+                frame_size += len(line)
+                if frame_size >= FRAME_SIZE:
+                    dst.write(gzip.compress(b''.join(frame)))
+                    frame, frame_size = [], 0
+            if frame:
+                dst.write(gzip.compress(b''.join(frame)))
+        os.utime(tmp_path, (stat.st_atime, stat.st_mtime))
+        os.replace(tmp_path, gz_path)
+        write_index(Segment(gz_path).index_path, build_index(gz_path))
+        path.unlink()
+        Segment(path).index_path.unlink(missing_ok=True)
+        return gz_path
+
+    def compress_archives(self) -> List[Path]:
+        """压缩所有未压缩的归档段（旧版本轮转、后台压缩或中途退出留下的），返回新的压缩段路径"""
+        if not self.archive_dir.exists():
+            return []
+        compressed = []
+        with self._compress_locked():
+            for segment in self.segments():
+                if segment.active or segment.compressed:
+                    continue
+                try:
+                    compressed.append(self._compress(segment.path))
+                except FileNotFoundError:
+                    continue
+            # 中途退出时留下的、已有压缩版本的未压缩段
+            for path in self.archive_dir.glob('*.jsonl'):
+                if path.with_name(path.name + '.gz').exists():
+                    path.unlink(missing_ok=True)
+                    Segment(path).index_path.unlink(missing_ok=True)
+        return compressed
+
+    def compress_in_background(self) -> None:
+        """启动一个脱离当前进程的 `compress` 子进程，调用方不等待压缩完成"""
+        subprocess.Popen([sys.executable, str(Path(__file__).resolve()), 'compress',
+                          '--store', str(self.store_path)],
+                         stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL, start_new_session=True)
+
+    def iter_from(self, cursor: Optional[Cursor] = None) -> Iterator[Tuple[Dict, Cursor]]:
+        """
+        从游标位置开始逐条产出观测，供增量检测使用
+
+        游标记录段首行摘要和段内偏移。活动段轮转进归档目录后，
+        按摘要找到对应的归档段继续读取，再依次读后续各段。
+
+        Args:
+            cursor: 上次读取结束的位置；None 表示从头读取
+
+        Yields:
+            (观测, 读完该条之后的游标)
+        """
+        segments = self.segments()
+        start, offset = 0, 0
+
+        if cursor and cursor.get('head'):
+            for i in range(len(segments) - 1, -1, -1):
+                if segments[i].head() == cursor['head']:
+                    start = i
+                    offset = cursor.get('offset', 0)
+                    # 段被截断或替换时从段首重新读
+                    if offset > segments[i].size():
+                        offset = 0
+                    break
+
+        for segment in segments[start:]:
+            head = segment.head()
+            for record, end in segment.iter_records_from(offset):
+                yield record, {'head': head, 'offset': end}
+            offset = 0
+
+    def end_cursor(self) -> Optional[Cursor]:
+        """
+        指向当前最后一条完整记录之后的游标
+
+        首次增量检测没有检查点时，配合 tail() 只处理最近的观测，
+        之后从这里继续读取，而不必先扫描全部历史。
+
+        Returns:
+            游标；日志为空时返回 None
+        """
+        for segment in reversed(self.segments()):
+            head = segment.head()
+            if head is None:
+                continue
+            if not segment.active:
+                return {'head': head, 'offset': segment.size()}
+            # 活动段的最后一行可能还没写完，游标停在最后一个换行符之后
+            try:
+                with open(segment.path, 'rb') as f:
+                    f.seek(0, os.SEEK_END)
+                    position = f.tell()
+                    while position > 0:
+                        read_size = min(TAIL_BLOCK_SIZE, position)
+                        position -= read_size
+                        f.seek(position)
+                        newline = f.read(read_size).rfind(b'\n')
+                        if newline >= 0:
+                            return {'head': head, 'offset': position + newline + 1}
+            except FileNotFoundError:
+                continue
+        return None
+
+    def hot_files(self, since: TimeBound = None, until: TimeBound = None,
+                  session: Optional[str] = None, min_count: int = 1) -> Dict[str, int]:
+        """
+        统计时间窗口内的文件访问次数
+
+        直接累加段索引里按会话、小时分桶的计数，只有活动段需要现场扫描。
+        窗口边界按小时取整。
+
+        Args:
+            since: 起始时间（含）
+            until: 结束时间（含）
+            session: 只统计该会话
+            min_count: 最小访问次数
+
+        Returns:
+            文件路径 → 访问次数，按次数从高到低排列
+        """
+        since_iso, until_iso = _to_iso(since), _to_iso(until)
+        since_bucket = since_iso[:HOUR_BUCKET_LEN] if since_iso else None
+        until_bucket = until_iso[:HOUR_BUCKET_LEN] if until_iso else None
+
+        totals: Dict[str, int] = {}
+        for segment in self.segments():
+            if not segment.active and not segment.overlaps(since_iso, until_iso):
+                continue
+            path_counts = segment.index().get('path_counts', {})
+            for session_id, buckets in path_counts.items():
+                if session is not None and session_id != session:
+                    continue
+                for bucket, counts in buckets.items():
+                    if since_bucket is not None and (not bucket or bucket < since_bucket):
+                        continue
+                    if until_bucket is not None and (not bucket or bucket > until_bucket):
+                        continue
+                    for file_path, count in counts.items():
+                        totals[file_path] = totals.get(file_path, 0) + count
+
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+        return {file_path: count for file_path, count in ranked if count >= min_count}
+
+    @property
+    def checkpoint_dir(self) -> Path:
+        return self.store_path.parent / 'checkpoints'
+
+    def load_checkpoint(self, name: str) -> Dict:
+        """
+        读取检测器检查点
+
+        Args:
+            name: 检测器名称
+
+        Returns:
+            {'cursor': 游标, 'state': 检测器状态}；不存在或损坏时返回空检查点
+        """
+        path = self.checkpoint_dir / f"{name}.json"
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            if checkpoint.get('store') == str(self.store_path):
+                return checkpoint
+        except FileNotFoundError:
+            pass
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Ignoring unreadable checkpoint {path}: {e}", file=sys.stderr)
+        return {'cursor': None, 'state': {}}
+
+    def save_checkpoint(self, name: str, cursor: Optional[Cursor], state: Dict) -> None:
+        """原子写入检测器检查点（游标 + 检测器状态）"""
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        path = self.checkpoint_dir / f"{name}.json"
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'store': str(self.store_path),
+                'cursor': cursor,
+                'state': state,
+                'updated_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def append(self, records: List[Dict], fsync: bool = False) -> None:
+        """
+        追加观测记录到活动段
+
+        所有记录拼成一次 write，O_APPEND 保证多个会话并发追加时整行不交错；
+        共享锁保证写入不会落进正在被轮转移走的段。
+
+        Args:
+            records: 观测记录列表
+            fsync: 写入后是否落盘（收集器按批次调用，一批只 fsync 一次）
+        """
+        if not records:
+            return
+        data = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+        with self._locked(exclusive=False):
+            fd = os.open(self.store_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data.encode('utf-8'))
+                if fsync:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def reindex(self) -> int:
+        """重建所有归档段的索引，返回处理的段数"""
+        rebuilt = 0
+        for segment in self.segments():
+            if segment.active:
+                continue
+            write_index(segment.index_path, build_index(segment.path))
+            rebuilt += 1
+        return rebuilt
+
+
+def parse_hook_payload(raw: str, classifier=None) -> List[Dict]:
+    """
+    把钩子 JSON 原文转换为观测记录
+
+    Args:
+        raw: 钩子 JSON 原文
+        classifier: 错误分类器，为 None 时不标记错误
+
+    Returns:
+        观测记录列表；无法解析时为一条 parse_error 记录
+    """
+    from observation_schema import build_observations, parse_error_observation
+
+    try:
+        data = json.loads(raw)
+        if not isinstance(data, dict):
+            raise ValueError('hook payload is not a JSON object')
+        return build_observations(data, classifier)
+    except ValueError as e:
+        print(json.dumps({'parsed': False, 'error': str(e)}), file=sys.stderr)
+        return [parse_error_observation(raw)]
+
+
+@lru_cache(maxsize=1)
+def _ingest_settings() -> Tuple[object, Optional[float]]:
+    """钩子写入路径用到的配置（错误分类器、按时间轮转的阈值），每个进程只读取一次 config.json"""
+    from error_classifier import load_error_classifier
+
+    config = load_config()
+    return load_error_classifier(config), archive_after_days(config)
+
+
+def ingest_hook_payload(store: ObservationStore, raw: str, max_bytes: int) -> None:
+    """
+    把一条钩子载荷写入观测日志（收集器未运行时 observe.sh 的直接写入路径）
+
+    解析、字段提取、错误分类、轮转和追加都在同一个进程内完成。
+    按时间轮转的阈值读取 config.json → observation.archive_after_days。
+    轮转出的归档段交给后台进程压缩，钩子不等待压缩完成。
+
+    Args:
+        store: 观测存储
+        raw: 钩子 JSON 原文
+        max_bytes: 活动段轮转阈值
+    """
+    if not raw.strip():
+        return
+
+    classifier, max_age_days = _ingest_settings()
+    records = parse_hook_payload(raw, classifier)
+    archived = store.rotate_if_due(max_bytes, max_age_days, compress=False)
+    if archived:
+        print(f"Archived observations to: {archived}", file=sys.stderr)
+        store.compress_in_background()
+    store.append(records)
+
+
+def archive_after_days(config: Dict) -> Optional[float]:
+    """读取按时间轮转的阈值（天），0 或 null 表示不按时间轮转"""
+    return config.get('observation', {}).get('archive_after_days', DEFAULT_ARCHIVE_AFTER_DAYS) or None
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Segmented observation log')
+    parser.add_argument('command', choices=['count', 'tail', 'summary', 'rotate', 'compress',
+                                            'reindex', 'hot-files', 'ingest'],
+                        help='Command to execute')
+    parser.add_argument('limit', type=int, nargs='?', default=20,
+                        help='Number of records for tail')
+    parser.add_argument('--store', default=str(DEFAULT_STORE_PATH),
+                        help='Path to observations.jsonl')
+    parser.add_argument('--since', help='Start of time window (ISO 8601)')
+    parser.add_argument('--until', help='End of time window (ISO 8601)')
+    parser.add_argument('--session', help='Only include this session')
+    parser.add_argument('--max-size-mb', type=int, default=10,
+                        help='Rotate the active segment at this size (ingest)')
+
+    args = parser.parse_args()
+    store = ObservationStore(args.store)
+
+    if args.command == 'count':
+        print(store.count())
+    elif args.command == 'tail':
+        for record in store.tail(args.limit):
+            print(json.dumps(record, ensure_ascii=False))
+    elif args.command == 'summary':
+        print(json.dumps(store.summarize(args.since, args.until, args.session), indent=2, ensure_ascii=False))
+    elif args.command == 'rotate':
+        archived = store.rotate()
+        print(f"Archived observations to: {archived}" if archived else "Nothing to rotate")
+    elif args.command == 'compress':
+        print(f"Compressed {len(store.compress_archives())} segments")
+    elif args.command == 'reindex':
+        print(f"Reindexed {store.reindex()} segments")
+    elif args.command == 'ingest':
+        ingest_hook_payload(store, sys.stdin.read(), args.max_size_mb * 1024 * 1024)
+    elif args.command == 'hot-files':
+        hot = store.hot_files(args.since, args.until, args.session)
+        for file_path, count in list(hot.items())[:args.limit]:
+            print(f"{count:6d}  {file_path}")
+
+
+if __name__ == '__main__':
+    main()
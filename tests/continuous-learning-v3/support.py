@@ -0,0 +1,47 @@
+"""
+Shared setup for the continuous-learning-v3 Python tests.
+
+Imported before any script module: it points HOME at a throwaway directory
+(the scripts resolve ~/.claude/homunculus at import time) and puts the
+scripts directory on sys.path.
+"""
+
+import atexit
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SKILLS_DIR = Path(__file__).resolve().parents[2] / 'skills'
+SCRIPTS_DIR = SKILLS_DIR / 'continuous-learning-v3' / 'scripts'
+CLAUDECEPTION_SCRIPTS_DIR = SKILLS_DIR / 'claudeception' / 'scripts'
+
+TEST_HOME = Path(tempfile.mkdtemp(prefix='clv3-test-home-'))
+os.environ['HOME'] = str(TEST_HOME)
+atexit.register(shutil.rmtree, TEST_HOME, ignore_errors=True)
+
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+def load_script(filename: str, directory: Path = SCRIPTS_DIR):
+    """Import a hyphenated script (e.g. instinct-manager.py) as a module."""
+    name = filename[:-3].replace('-', '_')
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, directory / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_script(filename: str, *args: str, home: Path, cwd: Path = None,
+               directory: Path = SCRIPTS_DIR) -> subprocess.CompletedProcess:
+    """Run a script in a subprocess with its own HOME."""
+    env = dict(os.environ, HOME=str(home), PYTHONIOENCODING='utf-8')
+    return subprocess.run([sys.executable, str(directory / filename), *args],
+                          capture_output=True, text=True, env=env, cwd=str(cwd or home))
@@ -0,0 +1,160 @@
+"""
+Tests for skills/continuous-learning-v3/scripts/code-nav-detector.py
+
+Run with: python3 -m unittest discover -s tests/continuous-learning-v3
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import support
+
+code_nav = support.load_script('code-nav-detector.py')
+
+
+def observation(minute, second, event, **fields):
+    record = {'timestamp': f'2026-01-01T10:{minute:02d}:{second:02d}Z', 'event': event, 'session': 's1'}
+    record.update(fields)
+    return record
+
+
+def tool(minute, second, name, **input_data):
+    return observation(minute, second, 'tool_start', tool=name, input=input_data)
+
+
+OBSERVATIONS = [
+    # A query closed by Grep -> Read -> Edit, function name from a Python def
+    observation(0, 0, 'user_query', query='where is the login handler'),
+    tool(0, 10, 'Grep', pattern='login'),
+    tool(0, 20, 'Read', file_path='src/auth.py'),
+    tool(0, 30, 'Edit', file_path='src/auth.py', old_string='def handle_login(request):'),
+    # Not a code search query
+    observation(1, 0, 'user_query', query='thanks, looks good'),
+    tool(1, 10, 'Grep', pattern='x'),
+    tool(1, 20, 'Read', file_path='x.py'),
+    tool(1, 30, 'Edit', file_path='x.py', old_string='x = 1'),
+    # The Edit falls outside the five minute window
+    observation(2, 0, 'user_query', query='find the config parser'),
+    tool(2, 10, 'Grep', pattern='parse_config'),
+    tool(2, 20, 'Read', file_path='src/config.py'),
+    tool(7, 30, 'Edit', file_path='src/config.py', old_string='def parse_config():'),
+    # Two overlapping queries closed by the same Edit; JSON-string input, JS function
+    observation(8, 0, 'user_query', query='show me the render loop'),
+    tool(8, 5, 'Grep', pattern='render'),
+    observation(8, 10, 'user_query', query='locate the frame scheduler'),
+    tool(8, 15, 'Grep', pattern='schedule'),
+    observation(8, 20, 'tool_start', tool='Read', input='{"file_path": "web/loop.js"}'),
+    observation(8, 30, 'tool_start', tool='Edit',
+                input='{"file_path": "web/loop.js", "old_string": "function tick(now) {"}'),
+    # Read without a file path: the sequence closes without a pattern
+    observation(9, 0, 'user_query', query='search for the cache layer'),
+    tool(9, 5, 'Grep', pattern='cache'),
+    tool(9, 10, 'Read', offset=10),
+    tool(9, 15, 'Edit', file_path='cache.py', old_string='cache = {}'),
+    # Read before Grep does not count; Edit without a function-like string
+    observation(10, 0, 'user_query', query='我想修改 登录 页面 的 标题'),
+    tool(10, 5, 'Read', file_path='ignored.html'),
+    tool(10, 10, 'Grep', pattern='title'),
+    tool(10, 20, 'Read', file_path='web/login.html'),
+    tool(10, 30, 'Edit', file_path='web/login.html', old_string='<title>Login</title>'),
+    # A query still open at the end of the log
+    observation(11, 0, 'user_query', query='open the deploy script'),
+    tool(11, 10, 'Grep', pattern='deploy'),
+]
+
+
+def pattern(query, keywords, file_path, function_name, timestamp):
+    return {'natural_language': query, 'keywords': keywords,
+            'code_location': {'file_path': file_path, 'function_name': function_name,
+                              'confirmation_method': 'implicit'},
+            'timestamp': timestamp, 'session': 's1', 'confidence': 0.5}
+
+
+# Output of the original list-based detector (before streaming) for OBSERVATIONS
+BASELINE_PATTERNS = [
+    pattern('where is the login handler', ['where', 'login', 'handler'],
+            'src/auth.py', 'handle_login', '2026-01-01T10:00:00Z'),
+    pattern('show me the render loop', ['show', 'me', 'render', 'loop'],
+            'web/loop.js', 'tick', '2026-01-01T10:08:00Z'),
+    pattern('locate the frame scheduler', ['locate', 'frame', 'scheduler'],
+            'web/loop.js', 'tick', '2026-01-01T10:08:10Z'),
+    pattern('我想修改 登录 页面 的 标题', ['我想修改', '登录', '页面', '标题'],
+            'web/login.html', None, '2026-01-01T10:10:00Z'),
+]
+
+
+class StreamingDetectorTest(unittest.TestCase):
+
+    def test_matches_the_baseline_detector(self):
+        self.assertEqual(code_nav.detect_code_navigation_pattern(OBSERVATIONS), BASELINE_PATTERNS)
+
+    def test_lazy_input_yields_patterns_as_sequences_close(self):
+        seen = []
+
+        def observations():
+            for obs in OBSERVATIONS:
+                seen.append(obs)
+                yield obs
+
+        patterns = code_nav.iter_code_navigation_patterns(observations())
+        self.assertEqual(next(patterns), BASELINE_PATTERNS[0])
+        # Only read up to the Edit that closed the first query
+        self.assertEqual(len(seen), 4)
+        self.assertEqual([BASELINE_PATTERNS[0]] + list(patterns), BASELINE_PATTERNS)
+
+    def test_checkpoint_state_round_trip(self):
+        cut = 15  # both overlapping queries are open, waiting for a Read
+        first = code_nav.CodeNavigationDetector()
+        patterns = [p for obs in OBSERVATIONS[:cut] for p in first.feed(obs)]
+        second = code_nav.CodeNavigationDetector()
+        second.restore(json.loads(json.dumps(first.state())))
+        patterns += [p for obs in OBSERVATIONS[cut:] for p in second.feed(obs)]
+        self.assertEqual(patterns, BASELINE_PATTERNS)
+
+
+class CommandLineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.home = Path(tempfile.mkdtemp(prefix='clv3-code-nav-'))
+        self.addCleanup(shutil.rmtree, self.home, ignore_errors=True)
+        self.observations = self.home / 'sample' / 'observations.jsonl'
+        self.observations.parent.mkdir()
+        self.observations.write_text(''.join(json.dumps(obs) + '\n' for obs in OBSERVATIONS),
+                                     encoding='utf-8')
+
+    def detect(self, path):
+        result = support.run_script('code-nav-detector.py', str(path), home=self.home)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return json.loads(result.stdout)
+
+    def test_other_files_are_rescanned_without_a_checkpoint(self):
+        self.assertEqual(self.detect(self.observations), BASELINE_PATTERNS)
+        self.assertEqual(self.detect(self.observations), BASELINE_PATTERNS)
+        self.assertFalse((self.observations.parent / 'checkpoints').exists())
+
+    def test_configured_store_resumes_from_its_checkpoint(self):
+        store = self.home / '.claude' / 'homunculus' / 'observations.jsonl'
+        store.parent.mkdir(parents=True)
+        shutil.copy(self.observations, store)
+        self.assertEqual(self.detect(store), BASELINE_PATTERNS)
+        self.assertEqual(self.detect(store), [])
+        self.assertTrue((store.parent / 'checkpoints' / 'code-nav-detector.json').exists())
+
+    def test_split_runs_match_the_baseline(self):
+        # Cut inside the overlapping queries, so both go through the checkpoint while open
+        store = self.home / '.claude' / 'homunculus' / 'observations.jsonl'
+        store.parent.mkdir(parents=True)
+        cut = 15
+        patterns = []
+        for part in (OBSERVATIONS[:cut], OBSERVATIONS[cut:]):
+            with open(store, 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(obs) + '\n' for obs in part)
+            patterns += self.detect(store)
+        self.assertEqual(patterns, BASELINE_PATTERNS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,228 @@
+"""
+Tests for skills/claudeception/scripts/detect-candidates.py
+
+Run with: python3 -m unittest discover -s tests/continuous-learning-v3
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import support
+from error_classifier import load_error_classifier
+
+detect = support.load_script('detect-candidates.py', support.CLAUDECEPTION_SCRIPTS_DIR)
+CLASSIFIER = load_error_classifier({})
+
+
+def start(tool, paths=(), session='s1', ts=None):
+    record = {'schema': 2, 'event': 'tool_start', 'tool': tool, 'session': session, 'paths': list(paths)}
+    if ts is not None:
+        record['ts'] = ts
+    return record
+
+
+def complete(tool='Bash', error=None, session='s1', paths=(), ts=None):
+    record = {'schema': 2, 'event': 'tool_complete', 'tool': tool, 'session': session,
+              'output': 'output', 'paths': list(paths)}
+    if ts is not None:
+        record['ts'] = ts
+    if error:
+        record['error'] = error
+    return record
+
+
+def run(detector, observations):
+    return detect.run_detectors(observations, [detector], CLASSIFIER)
+
+
+def resumed(detector):
+    """A new detector restored from the (JSON round-tripped) checkpoint state of `detector`."""
+    restored = type(detector)()
+    restored.restore(json.loads(json.dumps(detector.state())))
+    return restored
+
+
+class SignalDetectorTest(unittest.TestCase):
+
+    def test_feed_is_abstract(self):
+        class Incomplete(detect.SignalDetector):
+            signal_type = 'incomplete'
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_all_detectors_registered(self):
+        self.assertEqual(sorted(detect.DETECTORS), ['config_discovery', 'error_fix_cycle',
+                                                    'long_investigation', 'non_standard_solution'])
+
+
+class ErrorFixCycleTest(unittest.TestCase):
+
+    def test_three_errors_then_success_is_a_cycle(self):
+        [signal] = run(detect.ErrorFixCycleDetector(),
+                       [complete(error='type_error'), complete(error='type_error'),
+                        complete('Edit', error='syntax_error'), complete()])
+        self.assertEqual(signal['signal_type'], 'error_fix_cycle')
+        self.assertEqual(signal['error_count'], 3)
+        self.assertEqual(signal['error_categories'], ['type_error', 'syntax_error'])
+        self.assertEqual(sorted(signal['tools_involved']), ['Bash', 'Edit'])
+
+    def test_two_errors_are_not_a_cycle(self):
+        self.assertEqual(run(detect.ErrorFixCycleDetector(),
+                             [complete(error='type_error'), complete(error='type_error'), complete()]), [])
+
+    def test_errors_carry_over_a_checkpoint(self):
+        first = detect.ErrorFixCycleDetector()
+        self.assertEqual(run(first, [complete(error='network'), complete(error='network')]), [])
+
+        second = resumed(first)
+        [signal] = run(second, [complete(error='network'), complete()])
+        self.assertEqual(signal['error_count'], 3)
+
+        # The reported cycle is cleared and not reported again
+        self.assertEqual(run(resumed(second), [complete()]), [])
+
+    def test_interleaved_sessions_are_counted_separately(self):
+        observations = []
+        for _ in range(3):
+            observations += [complete(error='type_error', session='a'), complete(session='b')]
+        observations.append(complete(session='a'))
+        [signal] = run(detect.ErrorFixCycleDetector(), observations)
+        self.assertEqual(signal['session'], 'a')
+        self.assertEqual(signal['error_count'], 3)
+
+    def test_legacy_checkpoint_state_is_migrated(self):
+        detector = detect.ErrorFixCycleDetector()
+        detector.restore({'error_count': 3, 'error_tools': ['Bash'] * 3,
+                          'error_categories': ['network'], 'last_session': 's1'})
+        [signal] = run(detector, [complete()])
+        self.assertEqual(signal['error_count'], 3)
+
+
+class LongInvestigationTest(unittest.TestCase):
+
+    def test_hot_file_is_reported_once(self):
+        detector = detect.LongInvestigationDetector()
+        [signal] = run(detector, [start('Read', ['src/app.py']) for _ in range(10)])
+        self.assertEqual(signal['primary_file'], 'src/app.py')
+        self.assertEqual(signal['hot_files'], {'src/app.py': 10})
+
+        self.assertEqual(run(resumed(detector), [start('Read', ['src/app.py'])]), [])
+
+    def test_window_forgets_old_accesses(self):
+        detector = detect.LongInvestigationDetector(window=15)
+        observations = [start('Read', ['src/app.py']) for _ in range(9)]
+        observations += [start('Read', ['other.py']) for _ in range(10)]
+        observations += [start('Read', ['src/app.py'])]
+        [signal] = run(detector, observations)
+        self.assertEqual(signal['primary_file'], 'other.py')
+
+
+class NonStandardSolutionTest(unittest.TestCase):
+
+    EDITS = ['a/x.py', 'a/y.py', 'b/x.py', 'c/x.py', 'c/y.py']
+
+    def test_edits_across_directories(self):
+        detector = detect.NonStandardSolutionDetector()
+        [signal] = run(detector, [start('Edit', [path]) for path in self.EDITS])
+        self.assertEqual(sorted(signal['unique_directories']), ['a', 'b', 'c'])
+        self.assertEqual(signal['edit_targets'], self.EDITS)
+
+        # Same directories after resuming: nothing new to report
+        self.assertEqual(run(resumed(detector), [start('Edit', ['a/z.py'])]), [])
+
+    def test_few_edits_are_not_reported(self):
+        self.assertEqual(run(detect.NonStandardSolutionDetector(),
+                             [start('Edit', [path]) for path in self.EDITS[:4]]), [])
+
+
+class ConfigDiscoveryTest(unittest.TestCase):
+
+    def test_config_edit_after_error_then_success(self):
+        [signal] = run(detect.ConfigDiscoveryDetector(),
+                       [complete(error='import_error'), start('Edit', ['/repo/tsconfig.json']),
+                        start('Edit', ['/repo/src/main.ts']), complete('Edit')])
+        self.assertEqual(signal['config_files'], ['/repo/tsconfig.json'])
+        self.assertEqual(signal['signal_strength'], 0.7)
+
+    def test_config_edit_without_prior_error_is_ignored(self):
+        self.assertEqual(run(detect.ConfigDiscoveryDetector(),
+                             [start('Edit', ['/repo/package.json']), complete('Edit')]), [])
+
+    def test_pending_config_edit_carries_over_a_checkpoint(self):
+        first = detect.ConfigDiscoveryDetector()
+        self.assertEqual(run(first, [complete(error='network'), start('Write', ['/repo/.env'])]), [])
+        [signal] = run(resumed(first), [complete('Write')])
+        self.assertEqual(signal['config_files'], ['/repo/.env'])
+
+
+class SessionPruningTest(unittest.TestCase):
+
+    def test_idle_sessions_are_dropped(self):
+        detector = detect.ErrorFixCycleDetector()
+        run(detector, [complete(error='network', session='old', ts=1000.0),
+                       complete(error='network', session='live', ts=2000.0)])
+        run(detector, [complete(session='live', ts=1000.0 + detect.SESSION_IDLE_SECONDS + 1)])
+        self.assertEqual(list(detector.state()['sessions']), ['live'])
+
+    def test_tracked_sessions_are_capped(self):
+        detector = detect.ConfigDiscoveryDetector()
+        run(detector, [complete(error='network', session=f's{i}')
+                       for i in range(detect.MAX_TRACKED_SESSIONS + 5)])
+        sessions = detector.state()['sessions']
+        self.assertEqual(len(sessions), detect.MAX_TRACKED_SESSIONS)
+        self.assertNotIn('s0', sessions)
+        self.assertIn(f's{detect.MAX_TRACKED_SESSIONS + 4}', sessions)
+
+
+class RunDetectorsTest(unittest.TestCase):
+
+    def test_one_pass_feeds_every_detector(self):
+        observations = [complete(error='type_error') for _ in range(3)] + [complete()]
+        observations += [start('Read', ['hot.py']) for _ in range(10)]
+        detectors = [cls() for cls in detect.DETECTORS.values()]
+        signals = detect.run_detectors(iter(observations), detectors, CLASSIFIER)
+        self.assertEqual(sorted(signal['signal_type'] for signal in signals),
+                         ['error_fix_cycle', 'long_investigation'])
+
+
+class FirstRunTest(unittest.TestCase):
+
+    def setUp(self):
+        self.home = Path(tempfile.mkdtemp(prefix='clv3-detect-'))
+        self.addCleanup(shutil.rmtree, self.home, ignore_errors=True)
+        self.homunculus = self.home / '.claude' / 'homunculus'
+        self.homunculus.mkdir(parents=True)
+        # An error-fix cycle older than the detection window, then unrelated activity
+        observations = [complete(error='type_error') for _ in range(3)] + [complete()]
+        observations += [start('Read', [f'file{i}.py']) for i in range(detect.DETECTION_WINDOW)]
+        with open(self.homunculus / 'observations.jsonl', 'w', encoding='utf-8') as f:
+            for obs in observations:
+                f.write(json.dumps(obs) + '\n')
+
+    def detect(self, *args):
+        result = support.run_script('detect-candidates.py', *args, home=self.home,
+                                    directory=support.CLAUDECEPTION_SCRIPTS_DIR)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        return result.stdout
+
+    def candidates(self):
+        return sorted((self.homunculus / 'skill-candidates').glob('*.json'))
+
+    def test_first_run_only_reads_the_detection_window(self):
+        self.assertIn('未检测到技能提取候选信号', self.detect())
+        self.assertEqual(self.candidates(), [])
+        # The seeded checkpoint points at the end of the log
+        self.assertIn('无新观测数据', self.detect())
+
+    def test_full_rescans_all_observations(self):
+        self.detect('--full')
+        [candidate] = self.candidates()
+        self.assertEqual(json.loads(candidate.read_text(encoding='utf-8'))['signal_type'], 'error_fix_cycle')
+
+
+if __name__ == '__main__':
+    unittest.main()
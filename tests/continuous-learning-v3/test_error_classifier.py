@@ -0,0 +1,73 @@
+"""
+Tests for skills/continuous-learning-v3/scripts/error_classifier.py
+
+Run with: python3 -m unittest discover -s tests/continuous-learning-v3
+"""
+
+import unittest
+
+import support  # noqa: F401  (sets HOME and sys.path)
+from error_classifier import DEFAULT_ERROR_PATTERNS, ErrorClassifier, load_error_classifier
+
+
+class ClassifyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.classifier = load_error_classifier({})
+
+    def test_categories(self):
+        cases = {
+            "TypeError: unsupported operand type(s) for +: 'int' and 'str'": 'type_error',
+            'SyntaxError: invalid syntax': 'syntax_error',
+            "NameError: name 'foo' is not defined": 'reference_error',
+            "ModuleNotFoundError: No module named 'yaml'": 'import_error',
+            'cat: missing.txt: No such file or directory': 'file_not_found',
+            'bash: ./run.sh: Permission denied': 'permission',
+            'connect ECONNREFUSED 127.0.0.1:5432': 'network',
+            'FAIL: test_parse (tests.test_parser.ParserTest)': 'test_failure',
+            'Traceback (most recent call last):': 'generic',
+            'ValueError: invalid literal for int()': 'generic',
+            'Found 2 errors in 1 file': 'generic',
+            'Build failed with 3 errors': 'generic',
+        }
+        for output, category in cases.items():
+            with self.subTest(output=output):
+                self.assertEqual(self.classifier.classify(output), category)
+
+    def test_priority_follows_declaration_order(self):
+        # Both a TypeError and the generic "error"; the specific category wins
+        self.assertEqual(self.classifier.classify('error: TypeError raised'), 'type_error')
+
+    def test_case_insensitive(self):
+        self.assertEqual(self.classifier.classify('typeerror'), 'type_error')
+        self.assertEqual(self.classifier.classify('CONNECTION REFUSED'), 'network')
+
+    def test_zero_counts_are_not_errors(self):
+        for output in ['Found 0 errors', 'no errors found', 'Errors: 0, Warnings: 2', 'errors=0',
+                       '5 passed, 0 failed', '12 passing, 0 failing', 'zero exceptions', '', 'All good']:
+            with self.subTest(output=output):
+                self.assertIsNone(self.classifier.classify(output))
+                self.assertFalse(self.classifier.is_error(output))
+
+    def test_longer_words_are_not_errors(self):
+        self.assertIsNone(self.classifier.classify('Updated src/error_handler.py'))
+        self.assertIsNone(self.classifier.classify('see errorHandling.md'))
+
+    def test_a_later_real_error_still_counts(self):
+        self.assertEqual(self.classifier.classify('0 errors in lib/, 1 error in src/'), 'generic')
+        self.assertEqual(self.classifier.classify('10 errors'), 'generic')
+
+    def test_configured_patterns_replace_the_defaults(self):
+        classifier = load_error_classifier({'claudeception': {'error_patterns': {'oops': ['Oops']}}})
+        self.assertEqual(classifier.categories, ['oops'])
+        self.assertEqual(classifier.classify('Oops!'), 'oops')
+        self.assertIsNone(classifier.classify('TypeError'))
+
+    def test_empty_categories_are_dropped(self):
+        classifier = ErrorClassifier(dict(DEFAULT_ERROR_PATTERNS, generic=[]))
+        self.assertNotIn('generic', classifier.categories)
+        self.assertIsNone(classifier.classify('Traceback (most recent call last):'))
+
+
+if __name__ == '__main__':
+    unittest.main()
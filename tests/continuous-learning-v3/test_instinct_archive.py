@@ -0,0 +1,73 @@
+"""
+Tests for instinct-manager.py cleanup / restore (instinct_archive.py)
+
+Run with: python3 -m unittest discover -s tests/continuous-learning-v3
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import support
+from instinct_archive import InstinctArchive
+
+
+def instinct(inst_id: str, confidence: float) -> str:
+    return (f'---\nid: {inst_id}\ntrigger: when navigating\nconfidence: {confidence}\n'
+            f'domain: code-navigation\nproject: demo\n---\n\nbody of {inst_id}\n')
+
+
+class ArchiveRestoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.home = Path(tempfile.mkdtemp(prefix='clv3-archive-'))
+        self.addCleanup(shutil.rmtree, self.home, ignore_errors=True)
+        self.instincts = self.home / '.claude' / 'homunculus' / 'instincts'
+        self.personal = self.instincts / 'personal'
+        self.personal.mkdir(parents=True)
+        self.low = self.personal / 'low.yaml'
+        self.low.write_text(instinct('low', 0.2), encoding='utf-8')
+        (self.personal / 'keep.yaml').write_text(instinct('keep', 0.9), encoding='utf-8')
+
+    def manager(self, *args):
+        result = support.run_script('instinct-manager.py', *args, home=self.home)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        return result.stdout
+
+    def total(self) -> int:
+        return json.loads(self.manager('stats'))['total']
+
+    def archived_ids(self):
+        archive = InstinctArchive(self.instincts / 'archive.jsonl.gz')
+        return [entry['ids'] for entry in archive.entries()]
+
+    def test_cleanup_archives_and_restore_brings_file_back(self):
+        original = self.low.read_text(encoding='utf-8')
+        self.assertEqual(self.total(), 2)
+
+        self.manager('cleanup', '--dry-run')
+        self.assertTrue(self.low.exists())
+
+        self.manager('cleanup')
+        self.assertFalse(self.low.exists())
+        self.assertEqual(self.archived_ids(), [['low']])
+        self.assertEqual(self.total(), 1)
+
+        self.manager('restore', 'low')
+        self.assertEqual(self.low.read_text(encoding='utf-8'), original)
+        self.assertEqual(self.archived_ids(), [])
+        self.assertEqual(self.total(), 2)
+
+    def test_restore_keeps_entry_when_file_exists_again(self):
+        self.manager('cleanup')
+        self.low.write_text(instinct('low', 0.6), encoding='utf-8')
+
+        self.assertIn('Restored 0', self.manager('restore', 'low.yaml'))
+        self.assertEqual(self.archived_ids(), [['low']])
+        self.assertIn('confidence: 0.6', self.low.read_text(encoding='utf-8'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+Tests for skills/continuous-learning-v3/scripts/instinct_decay.py and instinct-manager.py decay
+
+Run with: python3 -m unittest discover -s tests/continuous-learning-v3
+"""
+
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import support
+from instinct_decay import DecaySchedule
+from instinct_parser import format_scalar, parse_frontmatter_document
+
+RULES = {'30_days_unused': -0.1, '60_days_unused': -0.2, '90_days_unused': 'stale'}
+LAST_USED = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def write_instinct(path: Path, frontmatter: dict, body: str = 'body') -> None:
+    lines = [f'{key}: {format_scalar(value)}' for key, value in frontmatter.items()]
+    path.write_text('---\n' + '\n'.join(lines) + '\n---\n\n' + body + '\n', encoding='utf-8')
+
+
+def write_item(item: dict) -> None:
+    write_instinct(item['instinct']['file_path'], item['frontmatter'], item['instinct']['body'])
+
+
+class DecayScheduleTest(unittest.TestCase):
+
+    def setUp(self):
+        root = Path(tempfile.mkdtemp(prefix='clv3-decay-'))
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        self.directory = root / 'personal'
+        self.directory.mkdir()
+        self.db_path = root / 'instincts.db'
+        self.path = self.directory / 'nav.yaml'
+        write_instinct(self.path, {'id': 'nav', 'domain': 'code-navigation', 'confidence': 0.8,
+                                   'last_used': LAST_USED.isoformat()})
+
+    def run_decay(self, days: int, apply=write_item):
+        schedule = DecaySchedule(self.directory, self.db_path)
+        try:
+            return schedule.run(RULES, now=LAST_USED + timedelta(days=days), apply=apply)
+        finally:
+            schedule.close()
+
+    def confidence(self) -> float:
+        document = parse_frontmatter_document(self.path.read_text(encoding='utf-8'))
+        return document['frontmatter']['confidence']
+
+    def test_each_threshold_applies_once(self):
+        self.assertEqual(len(self.run_decay(35)), 1)
+        self.assertAlmostEqual(self.confidence(), 0.7)
+        self.assertEqual(self.run_decay(40), [])
+        self.assertAlmostEqual(self.confidence(), 0.7)
+
+        self.assertEqual(len(self.run_decay(65)), 1)
+        self.assertAlmostEqual(self.confidence(), 0.5)
+
+    def test_interrupted_after_write_does_not_decay_again(self):
+        def write_then_crash(item):
+            write_item(item)
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.run_decay(35, apply=write_then_crash)
+        self.assertAlmostEqual(self.confidence(), 0.7)
+
+        self.assertEqual(self.run_decay(36), [])
+        self.assertAlmostEqual(self.confidence(), 0.7)
+
+    def test_failed_write_is_retried(self):
+        def fail(item):
+            raise OSError('disk full')
+
+        with self.assertRaises(OSError):
+            self.run_decay(35, apply=fail)
+        self.assertAlmostEqual(self.confidence(), 0.8)
+
+        self.assertEqual(len(self.run_decay(36)), 1)
+        self.assertAlmostEqual(self.confidence(), 0.7)
+
+    def test_dry_run_does_not_advance(self):
+        self.assertEqual(len(self.run_decay(35, apply=None)), 1)
+        self.assertAlmostEqual(self.confidence(), 0.8)
+        self.assertEqual(len(self.run_decay(35)), 1)
+
+
+class ManagerDecayTest(unittest.TestCase):
+
+    AGES = {'fresh': 10, 'month': 35, 'two-months': 65, 'quarter': 95}
+
+    def setUp(self):
+        self.home = Path(tempfile.mkdtemp(prefix='clv3-manager-decay-'))
+        self.addCleanup(shutil.rmtree, self.home, ignore_errors=True)
+        self.personal = self.home / '.claude' / 'homunculus' / 'instincts' / 'personal'
+        self.personal.mkdir(parents=True)
+        now = datetime.now()
+        for name, days in self.AGES.items():
+            write_instinct(self.personal / f'{name}.yaml',
+                           {'id': name, 'domain': 'code-navigation', 'confidence': 0.8,
+                            'last_used': (now - timedelta(days=days)).isoformat()})
+        write_instinct(self.personal / 'other.yaml',
+                       {'id': 'other', 'domain': 'testing', 'confidence': 0.8,
+                        'last_used': (now - timedelta(days=95)).isoformat()})
+
+    def decay(self):
+        result = support.run_script('instinct-manager.py', 'decay', home=self.home)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        return result.stdout
+
+    def frontmatter(self, name):
+        path = self.personal / f'{name}.yaml'
+        return parse_frontmatter_document(path.read_text(encoding='utf-8'))['frontmatter']
+
+    def test_each_threshold_applies_once(self):
+        self.assertIn('Applied decay to 3 instincts (2 confidence decayed, 1 marked stale)', self.decay())
+        self.assertAlmostEqual(self.frontmatter('fresh')['confidence'], 0.8)
+        self.assertAlmostEqual(self.frontmatter('month')['confidence'], 0.7)
+        # Jumping straight past 60 days applies the 60-day rule once, not both rules
+        self.assertAlmostEqual(self.frontmatter('two-months')['confidence'], 0.6)
+        self.assertEqual(self.frontmatter('quarter')['status'], 'stale')
+        self.assertAlmostEqual(self.frontmatter('quarter')['confidence'], 0.8)
+        self.assertNotIn('status', self.frontmatter('other'))
+
+        contents = {path.name: path.read_bytes() for path in self.personal.glob('*.yaml')}
+        self.assertIn('Applied decay to 0 instincts', self.decay())
+        self.assertEqual({path.name: path.read_bytes() for path in self.personal.glob('*.yaml')}, contents)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Tests for skills/continuous-learning-v3/scripts/instinct_evolve.py
+
+Run with: python3 -m unittest discover -s tests/continuous-learning-v3
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import support  # noqa: F401  (sets HOME and sys.path)
+from instinct_evolve import generate_artifacts
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+def workflow(inst_id, trigger, step):
+    return {'id': inst_id, 'trigger': trigger, 'confidence': 0.9, 'content': f'- {step}'}
+
+
+class GenerateArtifactsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.evolved = Path(tempfile.mkdtemp(prefix='clv3-evolved-'))
+        self.addCleanup(shutil.rmtree, self.evolved, ignore_errors=True)
+        self.command = self.evolved / 'commands' / 'deploy.md'
+
+    def generate(self, *instincts):
+        return generate_artifacts(self.evolved, [], list(instincts), [])
+
+    def test_unchanged_output_is_not_rewritten(self):
+        self.assertEqual(self.generate(workflow('w1', 'deploy', 'ship it'))['written'], ['commands/deploy.md'])
+        self.assertEqual(self.generate(workflow('w1', 'deploy', 'ship it'))['unchanged'], ['commands/deploy.md'])
+
+    def test_hand_edited_artifact_is_not_overwritten(self):
+        self.generate(workflow('w1', 'deploy', 'ship it'))
+        self.command.write_text('my own notes\n', encoding='utf-8')
+
+        # The rendered content changes, but the file on disk no longer matches the manifest
+        result = self.generate(workflow('w1', 'deploy', 'ship it carefully'))
+        self.assertEqual(result['edited'], ['commands/deploy.md'])
+        self.assertEqual(result['written'], [])
+        self.assertEqual(self.command.read_text(encoding='utf-8'), 'my own notes\n')
+
+        # Still recognised as edited on the next run
+        self.assertEqual(self.generate(workflow('w1', 'deploy', 'ship it'))['edited'], ['commands/deploy.md'])
+
+    def test_deleted_artifact_is_regenerated(self):
+        self.generate(workflow('w1', 'deploy', 'ship it'))
+        self.command.unlink()
+        self.assertEqual(self.generate(workflow('w1', 'deploy', 'ship it'))['written'], ['commands/deploy.md'])
+        self.assertTrue(self.command.exists())
+
+    @unittest.skipIf(yaml is None, 'PyYAML not installed')
+    def test_evolved_from_ids_stay_strings(self):
+        self.generate(workflow('yes', 'deploy', 'ship it'), workflow('123', 'release', 'tag it'),
+                      workflow('a: b', 'rollback', 'revert it'))
+        ids = []
+        for name in ('deploy', 'release', 'rollback'):
+            text = (self.evolved / 'commands' / f'{name}.md').read_text(encoding='utf-8')
+            ids += yaml.safe_load(text.split('---')[1])['evolved_from']
+        self.assertEqual(ids, ['yes', '123', 'a: b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
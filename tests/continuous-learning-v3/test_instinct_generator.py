@@ -0,0 +1,96 @@
+"""
+Tests for skills/continuous-learning-v3/scripts/instinct-generator.py
+
+Run with: python3 -m unittest discover -s tests/continuous-learning-v3
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import support
+
+generator = support.load_script('instinct-generator.py')
+
+CONFIG = json.loads((support.SCRIPTS_DIR.parent / 'config.json').read_text(encoding='utf-8'))
+
+
+def pattern(query, keywords, timestamp):
+    return {'natural_language': query, 'keywords': keywords,
+            'code_location': {'file_path': 'src/auth.py', 'function_name': 'handle_login',
+                              'confirmation_method': 'implicit'},
+            'timestamp': timestamp, 'session': 's1', 'confidence': 0.5}
+
+
+LOGIN = pattern('where is the login handler', ['login', 'handler'], '2026-01-01T10:00:00Z')
+LOGIN_AGAIN = pattern('find the login handler', ['login', 'handler', 'find'], '2026-01-01T11:00:00Z')
+CONFIG_PARSER = pattern('find the config parser', ['config', 'parser'], '2026-01-01T12:00:00Z')
+
+
+class GenerateInstinctsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp(prefix='clv3-generator-'))
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        probe = mock.patch.object(generator, 'probe_git', return_value=('demo', 'abc1234'))
+        probe.start()
+        self.addCleanup(probe.stop)
+
+    def generate(self, *patterns):
+        """Run a batch; also returns the files written, in order."""
+        with mock.patch.object(generator, 'write_instinct',
+                               side_effect=generator.write_instinct) as write_spy:
+            ids = generator.generate_instincts(list(patterns), self.directory, CONFIG)
+        return ids, [call.args[0].name for call in write_spy.call_args_list]
+
+    def load(self, instinct_id):
+        return generator.load_existing_instinct(instinct_id, self.directory)
+
+    def test_same_id_patterns_are_written_once(self):
+        ids, written = self.generate(LOGIN, CONFIG_PARSER, LOGIN_AGAIN)
+        self.assertEqual(ids, ['code-nav-login-handler', 'code-nav-config-parser', 'code-nav-login-handler'])
+        self.assertEqual(written, ['code-nav-login-handler.yaml', 'code-nav-config-parser.yaml'])
+
+        login = self.load('code-nav-login-handler')
+        self.assertEqual(login['frontmatter']['usage_count'], 2)
+        self.assertEqual(login['frontmatter']['last_used'], LOGIN_AGAIN['timestamp'])
+        self.assertAlmostEqual(login['frontmatter']['confidence'], 0.53)
+        self.assertEqual(generator.extract_synonyms(login['body']),
+                         ['where is the login handler', 'find the login handler'])
+        self.assertIn('- Usage count: 2', login['body'])
+        self.assertEqual(self.load('code-nav-config-parser')['frontmatter']['usage_count'], 1)
+
+    def test_batch_merges_into_an_existing_instinct(self):
+        self.generate(LOGIN)
+        ids, written = self.generate(LOGIN_AGAIN, LOGIN_AGAIN)
+        self.assertEqual(ids, ['code-nav-login-handler'] * 2)
+        self.assertEqual(written, ['code-nav-login-handler.yaml'])
+
+        login = self.load('code-nav-login-handler')
+        self.assertEqual(login['frontmatter']['usage_count'], 3)
+        self.assertIn('- Usage count: 3', login['body'])
+        # A repeated phrase is not added as a second synonym
+        self.assertEqual(generator.extract_synonyms(login['body']),
+                         ['where is the login handler', 'find the login handler'])
+
+    def documents(self):
+        # The parser strips the body, so a re-read body can lose its trailing newline
+        return {path.stem: (self.load(path.stem)['frontmatter'], self.load(path.stem)['body'].rstrip())
+                for path in self.directory.glob('*.yaml')}
+
+    def test_batch_matches_one_pattern_at_a_time(self):
+        self.generate(LOGIN, CONFIG_PARSER, LOGIN_AGAIN)
+        batched = self.documents()
+
+        shutil.rmtree(self.directory)
+        self.directory.mkdir()
+        for item in (LOGIN, CONFIG_PARSER, LOGIN_AGAIN):
+            generator.create_code_navigation_instinct(item, self.directory, CONFIG)
+        self.assertEqual(self.documents(), batched)
+
+
+if __name__ == '__main__':
+    unittest.main()
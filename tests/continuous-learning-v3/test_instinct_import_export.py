@@ -0,0 +1,114 @@
+"""
+Tests for instinct-cli.py import / export
+
+Run with: python3 -m unittest discover -s tests/continuous-learning-v3
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import support
+from instinct_parser import format_scalar, parse_instinct_file
+
+TRICKY_TRIGGER = 'when user says "deploy": C:\\new\\tests # now'
+
+
+class ImportExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.home = Path(tempfile.mkdtemp(prefix='clv3-import-export-'))
+        self.addCleanup(shutil.rmtree, self.home, ignore_errors=True)
+        self.personal = self.home / '.claude' / 'homunculus' / 'instincts' / 'personal'
+        self.inherited = self.personal.parent / 'inherited'
+        self.personal.mkdir(parents=True)
+        self.inherited.mkdir(parents=True)
+
+    def cli(self, *args):
+        result = support.run_script('instinct-cli.py', *args, home=self.home)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        return result
+
+    def write_personal(self, name, trigger, inst_id='tricky', confidence=0.8, domain='testing'):
+        (self.personal / name).write_text(
+            '---\n'
+            f'id: {inst_id}\n'
+            f'trigger: {format_scalar(trigger)}\n'
+            f'confidence: {confidence}\n'
+            f'domain: {domain}\n'
+            '---\n\n'
+            'Do the thing.\n', encoding='utf-8')
+
+    def imported(self):
+        instincts = []
+        for file in sorted(self.inherited.glob('*.yaml')):
+            instincts.extend(parse_instinct_file(file.read_text(encoding='utf-8')))
+        return instincts
+
+    def test_yaml_export_then_import_keeps_trigger(self):
+        self.write_personal('tricky.yaml', TRICKY_TRIGGER)
+        export = self.home / 'export.yaml'
+        self.cli('export', '--output', str(export))
+
+        [exported] = parse_instinct_file(export.read_text(encoding='utf-8'))
+        self.assertEqual(exported['trigger'], TRICKY_TRIGGER)
+
+        # Import into a fresh home so the id is new
+        (self.personal / 'tricky.yaml').unlink()
+        self.cli('import', str(export), '--force')
+        [inst] = self.imported()
+        self.assertEqual(inst['id'], 'tricky')
+        self.assertEqual(inst['trigger'], TRICKY_TRIGGER)
+        self.assertEqual(inst['content'], 'Do the thing.')
+
+    def test_jsonl_export_keeps_trigger(self):
+        self.write_personal('tricky.yaml', TRICKY_TRIGGER)
+        export = self.home / 'export.jsonl'
+        self.cli('export', '--format', 'jsonl', '--output', str(export))
+
+        [line] = export.read_text(encoding='utf-8').splitlines()
+        self.assertEqual(json.loads(line)['trigger'], TRICKY_TRIGGER)
+
+    def test_shards_are_numbered_without_the_global_total(self):
+        self.write_personal('a.yaml', 'a', inst_id='a', domain='testing')
+        self.write_personal('b.yaml', 'b', inst_id='b', domain='git')
+        self.write_personal('c.yaml', 'c', inst_id='c', domain='git')
+        self.cli('export', '--shard-by', 'domain', '--output', str(self.home / 'export.yaml'))
+
+        shard_numbers, ids = [], {}
+        for domain in ('git', 'testing'):
+            text = (self.home / f'export.{domain}.yaml').read_text(encoding='utf-8')
+            self.assertNotIn('# Total:', text)
+            [shard] = [line for line in text.splitlines() if line.startswith('# Shard:')]
+            self.assertTrue(shard.endswith(f'({domain})'), shard)
+            shard_numbers.append(int(shard.split()[2]))
+            ids[domain] = sorted(inst['id'] for inst in parse_instinct_file(text))
+        self.assertEqual(sorted(shard_numbers), [1, 2])
+        self.assertEqual(ids, {'git': ['b', 'c'], 'testing': ['a']})
+
+    def test_numeric_id_matches_existing_instinct(self):
+        self.write_personal('numeric.yaml', 'plain', inst_id='42', confidence=0.9)
+        source = self.home / 'source.yaml'
+        source.write_text('---\nid: 42\ntrigger: plain\nconfidence: 0.5\n---\n\nbody\n', encoding='utf-8')
+
+        result = self.cli('import', str(source), '--force')
+        self.assertIn('Nothing to import', result.stdout)
+        self.assertEqual(self.imported(), [])
+
+    def test_invalid_record_is_skipped_without_dropping_the_source(self):
+        source = self.home / 'source.yaml'
+        source.write_text(
+            '---\nid: good-1\ntrigger: a\nconfidence: 0.6\n---\n\nbody\n'
+            '---\nid: bad\ntrigger: b\nconfidence: high\n---\n\nbody\n'
+            '---\nid: good-2\ntrigger: c\nconfidence: 0.7\n---\n\nbody\n', encoding='utf-8')
+
+        result = self.cli('import', str(source), '--force')
+        self.assertIn('Skipping invalid instinct', result.stderr)
+        self.assertEqual(result.stderr.count('Skipping invalid instinct'), 1)
+        self.assertEqual(sorted(inst['id'] for inst in self.imported()), ['good-1', 'good-2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Tests for skills/continuous-learning-v3/scripts/instinct_parser.py
+
+Run with: python3 -m unittest discover -s tests/continuous-learning-v3
+"""
+
+import unittest
+
+import support  # noqa: F401  (sets HOME and sys.path)
+from instinct_parser import (format_scalar, parse_frontmatter, parse_frontmatter_document,
+                             parse_instinct_file)
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+class ParseFrontmatterTest(unittest.TestCase):
+
+    def test_flat_scalars_are_typed(self):
+        data = parse_frontmatter(['id: a', 'confidence: 0.7', 'usage_count: 3', 'enabled: true', 'note: ~'])
+        self.assertEqual(data, {'id': 'a', 'confidence': 0.7, 'usage_count': 3, 'enabled': True, 'note': None})
+
+    def test_double_quotes_are_stripped_without_unescaping(self):
+        data = parse_frontmatter(['trigger: "when user says "deploy" to prod"', r'path: "C:\new\tests"'])
+        self.assertEqual(data['trigger'], 'when user says "deploy" to prod')
+        self.assertEqual(data['path'], r'C:\new\tests')
+
+    def test_invalid_yaml_falls_back_to_lenient_lines(self):
+        data = parse_frontmatter(['id: b', 'trigger: when fixing: lint errors', 'confidence: 0.5'])
+        self.assertEqual(data, {'id': 'b', 'trigger': 'when fixing: lint errors', 'confidence': 0.5})
+
+    @unittest.skipIf(yaml is None, 'PyYAML not installed')
+    def test_nested_values_use_yaml(self):
+        data = parse_frontmatter(['id: c', 'tags:', '  - x', '  - y'])
+        self.assertEqual(data, {'id': 'c', 'tags': ['x', 'y']})
+
+    def test_yes_no_on_off_stay_strings(self):
+        data = parse_frontmatter(['answer: yes', 'reply: No', 'mode: on', 'light: OFF', 'flag: false'])
+        self.assertEqual(data, {'answer': 'yes', 'reply': 'No', 'mode': 'on', 'light': 'OFF', 'flag': False})
+
+    @unittest.skipIf(yaml is None, 'PyYAML not installed')
+    def test_yes_no_stay_strings_in_full_yaml(self):
+        data = parse_frontmatter(['answer: yes', 'flag: true', 'tags:', '  - no', '  - off', '  - False'])
+        self.assertEqual(data, {'answer': 'yes', 'flag': True, 'tags': ['no', 'off', False]})
+
+
+class ParseInstinctFileTest(unittest.TestCase):
+
+    def test_file_with_unparseable_line_keeps_every_instinct(self):
+        content = (
+            '---\nid: a\ntrigger: "when user says "deploy" to prod"\nconfidence: 0.7\n---\nbody a\n'
+            '---\nid: b\ntrigger: when fixing: lint errors\nconfidence: 0.5\n---\nbody b\n'
+            '---\nid: c\ntrigger: plain\nconfidence: 0.6\n---\nbody c\n'
+        )
+        instincts = parse_instinct_file(content)
+        self.assertEqual([inst['id'] for inst in instincts], ['a', 'b', 'c'])
+        self.assertEqual(instincts[1]['trigger'], 'when fixing: lint errors')
+        self.assertEqual(instincts[2]['content'], 'body c')
+
+    def test_entries_without_id_are_dropped(self):
+        self.assertEqual(parse_instinct_file('---\ntrigger: x\n---\nbody\n'), [])
+
+    def test_confidence_is_float(self):
+        [inst] = parse_instinct_file('---\nid: a\nconfidence: 1\n---\n')
+        self.assertIsInstance(inst['confidence'], float)
+
+    def test_document_body_keeps_later_separators(self):
+        document = parse_frontmatter_document('---\nid: a\n---\n\nfirst\n---\nsecond\n')
+        self.assertEqual(document['frontmatter'], {'id': 'a'})
+        self.assertEqual(document['body'], 'first\n---\nsecond')
+
+
+class FormatScalarTest(unittest.TestCase):
+
+    VALUES = [
+        'plain text', 'when "deploy": C:\\new\\tests # x', "it's", '123', 'yes', 'null', '',
+        ' padded ', '"quoted"', '中文: 值', '- item', '[open', 0.5, 3, True, ['a', 'b'],
+    ]
+
+    def test_values_read_back_unchanged(self):
+        for value in self.VALUES:
+            with self.subTest(value=value):
+                line = f'key: {format_scalar(value)}'
+                self.assertEqual(parse_frontmatter([line])['key'], value)
+                if yaml is not None:
+                    self.assertEqual(yaml.safe_load(line)['key'], value)
+
+    def test_newlines_become_spaces(self):
+        value = format_scalar('a\nb')
+        self.assertEqual(parse_frontmatter([f'key: {value}'])['key'], 'a b')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+Tests for skills/continuous-learning-v3/scripts/instinct_sources.py
+
+A local http.server stands in for remote instinct sources.
+
+Run with: python3 -m unittest discover -s tests/continuous-learning-v3
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import support  # noqa: F401  (sets HOME and sys.path)
+from instinct_sources import FetchError, HttpCache
+
+DOCUMENTS = {
+    '/a.yaml': b'---\nid: a\nconfidence: 0.7\n---\n\nbody a\n',
+    '/b.yaml': b'---\nid: b\nconfidence: 0.6\n---\n\nbody b\n',
+    '/c.yaml': b'---\nid: c\nconfidence: 0.5\n---\n\nbody c\n',
+}
+REQUEST_DELAY = 0.2  # seconds, long enough for concurrent requests to overlap
+
+
+class _SourceHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.headers.get('If-None-Match')))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(REQUEST_DELAY)
+            body = DOCUMENTS.get(self.path)
+            etag = f'"{self.path}"'
+            if body is None:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            elif self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+            else:
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HttpCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        # Talk to the local server directly even when a proxy is configured
+        patcher = mock.patch.dict(os.environ, {'no_proxy': '*', 'NO_PROXY': '*'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _SourceHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.cache_dir = Path(tempfile.mkdtemp(prefix='clv3-http-cache-'))
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+
+    def url(self, path):
+        return f'http://127.0.0.1:{self.server.server_port}{path}'
+
+    def test_etag_revalidation_reuses_cached_body(self):
+        cache = HttpCache(self.cache_dir)
+        self.addCleanup(cache.close)
+        body_path, cached = cache.fetch(self.url('/a.yaml'))
+        self.assertFalse(cached)
+        self.assertEqual(body_path.read_bytes(), DOCUMENTS['/a.yaml'])
+
+        body_path_again, cached = cache.fetch(self.url('/a.yaml'))
+        self.assertTrue(cached)
+        self.assertEqual(body_path_again, body_path)
+        self.assertEqual(body_path.read_bytes(), DOCUMENTS['/a.yaml'])
+        self.assertEqual(self.server.requests, [('/a.yaml', None), ('/a.yaml', '"/a.yaml"')])
+
+    def test_fetch_all_downloads_sources_concurrently(self):
+        urls = [self.url(path) for path in DOCUMENTS]
+        results, errors = HttpCache(self.cache_dir, workers=len(urls)).fetch_all(urls + urls[:1])
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(results), sorted(urls))
+        for path, url in zip(DOCUMENTS, urls):
+            self.assertEqual(results[url][0].read_bytes(), DOCUMENTS[path])
+        # The duplicate URL is fetched once, and the fetches overlapped
+        self.assertEqual(len(self.server.requests), len(urls))
+        self.assertGreater(self.server.max_in_flight, 1)
+
+    def test_failed_source_is_reported_and_others_still_fetched(self):
+        good, missing = self.url('/a.yaml'), self.url('/missing.yaml')
+        results, errors = HttpCache(self.cache_dir).fetch_all([missing, good])
+
+        self.assertEqual(list(results), [good])
+        self.assertEqual([url for url, _ in errors], [missing])
+        self.assertIn('404', errors[0][1])
+
+    def test_fetch_raises_for_error_status(self):
+        cache = HttpCache(self.cache_dir)
+        self.addCleanup(cache.close)
+        with self.assertRaises(FetchError):
+            cache.fetch(self.url('/missing.yaml'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Tests for skills/continuous-learning-v3/scripts/instinct_stats.py
+
+Run with: python3 -m unittest discover -s tests/continuous-learning-v3
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import support  # noqa: F401  (sets HOME and sys.path)
+from instinct_stats import StatsSummary
+
+
+def instinct(inst_id: str, confidence: float, project: str = 'demo') -> str:
+    return (f'---\nid: {inst_id}\nconfidence: {confidence}\n'
+            f'domain: code-navigation\nproject: {project}\n---\n\nbody\n')
+
+
+class StatsSummaryTest(unittest.TestCase):
+
+    def setUp(self):
+        root = Path(tempfile.mkdtemp(prefix='clv3-stats-'))
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        self.directory = root / 'personal'
+        self.directory.mkdir()
+        self.stats_path = root / 'stats.json'
+        (self.directory / 'a.yaml').write_text(instinct('a', 0.8), encoding='utf-8')
+        (self.directory / 'b.yaml').write_text(instinct('b', 0.6, project='web'), encoding='utf-8')
+
+    def statistics(self, rebuild=False):
+        """Read the statistics; also returns whether the summary was rebuilt."""
+        summary = StatsSummary(self.directory, self.stats_path)
+        with mock.patch.object(StatsSummary, 'rebuild', autospec=True,
+                               side_effect=StatsSummary.rebuild) as rebuild_spy:
+            with summary.transaction(rebuild=rebuild) as stats:
+                return stats.statistics(), rebuild_spy.called
+
+    def touch_directory(self):
+        """Move the directory mtime forward (timestamps may be too coarse to change on their own)."""
+        mtime_ns = self.directory.stat().st_mtime_ns + 10 ** 9
+        os.utime(self.directory, ns=(mtime_ns, mtime_ns))
+
+    def test_unchanged_directory_reuses_the_summary(self):
+        stats, rebuilt = self.statistics()
+        self.assertTrue(rebuilt)
+        self.assertEqual(stats['total'], 2)
+        self.assertEqual(stats['by_project'], {'demo': {'count': 1, 'avg_confidence': 0.8},
+                                               'web': {'count': 1, 'avg_confidence': 0.6}})
+
+        self.assertEqual(self.statistics(), (stats, False))
+
+    def test_directory_mtime_change_rebuilds(self):
+        self.statistics()
+
+        (self.directory / 'c.yaml').write_text(instinct('c', 0.4), encoding='utf-8')
+        self.touch_directory()
+        stats, rebuilt = self.statistics()
+        self.assertTrue(rebuilt)
+        self.assertEqual(stats['total'], 3)
+        self.assertEqual(stats['by_project']['demo'], {'count': 2, 'avg_confidence': 0.6})
+
+        (self.directory / 'b.yaml').unlink()
+        self.touch_directory()
+        stats, rebuilt = self.statistics()
+        self.assertTrue(rebuilt)
+        self.assertEqual(stats['total'], 2)
+        self.assertNotIn('web', stats['by_project'])
+
+    def test_in_place_edit_needs_a_forced_rebuild(self):
+        self.statistics()
+        mtime_ns = self.directory.stat().st_mtime_ns
+        (self.directory / 'a.yaml').write_text(instinct('a', 0.2), encoding='utf-8')
+        os.utime(self.directory, ns=(mtime_ns, mtime_ns))
+
+        stats, rebuilt = self.statistics()
+        self.assertFalse(rebuilt)
+        self.assertEqual(stats['by_project']['demo']['avg_confidence'], 0.8)
+
+        stats, rebuilt = self.statistics(rebuild=True)
+        self.assertTrue(rebuilt)
+        self.assertEqual(stats['by_project']['demo']['avg_confidence'], 0.2)
+
+    def test_incremental_record_keeps_the_summary_current(self):
+        self.statistics()
+        with StatsSummary(self.directory, self.stats_path).transaction() as stats:
+            stats.record(self.directory / 'b.yaml', {'id': 'b', 'confidence': 0.9,
+                                                     'domain': 'code-navigation', 'project': 'web',
+                                                     'status': 'stale'})
+            stats.remove(self.directory / 'a.yaml')
+
+        stats, rebuilt = self.statistics()
+        self.assertFalse(rebuilt)
+        self.assertEqual(stats['total'], 1)
+        self.assertEqual(stats['stale'], 1)
+        self.assertEqual(stats['by_project'], {'web': {'count': 1, 'avg_confidence': 0.9}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Tests for skills/continuous-learning-v3/scripts/observation_collector.py
+
+Run with: python3 -m unittest discover -s tests/continuous-learning-v3
+"""
+
+import json
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import support
+
+PAYLOAD = {'hook_event_name': 'PostToolUse', 'tool_name': 'Read', 'session_id': 'test',
+           'tool_response': 'ok'}
+
+
+class CollectorShutdownTest(unittest.TestCase):
+
+    def setUp(self):
+        self.home = Path(tempfile.mkdtemp(prefix='clv3-collector-'))
+        self.addCleanup(shutil.rmtree, self.home, ignore_errors=True)
+        self.store = self.home / 'observations.jsonl'
+        self.socket_path = self.home / '.collector.sock'
+
+    def start_collector(self):
+        process = subprocess.Popen(
+            [sys.executable, str(support.SCRIPTS_DIR / 'observation_collector.py'), 'serve',
+             '--store', str(self.store), '--socket', str(self.socket_path)],
+            env={'HOME': str(self.home), 'PATH': '/usr/bin:/bin'},
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        self.addCleanup(process.stderr.close)
+        deadline = time.monotonic() + 10
+        while not self.socket_path.exists():
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                self.fail('collector did not start: ' + process.stderr.read().decode())
+            time.sleep(0.05)
+        return process
+
+    def send_across_stop(self, process):
+        """Send one payload that is still arriving after the collector stops listening."""
+        line = json.dumps(PAYLOAD).encode('utf-8') + b'\n'
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(str(self.socket_path))
+        client.sendall(line[:10])
+        time.sleep(0.2)  # the handler is now waiting for the rest of the payload
+
+        process.send_signal(signal.SIGTERM)
+        # Trickle the rest (each chunk resets the handler's read timeout) until
+        # the main loop has closed the listening socket
+        rest = line[10:]
+        step = max(1, len(rest) // 8)
+        for start in range(0, len(rest), step):
+            client.sendall(rest[start:start + step])
+            time.sleep(0.3)
+        client.close()
+
+    def records(self):
+        if not self.store.exists():
+            return []
+        return [json.loads(line) for line in self.store.read_text(encoding='utf-8').splitlines() if line]
+
+    def test_payload_in_flight_at_stop_is_written(self):
+        process = self.start_collector()
+        self.send_across_stop(process)
+
+        self.assertEqual(process.wait(timeout=10), 0)
+        self.assertEqual([record['tool'] for record in self.records()], ['Read'])
+        self.assertFalse(self.socket_path.exists())
+        self.assertFalse((self.home / '.collector.pid').exists())
+
+    def test_cleanup_runs_when_final_write_fails(self):
+        process = self.start_collector()
+        # Make the store unwritable: appends now fail with OSError
+        self.store.mkdir()
+        self.send_across_stop(process)
+
+        self.assertEqual(process.wait(timeout=10), 0)
+        self.assertIn('Failed to write observations', process.stderr.read().decode())
+        self.assertFalse(self.socket_path.exists())
+        self.assertFalse((self.home / '.collector.pid').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
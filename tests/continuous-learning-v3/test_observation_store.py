@@ -0,0 +1,155 @@
+"""
+Tests for skills/continuous-learning-v3/scripts/observation_store.py
+
+Run with: python3 -m unittest discover -s tests/continuous-learning-v3
+"""
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import support  # noqa: F401  (sets HOME and sys.path)
+import observation_store
+from observation_store import FRAME_READ_SIZE, ObservationStore, _iter_gzip_frames, ingest_hook_payload
+
+PAYLOAD = json.dumps({'hook_event_name': 'PostToolUse', 'tool_name': 'Read', 'session_id': 'test',
+                      'tool_response': 'ok'})
+
+
+class GzipFramesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp(prefix='clv3-frames-'))
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_frames_keep_offsets_and_drop_partial_tail(self):
+        # Frames both smaller and larger than one read
+        frames = [b'{"n": 1}\n', bytes(range(256)) * (FRAME_READ_SIZE // 64), b'', b'{"n": 3}\n' * 5000]
+        path = self.directory / 'segment.jsonl.gz'
+        offsets = []
+        with open(path, 'wb') as f:
+            for frame in frames:
+                offsets.append(f.tell())
+                f.write(gzip.compress(frame))
+            f.write(gzip.compress(b'half written')[:12])
+
+        result = list(_iter_gzip_frames(path))
+        self.assertEqual([content for _, _, content in result], frames)
+        self.assertEqual([offset for offset, _, _ in result], offsets)
+        self.assertEqual([offset + length for offset, length, _ in result[:-1]], offsets[1:])
+
+    def test_empty_file_has_no_frames(self):
+        path = self.directory / 'empty.jsonl.gz'
+        path.touch()
+        self.assertEqual(list(_iter_gzip_frames(path)), [])
+
+
+class EndCursorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp(prefix='clv3-end-cursor-'))
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.store = ObservationStore(self.directory / 'observations.jsonl')
+
+    def append(self, *numbers):
+        self.store.append([{'event': 'tool_start', 'n': n} for n in numbers])
+
+    def resumed(self):
+        return [record['n'] for record, _ in self.store.iter_from(self.store.end_cursor())]
+
+    def test_empty_store_has_no_cursor(self):
+        self.assertIsNone(self.store.end_cursor())
+
+    def test_resumes_after_the_last_record(self):
+        self.append(1, 2)
+        cursor = self.store.end_cursor()
+        self.append(3)
+        self.assertEqual([record['n'] for record, _ in self.store.iter_from(cursor)], [3])
+
+    def test_stops_before_a_half_written_line(self):
+        self.append(1)
+        with open(self.store.store_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'n': 2})[:5])
+        cursor = self.store.end_cursor()
+        with open(self.store.store_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'n': 2})[5:] + '\n')
+        self.assertEqual([record['n'] for record, _ in self.store.iter_from(cursor)], [2])
+
+    def test_points_past_the_archive_after_rotation(self):
+        self.append(1, 2)
+        self.store.rotate()
+        cursor = self.store.end_cursor()
+        self.assertEqual(cursor['offset'], self.store.segments()[0].size())
+        self.append(3)
+        self.assertEqual([record['n'] for record, _ in self.store.iter_from(cursor)], [3])
+
+
+class SegmentOrderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp(prefix='clv3-segments-'))
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.store = ObservationStore(self.directory / 'observations.jsonl')
+
+    def test_archives_are_ordered_by_the_stamp_in_their_name(self):
+        self.store.archive_dir.mkdir()
+        names = ['processed-20260101-090000.jsonl', 'observations-20260101-100000.jsonl.gz',
+                 'observations-20260101-100000-1.jsonl', 'observations-20260101-100000-2.jsonl.gz',
+                 'observations-20260102-080000.jsonl']
+        # Modification times in the opposite order (e.g. after restoring a backup)
+        for age, name in enumerate(names):
+            path = self.store.archive_dir / name
+            path.touch()
+            os.utime(path, (1e9 - age * 3600, 1e9 - age * 3600))
+
+        self.assertEqual([segment.name for segment in self.store.segments()], names + ['observations.jsonl'])
+
+
+class IngestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp(prefix='clv3-ingest-'))
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.store = ObservationStore(self.directory / 'observations.jsonl')
+        observation_store._ingest_settings.cache_clear()
+        self.addCleanup(observation_store._ingest_settings.cache_clear)
+
+    def test_config_is_read_once_per_process(self):
+        with mock.patch('observation_store.load_config', return_value={}) as load_config:
+            for _ in range(3):
+                ingest_hook_payload(self.store, PAYLOAD, max_bytes=1 << 20)
+        self.assertEqual(load_config.call_count, 1)
+        self.assertEqual(self.store.count(), 3)
+
+    def test_rotation_leaves_compression_to_a_background_process(self):
+        with mock.patch.object(ObservationStore, 'compress_in_background') as background:
+            ingest_hook_payload(self.store, PAYLOAD, max_bytes=1)
+            ingest_hook_payload(self.store, PAYLOAD, max_bytes=1)
+        background.assert_called_once_with()
+        [archive] = self.store.archive_dir.glob('*.jsonl')
+        self.assertEqual([segment.path for segment in self.store.segments()],
+                         [archive, self.store.store_path])
+        self.assertEqual(self.store.count(), 2)
+
+    def test_background_compression(self):
+        self.store.append([{'event': 'tool_start', 'n': 1}])
+        archive = self.store.rotate_if_due(1, compress=False)
+        self.assertTrue(archive.name.endswith('.jsonl'))
+
+        self.store.compress_in_background()
+        deadline = time.monotonic() + 10
+        while archive.exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertFalse(archive.exists())
+        self.assertEqual(self.store.tail(), [{'event': 'tool_start', 'n': 1}])
+        self.assertTrue(self.store.segments()[0].compressed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -63,6 +63,44 @@ for (const testFile of testFiles) {
   }
 }
 
+// Python tests for skills/continuous-learning-v3 (skipped when python3 is unavailable)
+const pythonTestsDir = path.join(testsDir, 'continuous-learning-v3');
+const python = ['python3', 'python'].find(cmd => {
+  try {
+    execSync(`${cmd} --version`, { stdio: 'ignore' });
+    return true;
+  } catch (err) {
+    return false;
+  }
+});
+
+if (!python) {
+  console.log('\n⚠ Skipping continuous-learning-v3 Python tests (python3 not found)');
+} else if (fs.existsSync(pythonTestsDir)) {
+  console.log('\n━━━ Running continuous-learning-v3 (Python) ━━━');
+
+  let output;
+  try {
+    output = execSync(`${python} -m unittest discover -s "${pythonTestsDir}" -t "${pythonTestsDir}" 2>&1`, {
+      encoding: 'utf8',
+      stdio: ['pipe', 'pipe', 'pipe']
+    });
+  } catch (err) {
+    output = (err.stdout || '') + (err.stderr || '');
+  }
+  console.log(output);
+
+  // unittest reports "Ran N tests" and "FAILED (failures=X, errors=Y)"
+  const ranMatch = output.match(/Ran (\d+) tests?/);
+  const ran = ranMatch ? parseInt(ranMatch[1], 10) : 0;
+  const failures = output.match(/failures=(\d+)/);
+  const errors = output.match(/errors=(\d+)/);
+  const failed = (failures ? parseInt(failures[1], 10) : 0) + (errors ? parseInt(errors[1], 10) : 0);
+
+  totalPassed += ran - failed;
+  totalFailed += ranMatch ? failed : 1;
+}
+
 totalTests = totalPassed + totalFailed;
 
 console.log('\n╔══════════════════════════════════════════════════════════╗');